@@ -3,10 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from .models import Subscriber
 from .database import SessionLocal
-from .qa import summary_today, answer
-from .scraper import run as scrape_run
-import threading
-from .email_service import EmailService
+from . import timing
+
+# qa (torch/sklearn via retrieval) and scraper (scrapy/twisted) are imported inside the
+# endpoints that need them, so /subscribe and /unsubscribe start without loading them.
 
 app = FastAPI()
 
@@ -19,6 +19,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def add_server_timing(request, call_next):
+    # Endpoints add retrieval/llm/db spans; expose them for clients and benchmarks
+    spans = timing.start()
+    response = await call_next(request)
+    if spans:
+        response.headers["Server-Timing"] = timing.server_timing(spans)
+    return response
+
 class SubscribeRequest(BaseModel):
     email: EmailStr
 
@@ -28,6 +37,7 @@ class ChatRequest(BaseModel):
 
 @app.post('/subscribe')
 def subscribe(req: SubscribeRequest):
+    from .email_service import EmailService
     db = SessionLocal()
     try:
         existing = db.query(Subscriber).filter_by(email=req.email).first()
@@ -73,6 +83,7 @@ def unsubscribe(req: SubscribeRequest):
 
 @app.get('/summarize')
 def summarize(backend: str = "groq"):
+    from .qa import summary_today
     try:
         summary = summary_today(backend)
         return {"summary": summary}
@@ -81,15 +92,42 @@ def summarize(backend: str = "groq"):
 
 @app.post('/chat')
 def chat(req: ChatRequest):
+    from .qa import answer
     try:
         response = answer(req.question, req.backend)
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/llm/health')
+def llm_health():
+    from .llm import health_snapshot
+    return health_snapshot()
+
+@app.get('/articles')
+def articles(days: int = 7, source_type: str = "news", limit: int = 50):
+    with timing.span("db"):
+        from .storage import get_storage
+        rows = get_storage().list_recent(days=days, source_type=source_type, limit=limit)
+    return [
+        {"source": src, "title": title, "published_ts": ts, "url": url, "author": author}
+        for src, title, ts, url, author in rows
+    ]
+
 @app.post('/scrape')
 def scrape():
-    # Run scraping in a background thread to avoid blocking
-    thread = threading.Thread(target=scrape_run)
-    thread.start()
-    return {"message": "Scraping started in background."} 
\ No newline at end of file
+    from .crawl_jobs import start_crawl, CrawlAlreadyRunning
+    # The crawl runs in its own process (Twisted's reactor cannot be restarted in this one)
+    try:
+        job = start_crawl()
+    except CrawlAlreadyRunning as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": e.job_id})
+    return {"message": "Scraping started in background.", "job_id": job.id, "status": job.status}
+
+@app.get('/scrape/{job_id}')
+def scrape_status(job_id: str):
+    from .crawl_jobs import get_job
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown crawl job")
+    return job.to_dict()
\ No newline at end of file
@@ -1,6 +1,6 @@
-import argparse, time
-from apscheduler.schedulers.background import BackgroundScheduler
+import argparse, threading
 from .scraper import run as scrape_run
+from .worker import Worker
 from .ui import launch
 
 
@@ -8,17 +8,21 @@ def main():
     p = argparse.ArgumentParser("AI News Aggregator")
     p.add_argument("--scrape", action="store_true")
     p.add_argument("--serve", action="store_true")
-    p.add_argument("--auto",  action="store_true", help="schedule scraping every 24h")
+    p.add_argument("--auto",  action="store_true", help="run a job worker (scrape every 24h, summaries, digests)")
     args = p.parse_args()
 
     if args.scrape:
         scrape_run()
 
     if args.auto:
-        sched = BackgroundScheduler(daemon=True)
-        sched.add_job(scrape_run, "interval", hours=24, next_run_time=time.time())
-        sched.start()
-        print("[Scheduler] scraping every 24h …")
+        # Jobs are queued in news.db, so a restart does not lose or repeat them;
+        # for production run `python -m aggregator.worker` as its own process instead
+        worker = Worker()
+        print("[Worker] scraping every 24h …")
+        if args.serve:
+            threading.Thread(target=worker.run_forever, daemon=True).start()
+        else:
+            worker.run_forever()
 
     if args.serve:
         launch()
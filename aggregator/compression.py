@@ -0,0 +1,40 @@
+"""Compression of article bodies stored in `article_bodies`.
+
+Each body records the codec it was written with, so zstd and zlib rows can
+coexist: zstd is used when the `zstandard` package is installed, zlib otherwise.
+"""
+from __future__ import annotations
+import zlib
+from typing import Optional, Tuple
+from .config import BODY_CODEC, BODY_COMPRESS_LEVEL
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+
+def active_codec() -> str:
+    """Codec new bodies are written with"""
+    return "zstd" if BODY_CODEC == "zstd" and zstandard is not None else "zlib"
+
+
+def compress(text: str) -> Tuple[str, bytes]:
+    """(codec, blob) for a body"""
+    raw = text.encode("utf-8")
+    if active_codec() == "zstd":
+        # (de)compressor objects are cheap and not thread-safe, so one per call
+        return "zstd", zstandard.ZstdCompressor(level=BODY_COMPRESS_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, min(BODY_COMPRESS_LEVEL, 9))
+
+
+def decompress(codec: Optional[str], blob: Optional[bytes]) -> Optional[str]:
+    if blob is None:
+        return None
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("article body is zstd-compressed; pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(blob).decode("utf-8")
+    raise ValueError(f"Unknown body codec: {codec}")
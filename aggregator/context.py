@@ -0,0 +1,142 @@
+"""Token-budgeted context packing for the LLM prompts.
+
+Article bodies are split into passages (paragraphs, long ones into groups of
+sentences; see passages.py). When an article does not fit its share of the
+budget, its passages are ranked by embedding similarity to the question (or, for
+summaries, to the article's own centroid) and the best ones are kept, in their
+original order.
+Tokens are counted with the embedding model's tokenizer, which is already loaded
+for retrieval; it tracks the LLM tokenizers closely enough for budgeting.
+"""
+from __future__ import annotations
+import logging
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from .config import CONTEXT_BUDGETS, MIN_PASSAGE_TOKENS
+from .embeddings import get_model
+from .passages import count_tokens, passage_spans
+
+logger = logging.getLogger(__name__)
+
+
+def budget_for(backend: str) -> int:
+    """Tokens of article text per LLM call for `backend`"""
+    return CONTEXT_BUDGETS.get(backend, min(CONTEXT_BUDGETS.values()))
+
+
+def split_passages(text: str) -> List[str]:
+    """Passages of `text` with whitespace collapsed"""
+    return [" ".join(text[s:e].split()) for s, e in passage_spans(text or "")]
+
+
+class _Article:
+    def __init__(self, article: Dict[str, Any], header_tokens: int, passages: List[str], seen: set):
+        self.article = article
+        self.header_tokens = header_tokens
+        self.passages, self.tokens = [], []
+        for passage, n in zip(passages, count_tokens(passages)):
+            key = passage.lower()
+            # Navigation, sign-up blurbs and footers: tiny, or repeated across articles
+            if n < MIN_PASSAGE_TOKENS or key in seen:
+                continue
+            seen.add(key)
+            self.passages.append(passage)
+            self.tokens.append(n)
+        self.scores: Optional[np.ndarray] = None
+        self.chosen: set = set()
+
+    @property
+    def size(self) -> int:
+        return self.header_tokens + sum(self.tokens[i] for i in self.chosen)
+
+    def packed(self) -> Dict[str, Any]:
+        content = "\n\n".join(self.passages[i] for i in sorted(self.chosen))
+        return {**self.article, "content": content}
+
+
+def _score(arts: List[_Article], query: Optional[str]):
+    """Similarity of every passage to the query, or to its article's centroid"""
+    texts = [p for a in arts for p in a.passages]
+    if not texts:
+        return
+    model = get_model()
+    vecs = model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    qv = model.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0] if query else None
+    start = 0
+    for a in arts:
+        own = vecs[start:start + len(a.passages)]
+        start += len(a.passages)
+        target = qv if qv is not None else own.mean(axis=0)
+        a.scores = own @ target if len(own) else np.zeros(0)
+
+
+def _fill(arts: List[_Article], budget: int, query: Optional[str]):
+    """Choose passages of `arts` for at most `budget` tokens in total"""
+    if sum(a.header_tokens + sum(a.tokens) for a in arts) <= budget:
+        for a in arts:
+            a.chosen = set(range(len(a.passages)))
+        return
+    _score([a for a in arts if a.scores is None], query)
+    used = sum(a.header_tokens for a in arts)
+    # Best passage of every article first, so each one contributes something...
+    for a in arts:
+        if len(a.passages):
+            best = int(np.argmax(a.scores))
+            if used + a.tokens[best] <= budget:
+                a.chosen.add(best)
+                used += a.tokens[best]
+    # ...then the best remaining passages overall
+    ranked = sorted(
+        ((a.scores[i], n, i) for n, a in enumerate(arts) for i in range(len(a.passages)) if i not in a.chosen),
+        reverse=True,
+    )
+    for _, n, i in ranked:
+        if used + arts[n].tokens[i] <= budget:
+            arts[n].chosen.add(i)
+            used += arts[n].tokens[i]
+
+
+def pack(
+    articles: List[Dict[str, Any]],
+    budget: int,
+    header: Callable[[Dict[str, Any]], str],
+    query: Optional[str] = None,
+    article_budget: Optional[int] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Group `articles` into LLM calls of at most `budget` tokens each.
+
+    Returns batches of article copies whose "content" holds only the selected
+    passages; `header(article)` is the per-article text the prompt adds around it.
+    Without `article_budget` everything shares one call and the budget goes to the
+    passages most similar to `query`; with it, each article keeps at most that many
+    tokens of its most representative passages and as many calls as needed are made.
+    """
+    seen: set = set()
+    headers = count_tokens([header(a) for a in articles])
+    arts = [_Article(a, h, split_passages(a.get("content") or ""), seen) for a, h in zip(articles, headers)]
+
+    if article_budget is None:
+        _fill(arts, budget, query)
+        kept = [a.packed() for a in arts if a.chosen]
+        if len(kept) < len(arts):
+            logger.info(f"[context] {len(arts) - len(kept)} articles did not fit in {budget} tokens")
+        return [kept] if kept else []
+
+    cap = min(article_budget, budget)
+    # One embedding pass for every article that needs trimming
+    _score([a for a in arts if a.header_tokens + sum(a.tokens) > cap], query)
+    for a in arts:
+        _fill([a], cap, query)
+    batches, batch, used = [], [], 0
+    for a in arts:
+        if not a.chosen:
+            continue
+        if batch and used + a.size > budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(a.packed())
+        used += a.size
+    if batch:
+        batches.append(batch)
+    logger.info(f"[context] Packed {len(arts)} articles into {len(batches)} calls of <= {budget} tokens")
+    return batches
@@ -0,0 +1,211 @@
+"""Crawl jobs run in a separate process and tracked by job id.
+
+The Twisted reactor behind Scrapy cannot be restarted and would compete with
+the web server for the GIL, so each crawl gets its own `python -m
+aggregator.scraper` process. Only one crawl runs at a time per host.
+
+Everything about a job lives in `JOBS_DIR/<id>/` (job.json, the crawl's
+status.json and its log), so any API worker, or one started after a restart,
+can report on it.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .config import BASE_DIR, CRAWL_JOBS_DIR
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = Path(CRAWL_JOBS_DIR)
+# "<pid> <job id>" of the running crawl, created atomically so API workers share the guard
+LOCK_FILE = JOBS_DIR / "crawl.pid"
+
+_JOB_ID = re.compile(r"[0-9a-f]{12}")
+
+
+class CrawlAlreadyRunning(Exception):
+    def __init__(self, job_id: Optional[str]):
+        super().__init__(f"A crawl is already running (job {job_id or 'unknown'})")
+        self.job_id = job_id
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class CrawlJob:
+    id: str
+    status: str = "running"      # running | succeeded | failed
+    started_ts: int = 0
+    finished_ts: Optional[int] = None
+    returncode: Optional[int] = None
+    pid: Optional[int] = None
+
+    @property
+    def dir(self) -> Path:
+        return JOBS_DIR / self.id
+
+    @property
+    def job_file(self) -> Path:
+        return self.dir / "job.json"
+
+    @property
+    def status_file(self) -> Path:
+        return self.dir / "status.json"
+
+    @property
+    def log_file(self) -> Path:
+        return self.dir / "crawl.log"
+
+    def save(self):
+        tmp = self.job_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(self)))
+        os.replace(tmp, self.job_file)
+
+    def refresh(self):
+        """Settle a job whose process is gone but whose exit nobody recorded
+        (the API worker that started it exited or was restarted)"""
+        if self.status != "running" or _alive(self.pid):
+            return
+        spiders = self.progress().get("spiders", {})
+        finished = spiders and all(s.get("finished") == "finished" for s in spiders.values())
+        self.status = "succeeded" if finished else "failed"
+        self.finished_ts = int(time.time())
+        self.save()
+        _release_lock(self.id)
+        logger.info(f"Crawl job {self.id} {self.status} (exit code not observed)")
+
+    def progress(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.status_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.refresh()
+        progress = self.progress()
+        spiders = progress.get("spiders", {})
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "started_ts": self.started_ts,
+            "finished_ts": self.finished_ts,
+            "returncode": self.returncode,
+            "pages": sum(s.get("pages", 0) for s in spiders.values()),
+            "items": sum(s.get("items", 0) for s in spiders.values()),
+            "spiders": spiders,
+        }
+
+
+def _read_lock() -> Optional[tuple]:
+    """(pid, job_id) from the lock file, or None if there is none or it is unreadable"""
+    try:
+        pid, job_id = LOCK_FILE.read_text().split()
+        return int(pid), job_id
+    except (OSError, ValueError):
+        return None
+
+
+def _acquire_lock(job_id: str) -> int:
+    """Create the lock file (O_EXCL, so exactly one worker wins); returns its fd"""
+    for _ in range(2):
+        try:
+            fd = os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            held = _read_lock()
+            if held is None and time.time() - _mtime(LOCK_FILE) < 5:
+                # Just created by another worker that has not written it yet
+                raise CrawlAlreadyRunning(None)
+            if held and _alive(held[0]):
+                raise CrawlAlreadyRunning(held[1])
+            # Left behind by a crawl (or worker) that died: remove it and try once more
+            if _read_lock() == held:  # not replaced by another worker meanwhile
+                logger.warning(f"Removing stale crawl lock {held}")
+                try:
+                    LOCK_FILE.unlink()
+                except FileNotFoundError:
+                    pass
+            continue
+        # Held by this worker until the child's pid replaces it
+        os.write(fd, f"{os.getpid()} {job_id}".encode())
+        return fd
+    raise CrawlAlreadyRunning(None)
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _release_lock(job_id: str):
+    held = _read_lock()
+    if held and held[1] == job_id:
+        try:
+            LOCK_FILE.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _wait(job: CrawlJob, proc: subprocess.Popen):
+    """Reap the child in the worker that started it and record how it ended"""
+    rc = proc.wait()
+    job.returncode = rc
+    job.finished_ts = int(time.time())
+    job.status = "succeeded" if rc == 0 else "failed"
+    job.save()
+    _release_lock(job.id)
+    logger.info(f"Crawl job {job.id} {job.status} (exit {rc})")
+
+
+def start_crawl() -> CrawlJob:
+    """Launch a crawl in a child process; raises CrawlAlreadyRunning if one is active"""
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    job = CrawlJob(id=uuid.uuid4().hex[:12], started_ts=int(time.time()))
+    fd = _acquire_lock(job.id)
+    try:
+        job.dir.mkdir()
+        with open(job.log_file, "w") as log:
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "aggregator.scraper", "--status-file", str(job.status_file)],
+                cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT,
+            )
+        job.pid = proc.pid
+        job.save()
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, f"{job.pid} {job.id}".encode(), 0)
+    except Exception:
+        os.close(fd)
+        _release_lock(job.id)
+        raise
+    os.close(fd)
+    threading.Thread(target=_wait, args=(job, proc), name=f"crawl-{job.id}", daemon=True).start()
+    logger.info(f"Started crawl job {job.id} (pid {job.pid})")
+    return job
+
+
+def get_job(job_id: str) -> Optional[CrawlJob]:
+    if not _JOB_ID.fullmatch(job_id):
+        return None
+    try:
+        data = json.loads((JOBS_DIR / job_id / "job.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return CrawlJob(**data)
@@ -1,9 +1,15 @@
-"""SQLite helpers + schema management"""
+"""SQLite helpers + schema management.
+
+All access to news.db goes through this module: `connect()` / `connect_readonly()`
+hand out one pooled sqlite3 connection per thread, and the SQLAlchemy `engine`
+points at the same file with the same pragmas.
+"""
 from __future__ import annotations
-import sqlite3, pickle, time
-from typing import Dict, Any
-from .config import DB_PATH, EMBED_DIM
-from sqlalchemy import create_engine
+import sqlite3, pickle, time, json, threading
+from typing import Dict, Any, Iterable, Optional, Tuple
+from .config import DB_PATH, EMBED_DIM, SQLITE_MMAP_SIZE, SQLITE_CACHE_KB, SQLITE_BUSY_TIMEOUT
+from .compression import compress, decompress
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -16,22 +22,98 @@ CREATE TABLE IF NOT EXISTS articles (
     author TEXT,
     published_ts INTEGER,
     url TEXT UNIQUE,
-    content TEXT,
-    embedding BLOB
+    content TEXT,       -- legacy rows only; bodies live compressed in article_bodies
+    embedding BLOB,
+    source_type TEXT NOT NULL DEFAULT 'news'  -- news | tool (Futurepedia listings)
 );
 CREATE INDEX IF NOT EXISTS idx_date   ON articles(published_ts);
 CREATE INDEX IF NOT EXISTS idx_source ON articles(source);
+-- Recent-window queries: range on published_ts per source type, and covers list_recent
+CREATE INDEX IF NOT EXISTS idx_recent ON articles(source_type, published_ts, source, title, url, author);
+-- Bodies are kept out of the articles rows so metadata and embedding scans stay small
+CREATE TABLE IF NOT EXISTS article_bodies (
+    article_id INTEGER PRIMARY KEY REFERENCES articles(id),
+    codec TEXT NOT NULL,    -- zstd | zlib, see compression.py
+    body BLOB NOT NULL
+);
+-- Passage index (passages.py): offsets into the article body + normalized float32 embedding
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL,
+    embedding BLOB,
+    UNIQUE(article_id, start_char)
+);
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    url TEXT UNIQUE,
+    blurb TEXT,
+    tags TEXT,          -- JSON list
+    pricing TEXT,
+    embedding BLOB,
+    updated_ts INTEGER
+);
+CREATE TABLE IF NOT EXISTS crawl_state (
+    source TEXT PRIMARY KEY,
+    newest_ts INTEGER,  -- newest published_ts stored from this source
+    updated_ts INTEGER
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT,       -- JSON object passed to the handler
+    dedupe_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | succeeded | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after INTEGER NOT NULL,
+    lease_until INTEGER,
+    worker TEXT,
+    last_error TEXT,
+    result TEXT,        -- JSON
+    created_ts INTEGER,
+    updated_ts INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(status, run_after);
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    backend TEXT,
+    content TEXT,
+    created_ts INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_summaries_backend ON summaries(backend, created_ts);
 """
 
-# Create database URL
-DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./news.db')
+# WAL lets readers run alongside the single writer; with WAL, synchronous=NORMAL only
+# fsyncs at checkpoints and is still safe against corruption
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size=-{SQLITE_CACHE_KB}",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}",
+)
+
+# Create database URL (same file as DB_PATH unless overridden)
+DATABASE_URL = os.getenv('DATABASE_URL', f'sqlite:///{DB_PATH}')
 
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _tune_sqlalchemy_connection(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in PRAGMAS:
+            cur.execute(pragma)
+        cur.close()
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -48,44 +130,342 @@ def get_db():
 
 # Create all tables
 def init_db():
+    from . import models  # noqa: F401  registers the ORM tables on Base
+    init_schema()
     Base.metadata.create_all(bind=engine)
 
+_schema_lock = threading.Lock()
+_schema_ready = False
+_local = threading.local()
+
+
+def init_schema():
+    """Create tables and indexes; runs once per process"""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _add_missing_columns(conn)
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        _schema_ready = True
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    """Bring tables created by an older SCHEMA up to date (see also migrations/)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+    if columns and "source_type" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE articles ADD COLUMN source_type TEXT NOT NULL DEFAULT 'news'")
+            conn.execute("UPDATE articles SET source_type = 'tool' WHERE source = 'Futurepedia'")
+    if "last_urls" in {row[1] for row in conn.execute("PRAGMA table_info(crawl_state)")}:
+        try:
+            with conn:
+                conn.execute("ALTER TABLE crawl_state DROP COLUMN last_urls")
+        except sqlite3.OperationalError:
+            pass  # SQLite < 3.35 has no DROP COLUMN; the unused column is harmless
+
+
+def _open(readonly: bool) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=1")
+    else:
+        conn = sqlite3.connect(DB_PATH)
+    for pragma in (PRAGMAS[1:] if readonly else PRAGMAS):  # journal_mode needs write access
+        conn.execute(pragma)
+    return conn
+
+
 def connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.executescript(SCHEMA)
+    """This thread's pooled read-write connection (do not close it)"""
+    init_schema()
+    conn = getattr(_local, "rw", None)
+    if conn is None:
+        conn = _local.rw = _open(readonly=False)
     return conn
 
 
+def connect_readonly() -> sqlite3.Connection:
+    """This thread's pooled read-only connection, for query paths (do not close it)"""
+    init_schema()
+    conn = getattr(_local, "ro", None)
+    if conn is None:
+        conn = _local.ro = _open(readonly=True)
+    return conn
+
+
+def close_connections():
+    """Close this thread's pooled connections (e.g. before a worker thread exits)"""
+    for attr in ("rw", "ro"):
+        conn = getattr(_local, attr, None)
+        if conn is not None:
+            conn.close()
+            setattr(_local, attr, None)
+
+
 def insert_article(conn: sqlite3.Connection, item: Dict[str, Any]):
     """Insert if URL not seen"""
-    try:
-        with conn:
-            conn.execute(
-                """INSERT INTO articles(source,title,author,published_ts,url,content,embedding)
-                   VALUES (:source,:title,:author,:published_ts,:url,:content,:embedding)""",
-                item,
-            )
-    except sqlite3.IntegrityError:
-        pass
+    insert_articles(conn, [item])
+
+
+def insert_articles(conn: sqlite3.Connection, items: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+    """Insert a batch in one transaction, skipping URLs already stored; returns (inserted, skipped)"""
+    items = list(items)
+    if not items:
+        return 0, 0
+    # Passages are offsets into the body being inserted, so only new articles get them
+    new_urls = {item["url"] for item in items} - known_urls(conn, (item["url"] for item in items))
+    with conn:
+        cur = conn.executemany(
+            """INSERT INTO articles(source,title,author,published_ts,url,embedding,source_type)
+               VALUES (:source,:title,:author,:published_ts,:url,:embedding,:source_type)
+               ON CONFLICT(url) DO NOTHING""",
+            ({"source_type": "news", **item} for item in items),
+        )
+        inserted = cur.rowcount
+        # Rows that already had a (legacy or compressed) body are left alone
+        conn.executemany(
+            """INSERT INTO article_bodies(article_id,codec,body)
+               SELECT id, ?, ? FROM articles WHERE url = ? AND content IS NULL
+               ON CONFLICT(article_id) DO NOTHING""",
+            (
+                (*compress(item["content"]), item["url"])
+                for item in items if item.get("content") is not None
+            ),
+        )
+        conn.executemany(
+            """INSERT INTO passages(article_id,start_char,end_char,embedding)
+               SELECT id, ?, ?, ? FROM articles WHERE url = ?
+               ON CONFLICT(article_id, start_char) DO NOTHING""",
+            (
+                (start, end, emb, item["url"])
+                for item in items if item["url"] in new_urls
+                for start, end, emb in item.get("passages") or ()
+            ),
+        )
+    return inserted, len(items) - inserted
 
 
-def fetch_recent(conn: sqlite3.Connection, days: int = 1):
+# Body of an article: the compressed copy if there is one, else the legacy column
+BODY_COLUMNS = "article_bodies.codec, article_bodies.body, articles.content"
+BODY_JOIN = "LEFT JOIN article_bodies ON article_bodies.article_id = articles.id"
+
+
+def body_text(codec, blob, legacy):
+    return legacy if blob is None else decompress(codec, blob)
+
+
+def recent_query(days: int = 1, source_type: Optional[str] = None) -> Tuple[str, tuple]:
+    """SQL and parameters of `fetch_recent` (benchmarks/query_plans.py checks its plan)"""
     since = int(time.time()) - days * 86400
-    cur = conn.execute(
-        """SELECT source, title, content, embedding, published_ts, url, author 
-           FROM articles 
-           WHERE published_ts >= ? 
-           ORDER BY published_ts DESC""",
-        (since,)
-    )
-    return cur.fetchall()
+    type_filter = "source_type = ? AND" if source_type else ""
+    sql = f"""SELECT source, title, {BODY_COLUMNS}, published_ts, url, author
+              FROM articles {BODY_JOIN}
+              WHERE {type_filter} published_ts >= ?
+              ORDER BY published_ts DESC"""
+    return sql, ((source_type, since) if source_type else (since,))
+
+def fetch_recent(conn: sqlite3.Connection, days: int = 1, source_type: Optional[str] = None):
+    """(source, title, content, published_ts, url, author) of the last `days` days, newest first"""
+    cur = conn.execute(*recent_query(days, source_type))
+    return [
+        (source, title, body_text(codec, blob, legacy), ts, url, author)
+        for source, title, codec, blob, legacy, ts, url, author in cur.fetchall()
+    ]
+
+def list_recent_query(days: int = 1, source_type: str = "news", limit: int = 200) -> Tuple[str, tuple]:
+    """SQL and parameters of `list_recent`"""
+    since = int(time.time()) - days * 86400
+    sql = """SELECT source, title, published_ts, url, author
+             FROM articles
+             WHERE source_type = ? AND published_ts >= ?
+             ORDER BY published_ts DESC
+             LIMIT ?"""
+    return sql, (source_type, since, limit)
+
+def list_recent(conn: sqlite3.Connection, days: int = 1, source_type: str = "news", limit: int = 200):
+    """Metadata only (source, title, published_ts, url, author), answered from idx_recent"""
+    return conn.execute(*list_recent_query(days, source_type, limit)).fetchall()
 
 def fetch_all_articles(conn: sqlite3.Connection):
     """Fetch all articles for search"""
     cur = conn.execute(
-        """SELECT source, title, content, embedding, published_ts, url, author 
-           FROM articles 
-           ORDER BY published_ts DESC"""
+        f"""SELECT source, title, {BODY_COLUMNS}, embedding, published_ts, url, author
+            FROM articles {BODY_JOIN}
+            ORDER BY published_ts DESC"""
+    )
+    return [
+        (source, title, body_text(codec, blob, legacy), emb, ts, url, author)
+        for source, title, codec, blob, legacy, emb, ts, url, author in cur.fetchall()
+    ]
+
+def fetch_embeddings(conn: sqlite3.Connection):
+    """(id, embedding) of every article with one; no bodies are read"""
+    return conn.execute("SELECT id, embedding FROM articles WHERE embedding IS NOT NULL").fetchall()
+
+def fetch_articles_by_id(conn: sqlite3.Connection, ids) -> Dict[int, Tuple]:
+    """id -> (source, title, content, published_ts, url, author), decompressing only these bodies"""
+    ids = list(ids)
+    found = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cur = conn.execute(
+            f"""SELECT articles.id, source, title, {BODY_COLUMNS}, published_ts, url, author
+                FROM articles {BODY_JOIN}
+                WHERE articles.id IN ({','.join('?' * len(chunk))})""",
+            chunk,
+        )
+        for id_, source, title, codec, blob, legacy, ts, url, author in cur:
+            found[id_] = (source, title, body_text(codec, blob, legacy), ts, url, author)
+    return found
+
+def fetch_passage_embeddings(conn: sqlite3.Connection):
+    """(article_id, start_char, end_char, embedding) of every indexed passage"""
+    return conn.execute(
+        "SELECT article_id, start_char, end_char, embedding FROM passages WHERE embedding IS NOT NULL"
+    ).fetchall()
+
+def fetch_passages(conn: sqlite3.Connection, article_ids) -> Dict[int, list]:
+    """article_id -> [(start_char, end_char, embedding)] for the given articles"""
+    article_ids = list(article_ids)
+    found: Dict[int, list] = {}
+    for i in range(0, len(article_ids), 500):
+        chunk = article_ids[i:i + 500]
+        cur = conn.execute(
+            f"""SELECT article_id, start_char, end_char, embedding FROM passages
+                WHERE article_id IN ({','.join('?' * len(chunk))}) ORDER BY article_id, start_char""",
+            chunk,
+        )
+        for article_id, start, end, emb in cur:
+            found.setdefault(article_id, []).append((start, end, emb))
+    return found
+
+def articles_without_passages(conn: sqlite3.Connection, limit: int):
+    """Ids of up to `limit` articles not yet in the passage index"""
+    cur = conn.execute(
+        """SELECT id FROM articles
+           WHERE NOT EXISTS (SELECT 1 FROM passages WHERE passages.article_id = articles.id)
+           LIMIT ?""",
+        (limit,),
+    )
+    return [row[0] for row in cur]
+
+def insert_passages(conn: sqlite3.Connection, rows):
+    """Add (article_id, start_char, end_char, embedding) rows; the caller commits"""
+    conn.executemany(
+        """INSERT INTO passages(article_id,start_char,end_char,embedding) VALUES (?,?,?,?)
+           ON CONFLICT(article_id, start_char) DO NOTHING""",
+        rows,
     )
-    return cur.fetchall() 
\ No newline at end of file
+
+def move_bodies_out(conn: sqlite3.Connection, batch: int = 500) -> int:
+    """Compress legacy articles.content into article_bodies; returns rows moved.
+
+    Does not commit, so it can run inside a migration's transaction. Run VACUUM
+    afterwards to give the freed pages back to the filesystem.
+    """
+    moved = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, content FROM articles WHERE content IS NOT NULL LIMIT ?", (batch,)
+        ).fetchall()
+        if not rows:
+            return moved
+        conn.executemany(
+            """INSERT INTO article_bodies(article_id,codec,body) VALUES (?,?,?)
+               ON CONFLICT(article_id) DO NOTHING""",
+            ((id_, *compress(content)) for id_, content in rows),
+        )
+        conn.executemany("UPDATE articles SET content = NULL WHERE id = ?", ((id_,) for id_, _ in rows))
+        moved += len(rows)
+
+def upsert_tool(conn: sqlite3.Connection, tool: Dict[str, Any]):
+    """Insert or refresh a Futurepedia tool in the local tool index"""
+    upsert_tools(conn, [tool])
+
+
+def upsert_tools(conn: sqlite3.Connection, tools: Iterable[Dict[str, Any]]):
+    """Insert or refresh a batch of tools in one transaction"""
+    now = int(time.time())
+    with conn:
+        conn.executemany(
+            """INSERT INTO tools(name,url,blurb,tags,pricing,embedding,updated_ts)
+               VALUES (:name,:url,:blurb,:tags,:pricing,:embedding,:updated_ts)
+               ON CONFLICT(url) DO UPDATE SET
+                   name=excluded.name, blurb=excluded.blurb, tags=excluded.tags,
+                   pricing=excluded.pricing, embedding=excluded.embedding,
+                   updated_ts=excluded.updated_ts""",
+            ({
+                "name": tool["name"],
+                "url": tool["url"],
+                "blurb": tool.get("blurb"),
+                "tags": json.dumps(tool.get("tags") or []),
+                "pricing": tool.get("pricing"),
+                "embedding": tool.get("embedding"),
+                "updated_ts": now,
+            } for tool in tools),
+        )
+
+
+def fetch_all_tools(conn: sqlite3.Connection):
+    """Fetch the tool index for search"""
+    cur = conn.execute("SELECT name, url, blurb, tags, pricing, embedding FROM tools")
+    return [
+        (name, url, blurb, json.loads(tags or "[]"), pricing, embedding)
+        for name, url, blurb, tags, pricing, embedding in cur.fetchall()
+    ]
+
+
+def known_urls(conn: sqlite3.Connection, urls) -> set:
+    """Subset of `urls` already stored in articles"""
+    urls = list(urls)
+    found = set()
+    # Stay under SQLite's bound-parameter limit
+    for i in range(0, len(urls), 500):
+        chunk = urls[i:i + 500]
+        cur = conn.execute(
+            f"SELECT url FROM articles WHERE url IN ({','.join('?' * len(chunk))})", chunk
+        )
+        found.update(row[0] for row in cur)
+    return found
+
+
+def get_crawl_state(conn: sqlite3.Connection, source: str) -> Optional[int]:
+    """newest_ts recorded for `source` by earlier crawls, or None"""
+    row = conn.execute("SELECT newest_ts FROM crawl_state WHERE source = ?", (source,)).fetchone()
+    return row[0] if row else None
+
+
+def save_crawl_state(conn: sqlite3.Connection, source: str, newest_ts: int):
+    with conn:
+        conn.execute(
+            """INSERT INTO crawl_state(source,newest_ts,updated_ts) VALUES (?,?,?)
+               ON CONFLICT(source) DO UPDATE SET
+                   newest_ts=MAX(COALESCE(crawl_state.newest_ts, 0), excluded.newest_ts),
+                   updated_ts=excluded.updated_ts""",
+            (source, newest_ts, int(time.time())),
+        )
+
+
+def save_summary(conn: sqlite3.Connection, backend: str, content: str):
+    """Store a materialized weekly summary generated by the worker"""
+    with conn:
+        conn.execute(
+            "INSERT INTO summaries(backend,content,created_ts) VALUES (?,?,?)",
+            (backend, content, int(time.time())),
+        )
+
+
+def latest_summary(conn: sqlite3.Connection, backend: str, max_age: int):
+    """Newest materialized summary for `backend` younger than `max_age` seconds, or None"""
+    row = conn.execute(
+        """SELECT content FROM summaries WHERE backend = ? AND created_ts >= ?
+           ORDER BY created_ts DESC LIMIT 1""",
+        (backend, int(time.time()) - max_age),
+    ).fetchone()
+    return row[0] if row else None
\ No newline at end of file
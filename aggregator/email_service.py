@@ -1,22 +1,25 @@
+from __future__ import annotations
 import os
 from typing import List
 from mailjet_rest import Client
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Subscription, NewsArticle, Category
+from datetime import datetime
+from .models import Subscriber
+from .database import SessionLocal
+from .storage import get_storage
 from .llm import LLM
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
-# Initialize database connection
-engine = create_engine('sqlite:///news.db')
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_llm: LLM | None = None
 
-# Initialize LLM for summarization
-llm = LLM(backend=os.getenv("LLM_BACKEND", "gemini"))
+def get_llm() -> LLM:
+    """LLM for summarization, created on first use rather than at import."""
+    global _llm
+    if _llm is None:
+        _llm = LLM(backend=os.getenv("LLM_BACKEND", "gemini"))
+    return _llm
 
 class EmailService:
     def __init__(self):
@@ -29,24 +32,20 @@ class EmailService:
         self.sender_email = os.getenv('SENDER_EMAIL', 'your-verified-sender@domain.com')
         self.sender_name = os.getenv('SENDER_NAME', 'AI News Weekly Digest')
 
-    def get_latest_articles(self, days: int = 7) -> List[NewsArticle]:
-        """Get articles from the last 7 days."""
-        db = SessionLocal()
-        try:
-            cutoff_time = datetime.utcnow() - timedelta(days=days)
-            articles = db.query(NewsArticle).filter(
-                NewsArticle.created_at >= cutoff_time
-            ).order_by(NewsArticle.created_at.desc()).all()
-            return articles
-        finally:
-            db.close()
+    def get_latest_articles(self, days: int = 7) -> List[dict]:
+        """Get scraped articles from the last 7 days."""
+        rows = get_storage().fetch_recent(days=days, source_type="news")
+        return [
+            {"source": src, "title": title, "content": content, "timestamp": ts, "url": url, "author": author}
+            for src, title, content, ts, url, author in rows
+        ]
 
-    def get_active_subscribers(self) -> List[Subscription]:
+    def get_active_subscribers(self) -> List[Subscriber]:
         """Get all active subscribers."""
         db = SessionLocal()
         try:
-            subscribers = db.query(Subscription).filter(
-                Subscription.is_active == True
+            subscribers = db.query(Subscriber).filter(
+                Subscriber.is_active == True
             ).all()
             return subscribers
         finally:
@@ -54,15 +53,15 @@ class EmailService:
 
     def generate_arabic_summary(self, article) -> str:
         """Generate Arabic summary for an article."""
-        # Handle both NewsArticle objects and dictionaries
+        # Handle both ORM objects and dictionaries
         title = article.title if hasattr(article, 'title') else article['title']
         content = article.content if hasattr(article, 'content') else article['content']
         
         # Combine title and content for summarization
         text_to_summarize = f"Title: {title}\n\nContent: {content}"
-        return llm.summarize_arabic(text_to_summarize)
+        return get_llm().summarize_arabic(text_to_summarize)
 
-    def format_email_content(self, articles: List[NewsArticle], is_weekly: bool = True) -> str:
+    def format_email_content(self, articles: List[dict], is_weekly: bool = True) -> str:
         """Format articles into HTML email content."""
         digest_type = "الأسبوعي" if is_weekly else "اليومي"
         html_content = f"""
@@ -81,7 +80,7 @@ class EmailService:
         """
 
         for article in articles:
-            # Handle both NewsArticle objects and dictionaries
+            # Handle both ORM objects and dictionaries
             title = article.title if hasattr(article, 'title') else article['title']
             content = article.content if hasattr(article, 'content') else article['content']
             source = article.source if hasattr(article, 'source') else article['source']
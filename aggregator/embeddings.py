@@ -1,13 +1,21 @@
 from __future__ import annotations
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING
+import multiprocessing
 import numpy as np
-from .config import EMBEDDING_MODEL, EMBED_DIM
+from .config import EMBEDDING_MODEL, EMBED_DIM, EMBED_WORKERS
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 _model: SentenceTransformer | None = None
+_pool: ProcessPoolExecutor | None = None
 
 def get_model():
     global _model
     if _model is None:
+        # Deferred: pulls in torch, which dominates import time
+        from sentence_transformers import SentenceTransformer
         _model = SentenceTransformer(EMBEDDING_MODEL)
     return _model
 
@@ -18,4 +26,34 @@ def embed(text: str) -> bytes:
 
 
 def bytes_to_vec(blob: bytes):
-    return np.frombuffer(blob, dtype=np.float32, count=EMBED_DIM) 
\ No newline at end of file
+    return np.frombuffer(blob, dtype=np.float32, count=EMBED_DIM)
+
+
+def _warm_worker():
+    # Load the model once per worker instead of on the first item it receives
+    get_model()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Long-lived embedding worker pool, so inference runs outside the Twisted reactor thread."""
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that already runs a reactor (or torch threads) is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=EMBED_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+    return _pool
+
+
+def embed_async(text: str) -> Future:
+    """Submit `text` to the worker pool; the future resolves to the same bytes as `embed`."""
+    return get_pool().submit(embed, text)
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
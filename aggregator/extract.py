@@ -0,0 +1,122 @@
+"""Fast lxml extraction shared by the spiders and tool_search.
+
+Selectors are compiled once at import, and pages are parsed straight into an
+lxml tree instead of a BeautifulSoup object model.
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# Article pages
+_PARAGRAPHS = CSSSelector("p")
+_TITLE = CSSSelector("title")
+_AUTHOR = CSSSelector('meta[name="author"], a[rel="author"]')
+_PUBLISHED = CSSSelector('meta[property="article:published_time"], time[datetime]')
+
+# Futurepedia search result cards
+_TOOL_CARDS = CSSSelector("div.bg-card, div.flex.flex-col.bg-card")
+_TOOL_CARDS_FALLBACK = CSSSelector('div[class*="card"], div[class*="flex flex-col"], a[href*="/tool/"]')
+_TOOL_NAME = CSSSelector('p.font-semibold, p[class*="font-semibold"], h3, h4, a > p')
+_TOOL_LINK = CSSSelector('a[href*="/tool/"]')
+_TOOL_BLURB = CSSSelector('p[class*="overflow-hidden"], p[class*="text-muted"], p[class*="line-clamp"]')
+_TOOL_TAGS = CSSSelector('a[href*="/ai-tools/"]')
+_TOOL_PRICING = CSSSelector("div.flex.justify-between span, div.flex span:first-child")
+_TOOL_RATING = CSSSelector("span.sr-only")
+
+
+def parse(markup: Union[str, bytes]):
+    """lxml tree of `markup`, or None for an empty or unparseable body"""
+    try:
+        return lxml_html.fromstring(markup)
+    except (etree.ParserError, etree.XMLSyntaxError):
+        return None
+
+
+def text_of(el, sep: str = " ") -> str:
+    """Equivalent of BeautifulSoup's get_text(sep, strip=True)"""
+    return sep.join(s.strip() for s in el.itertext() if s.strip())
+
+
+def _first(selector: CSSSelector, el):
+    found = selector(el)
+    return found[0] if found else None
+
+
+def _parse_ts(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def extract_article(
+    markup: Union[str, bytes],
+    title: Optional[CSSSelector] = None,
+    content: Optional[CSSSelector] = None,
+    tags: Optional[CSSSelector] = None,
+) -> Dict[str, Any]:
+    """Title, author, published timestamp (or None), text and tags of an article page.
+
+    `title`, `content` and `tags` are a site's own selectors (compiled once, like the
+    ones above); by default the title is <title>, the text every <p> and there are
+    no tags. Content elements are joined one per line.
+    """
+    root = parse(markup)
+    if root is None:
+        return {"title": None, "author": None, "published_ts": None, "content": "", "tags": []}
+    title_el = _first(title, root) if title is not None else None
+    if title_el is None:
+        title_el = _first(_TITLE, root)
+    author_el = _first(_AUTHOR, root)
+    if author_el is None:
+        author = None
+    elif author_el.tag == "meta":
+        author = (author_el.get("content") or "").strip() or None
+    else:
+        author = text_of(author_el) or None
+    ts_el = _first(_PUBLISHED, root)
+    published = None
+    if ts_el is not None:
+        published = _parse_ts(ts_el.get("content") if ts_el.tag == "meta" else ts_el.get("datetime"))
+    return {
+        "title": title_el.text_content().strip() if title_el is not None else None,
+        "author": author,
+        "published_ts": published,
+        "content": "\n".join(text_of(p) for p in (content if content is not None else _PARAGRAPHS)(root)),
+        "tags": [text_of(t) for t in tags(root)] if tags is not None else [],
+    }
+
+
+def extract_tool_cards(markup: Union[str, bytes], k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Tool cards of a Futurepedia search page as name/url/blurb/tags dicts"""
+    root = parse(markup)
+    if root is None:
+        return []
+    cards = _TOOL_CARDS(root) or _TOOL_CARDS_FALLBACK(root)
+    if k is not None:
+        cards = cards[:k]
+
+    results = []
+    for card in cards:
+        name_el = _first(_TOOL_NAME, card)
+        link_el = _first(_TOOL_LINK, card)
+        url = link_el.get("href") if link_el is not None and link_el.get("href") else "#"
+        if not url.startswith("http"):
+            url = f"https://www.futurepedia.io{url}"
+        blurb_el = _first(_TOOL_BLURB, card)
+        tags = [text_of(t, "") for t in _TOOL_TAGS(card)]
+        for extra in (_first(_TOOL_PRICING, card), _first(_TOOL_RATING, card)):
+            value = text_of(extra, "") if extra is not None else ""
+            if value:
+                tags.append(value)
+        results.append({
+            "name": text_of(name_el, "") if name_el is not None else "Unknown Name",
+            "url": url,
+            "blurb": text_of(blurb_el, "") if blurb_el is not None else "No description available",
+            "tags": tags,
+        })
+    return results
@@ -0,0 +1,144 @@
+"""SQLite-backed job queue: enqueue, lease, retry with backoff, dead-letter.
+
+Jobs live in the `jobs` table of news.db, so they survive restarts and any number
+of workers (see worker.py) can share one queue. A job is leased by flipping it to
+`running` with a `lease_until` deadline inside a write transaction; a worker that
+dies mid-job simply lets the lease expire and the job is picked up again, or
+dead-lettered if that was its last attempt. Only the worker holding the lease can
+complete or fail a job.
+Periodic jobs carry a `dedupe_key` naming their period ("scrape:2024-06-01"), so
+enqueueing the same period twice, from any process, is a no-op.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Union
+from .config import JOB_RETRY_BASE, JOB_RETRY_MAX
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(conn: sqlite3.Connection, kind: str, payload: Optional[Dict[str, Any]] = None,
+            dedupe_key: Optional[str] = None, run_after: Optional[int] = None,
+            max_attempts: int = 3) -> Optional[int]:
+    """Queue a job; returns its id, or None if a job with `dedupe_key` already exists"""
+    now = int(time.time())
+    with conn:
+        cur = conn.execute(
+            """INSERT INTO jobs(kind,payload,dedupe_key,run_after,max_attempts,created_ts,updated_ts)
+               VALUES (?,?,?,?,?,?,?)
+               ON CONFLICT(dedupe_key) DO NOTHING""",
+            (kind, json.dumps(payload or {}), dedupe_key, run_after or now, max_attempts, now, now),
+        )
+    return cur.lastrowid if cur.rowcount else None
+
+
+def lease(conn: sqlite3.Connection, worker: str, lease_seconds: Union[int, Dict[str, int]],
+          kinds: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    """Claim the oldest due job (or one whose lease expired); `lease_seconds` is one
+    duration or kind -> duration. Expired jobs without attempts left are dead-lettered."""
+    now = int(time.time())
+    kinds = list(kinds or [])
+    kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+    # IMMEDIATE takes the write lock up front, so two workers cannot pick the same row
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Lost on their last attempt (worker killed, OOM, hung): do not hand them out again
+        dead = conn.execute(
+            f"""UPDATE jobs SET status = 'dead', lease_until = NULL, updated_ts = ?,
+                    last_error = 'lease expired on ' || COALESCE(worker, '?') || ' (attempt '
+                                 || attempts || '/' || max_attempts || ')'
+                WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts {kind_filter}""",
+            (now, now, *kinds),
+        ).rowcount
+        if dead:
+            logger.warning(f"Dead-lettered {dead} jobs whose last lease expired")
+        row = conn.execute(
+            f"""SELECT id, kind, payload, attempts, max_attempts FROM jobs
+                WHERE ((status = 'queued' AND run_after <= ?)
+                       OR (status = 'running' AND lease_until < ?)) {kind_filter}
+                ORDER BY run_after, id LIMIT 1""",
+            (now, now, *kinds),
+        ).fetchone()
+        if row is None:
+            conn.commit()
+            return None
+        job_id, kind, payload, attempts, max_attempts = row
+        seconds = lease_seconds[kind] if isinstance(lease_seconds, dict) else lease_seconds
+        conn.execute(
+            """UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                   lease_until = ?, updated_ts = ? WHERE id = ?""",
+            (worker, now + seconds, now, job_id),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {
+        "id": job_id,
+        "kind": kind,
+        "payload": json.loads(payload or "{}"),
+        "attempt": attempts + 1,
+        "max_attempts": max_attempts,
+        "worker": worker,
+    }
+
+
+def complete(conn: sqlite3.Connection, job: Dict[str, Any], result: Any = None) -> bool:
+    """Mark a leased job succeeded; False if the lease was lost to another worker"""
+    with conn:
+        cur = conn.execute(
+            """UPDATE jobs SET status = 'succeeded', lease_until = NULL, result = ?, updated_ts = ?
+               WHERE id = ? AND worker = ? AND status = 'running'""",
+            (json.dumps(result), int(time.time()), job["id"], job["worker"]),
+        )
+    if not cur.rowcount:
+        logger.warning(f"Job {job['id']} finished on {job['worker']} after its lease was taken over; result dropped")
+    return cur.rowcount > 0
+
+
+def fail(conn: sqlite3.Connection, job: Dict[str, Any], error: str) -> Optional[str]:
+    """Reschedule with exponential backoff, or dead-letter once attempts run out.
+
+    Returns the new status, or None if the lease was lost to another worker.
+    """
+    now = int(time.time())
+    if job["attempt"] >= job["max_attempts"]:
+        status, run_after = "dead", now
+    else:
+        status = "queued"
+        run_after = now + min(JOB_RETRY_BASE * 2 ** (job["attempt"] - 1), JOB_RETRY_MAX)
+    with conn:
+        cur = conn.execute(
+            """UPDATE jobs SET status = ?, run_after = ?, lease_until = NULL, last_error = ?,
+                   updated_ts = ? WHERE id = ? AND worker = ? AND status = 'running'""",
+            (status, run_after, error[-2000:], now, job["id"], job["worker"]),
+        )
+    if not cur.rowcount:
+        logger.warning(f"Job {job['id']} failed on {job['worker']} after its lease was taken over; ignored")
+        return None
+    return status
+
+
+def retry_dead(conn: sqlite3.Connection, job_id: int) -> bool:
+    """Put a dead-lettered job back on the queue with a fresh attempt budget"""
+    now = int(time.time())
+    with conn:
+        cur = conn.execute(
+            """UPDATE jobs SET status = 'queued', attempts = 0, run_after = ?, updated_ts = ?
+               WHERE id = ? AND status = 'dead'""",
+            (now, now, job_id),
+        )
+    return cur.rowcount > 0
+
+
+def list_jobs(conn: sqlite3.Connection, status: Optional[str] = None, limit: int = 50):
+    cur = conn.execute(
+        f"""SELECT id, kind, status, attempts, max_attempts, run_after, worker, last_error, updated_ts
+            FROM jobs {'WHERE status = ?' if status else ''} ORDER BY id DESC LIMIT ?""",
+        (status, limit) if status else (limit,),
+    )
+    cols = [c[0] for c in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
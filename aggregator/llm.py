@@ -1,29 +1,316 @@
 """Unified interface for Ollama & Groq"""
 from __future__ import annotations
 import requests, os
-from .config import OLLAMA_URL, OLLAMA_MODEL, GROQ_API_KEY, GROQ_MODEL, GEMINI_API_KEY, GEMINI_MODEL
+from .config import (OLLAMA_URL, OLLAMA_CHAT_URL, OLLAMA_MODEL, GROQ_API_KEY, GROQ_MODEL, GROQ_API_URL, GEMINI_API_KEY,
+                     GEMINI_MODEL, GEMINI_API_URL, LLM_LIMITS, LLM_RATE_LIMIT_RETRIES, LLM_LATENCY_SPIKE,
+                     LLM_TIMEOUTS, LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, LLM_DEGRADED_ERROR_RATE,
+                     LLM_DEGRADED_LATENCY, LLM_HEDGE_AFTER, LLM_BATCH_CONCURRENCY, OLLAMA_KEEP_ALIVE)
+from .timing import span
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import contextvars
 import logging
+import threading
+import time
 import traceback
 
 logger = logging.getLogger(__name__)
 
+
+class RateLimited(Exception):
+    """The provider answered 429; `retry_after` is its hint in seconds, if any"""
+
+    def __init__(self, backend: str, retry_after: float = None):
+        super().__init__(f"{backend} rate limited")
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    """The backend's circuit breaker is open (or its half-open probe is taken)"""
+
+
+class HedgeAbandoned(Exception):
+    """The other request of a hedged call answered first; this one gave up before sending"""
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth; 0 = unlimited"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0):
+        """Block until `n` units are available and take them"""
+        if not self.rate:
+            return
+        n = min(n, self.capacity)  # a request bigger than the bucket waits for a full one
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.level >= n:
+                    self.level -= n
+                    return
+                wait = (n - self.level) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider said we are over its limit"""
+        with self.lock:
+            self.level = 0.0
+            self.updated = time.monotonic()
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls: +1/limit per success, halved on 429s, errors and latency spikes"""
+
+    def __init__(self, initial: int, maximum: int):
+        self.limit = float(max(1, initial))
+        self.maximum = max(1, maximum)
+        self.in_flight = 0
+        self.latency = None  # EWMA of successful call latency, seconds
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float = None, throttled: bool = False, failed: bool = False):
+        """`failed`: the call errored or timed out, which for an overloaded backend is
+        the same signal as a 429"""
+        with self.cond:
+            self.in_flight -= 1
+            spike = latency is not None and self.latency is not None and latency > LLM_LATENCY_SPIKE * self.latency
+            if throttled or failed or spike:
+                self.limit = max(1.0, self.limit / 2)
+            elif latency is not None:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            if latency is not None and not throttled:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self.cond.notify_all()
+
+
+class BackendLimiter:
+    """Requests/min and tokens/min buckets plus adaptive concurrency for one backend"""
+
+    def __init__(self, rpm: int, tpm: int, concurrency: int, max_concurrency: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AdaptiveConcurrency(concurrency, max_concurrency)
+
+    @contextmanager
+    def slot(self, tokens: int, abandoned: Optional[threading.Event] = None):
+        """`abandoned`: set once a hedged call is decided, so a loser still waiting here
+        gives up without spending requests or tokens, and its errors are not held against the backend"""
+        self.concurrency.acquire()
+        latency, throttled, failed = None, False, False
+        try:
+            for bucket, units in ((self.requests, 1), (self.tokens, tokens)):
+                if abandoned is not None and abandoned.is_set():
+                    raise HedgeAbandoned()
+                bucket.acquire(units)
+            started = time.monotonic()
+            yield
+            latency = time.monotonic() - started
+        except RateLimited:
+            throttled = True
+            self.requests.drain()
+            raise
+        except Exception:
+            # Timeouts, connection errors, 5xx: back off just as for a 429
+            failed = abandoned is None or not abandoned.is_set()
+            raise
+        finally:
+            self.concurrency.release(latency, throttled, failed)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(backend: str) -> BackendLimiter:
+    """Process-wide limiter of `backend`, shared by every LLM instance"""
+    with _limiters_lock:
+        if backend not in _limiters:
+            _limiters[backend] = BackendLimiter(**LLM_LIMITS[backend])
+        return _limiters[backend]
+
+
+class BackendHealth:
+    """Circuit breaker plus latency/error statistics for one backend.
+
+    closed: calls go through. After LLM_BREAKER_FAILURES consecutive failures the
+    circuit opens and the backend is skipped for LLM_BREAKER_COOLDOWN seconds;
+    then it is half-open and a single probe call decides whether it closes again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0           # consecutive
+        self.opened_at = 0.0
+        self.probing = False
+        self.latency = None         # EWMA of successful calls, seconds
+        self.error_rate = 0.0       # EWMA of failures (0..1)
+        self.lock = threading.Lock()
+
+    def _refresh(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= LLM_BREAKER_COOLDOWN:
+            self.state = "half_open"
+
+    def available(self) -> bool:
+        """Would a call be let through now? (Does not claim the half-open probe.)"""
+        with self.lock:
+            self._refresh()
+            return self.state == "closed" or (self.state == "half_open" and not self.probing)
+
+    def allow(self) -> bool:
+        """May a call go to this backend now? Claims the probe when half-open."""
+        with self.lock:
+            self._refresh()
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self, latency: float):
+        with self.lock:
+            if self.state != "closed":
+                logger.info(f"{self.name} circuit closed")
+            self.state, self.failures, self.probing = "closed", 0, False
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self.error_rate *= 0.8
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            self.error_rate = 0.8 * self.error_rate + 0.2
+            self.probing = False
+            if self.state == "half_open" or self.failures >= LLM_BREAKER_FAILURES:
+                if self.state != "open":
+                    logger.warning(f"{self.name} circuit open for {LLM_BREAKER_COOLDOWN:.0f}s")
+                self.state, self.opened_at = "open", time.monotonic()
+
+    def release(self):
+        """Give back a half-open probe that ended without a verdict (e.g. rate limited)"""
+        with self.lock:
+            self.probing = False
+
+    @property
+    def degraded(self) -> bool:
+        return self.error_rate > LLM_DEGRADED_ERROR_RATE or (self.latency or 0) > LLM_DEGRADED_LATENCY
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "latency_s": None if self.latency is None else round(self.latency, 3),
+            "degraded": self.degraded,
+        }
+
+
+_health = {}
+
+
+def health(backend: str) -> BackendHealth:
+    """Process-wide health of `backend`, shared by every LLM instance"""
+    with _limiters_lock:
+        if backend not in _health:
+            _health[backend] = BackendHealth(backend)
+        return _health[backend]
+
+
+def health_snapshot() -> dict:
+    return {backend: health(backend).snapshot() for backend in _FALLBACKS}
+
+
+def route(primary: str) -> list:
+    """Backends to try for a call configured with `primary`, best first.
+
+    Keeps the preference order of the fallback chain but moves open circuits to
+    the end and degraded backends (high error rate or latency) behind healthy ones.
+    """
+    chain = _FALLBACKS[primary]
+    return sorted(chain, key=lambda b: (not health(b).available(), health(b).degraded, chain.index(b)))
+
+
+# Threads for hedged calls; a loser already sent runs to completion and is discarded
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+def _raise_for_status(backend: str, r: requests.Response):
+    if r.status_code == 429:
+        retry_after = r.headers.get("Retry-After")
+        raise RateLimited(backend, float(retry_after) if retry_after and retry_after.isdigit() else None)
+    r.raise_for_status()
+
+
+@dataclass
+class Generation:
+    """Result of one prompt of `LLM.generate_many`"""
+    text: str = ""
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class LLM:
     def __init__(self, backend: str = "gemini"):
         assert backend in {"ollama", "groq", "gemini"}
         self.backend = backend
 
-    def _generate_ollama(self, prompt: str, max_tokens: int = 512) -> str:
+    def _generate_ollama(self, prompt: str, max_tokens: int = 512, prefix: Optional[str] = None) -> str:
+        if prefix:
+            return self._chat_ollama(prefix, prompt, max_tokens)
         payload = {
             "model": OLLAMA_MODEL,
             "prompt": prompt,
             "stream": False,
             "options": {"num_predict": max_tokens},
+            # Keep the model loaded between calls instead of reloading it for every prompt
+            "keep_alive": OLLAMA_KEEP_ALIVE,
         }
-        r = requests.post(OLLAMA_URL, json=payload, timeout=600)
-        r.raise_for_status()
+        r = requests.post(OLLAMA_URL, json=payload, timeout=LLM_TIMEOUTS["ollama"])
+        _raise_for_status("ollama", r)
         return r.json().get("response", "")
 
-    def _generate_groq(self, prompt: str, max_tokens: int = 512) -> str:
+    def _chat_ollama(self, prefix: str, prompt: str, max_tokens: int) -> str:
+        """Prefix as the system message: every call with the same prefix starts with the
+        same tokens, so Ollama's runner reuses their KV cache and only evaluates `prompt`."""
+        payload = {
+            "model": OLLAMA_MODEL,
+            "messages": [
+                {"role": "system", "content": prefix},
+                {"role": "user", "content": prompt},
+            ],
+            "stream": False,
+            "options": {"num_predict": max_tokens},
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+        }
+        r = requests.post(OLLAMA_CHAT_URL, json=payload, timeout=LLM_TIMEOUTS["ollama"])
+        _raise_for_status("ollama", r)
+        body = r.json()
+        logger.debug(f"[LLM] ollama prompt_eval_count={body.get('prompt_eval_count')}")
+        return body.get("message", {}).get("content", "")
+
+    def _generate_groq(self, prompt: str, max_tokens: int = 512, prefix: Optional[str] = None) -> str:
+        if prefix:
+            prompt = f"{prefix}\n\n{prompt}"
         if not GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not set")
             
@@ -49,29 +336,35 @@ class LLM:
             ],
             "max_tokens": max_tokens,
         }
-        r = requests.post("https://api.groq.com/openai/v1/chat/completions", json=data, headers=headers, timeout=600)
-        r.raise_for_status()
+        r = requests.post(GROQ_API_URL, json=data, headers=headers, timeout=LLM_TIMEOUTS["groq"])
+        _raise_for_status("groq", r)
         return r.json()["choices"][0]["message"]["content"].strip()
 
-    def _generate_gemini(self, prompt: str, max_tokens: int = 512) -> str:
+    def _generate_gemini(self, prompt: str, max_tokens: int = 512, prefix: Optional[str] = None) -> str:
+        if prefix:
+            prompt = f"{prefix}\n\n{prompt}"
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set")
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+        url = f"{GEMINI_API_URL}/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
         headers = {"Content-Type": "application/json"}
         data = {
             "contents": [{"parts": [{"text": prompt}]}],
             "generationConfig": {"maxOutputTokens": max_tokens}
         }
         try:
-            r = requests.post(url, json=data, headers=headers, timeout=60)
+            r = requests.post(url, json=data, headers=headers, timeout=LLM_TIMEOUTS["gemini"])
             try:
-                r.raise_for_status()
+                _raise_for_status("gemini", r)
+            except RateLimited:
+                raise
             except Exception as e:
                 logger.error(f"Gemini API HTTP error: {repr(e)}\nResponse: {r.text}")
                 raise
             resp = r.json()
             # Gemini API returns candidates[0].content.parts[0].text
             return resp["candidates"][0]["content"]["parts"][0]["text"].strip()
+        except RateLimited:
+            raise
         except Exception as e:
             logger.error(f"Gemini API request failed: {repr(e)}\n{traceback.format_exc()}")
             raise
@@ -87,38 +380,161 @@ class LLM:
 
         Summary:"""
         try:
-            if self.backend == "gemini":
-                try:
-                    return self._generate_gemini(prompt, max_tokens)
-                except Exception as e:
-                    logger.warning(f"Gemini API failed: {repr(e)}\n{traceback.format_exc()}\nFalling back to Groq")
-                    self.backend = "groq"
-            if self.backend == "groq":
-                try:
-                    return self._generate_groq(prompt, max_tokens)
-                except Exception as e:
-                    logger.warning(f"Groq API failed: {repr(e)}\n{traceback.format_exc()}\nFalling back to Ollama")
-                    self.backend = "ollama"
-            return self._generate_ollama(prompt, max_tokens)
+            return self._generate_with_fallback(prompt, max_tokens)
         except Exception as e:
             logger.error(f"Arabic summarization failed: {repr(e)}\n{traceback.format_exc()}")
             return f"Error generating Arabic summary: {str(e)}"
 
-    def generate(self, prompt: str, max_tokens: int = 512) -> str:
+    def generate(self, prompt: str, max_tokens: int = 512, prefix: Optional[str] = None) -> str:
+        """`prefix`: stable instructions shared by many calls, sent ahead of `prompt`
+        so backends with prompt caching (Ollama's KV cache) evaluate it only once"""
+        with span("llm"):
+            return self._generate(prompt, max_tokens, prefix)
+
+    def generate_many(self, prompts: Sequence[str], max_tokens: int = 512,
+                      concurrency: Optional[int] = None, prefix: Optional[str] = None) -> List[Generation]:
+        """Run independent prompts concurrently; results come back in prompt order.
+
+        At most `concurrency` (default LLM_BATCH_CONCURRENCY[backend]) prompts are in
+        flight; the backend limiters still apply on top. A failed prompt yields a
+        Generation with `error` set and does not affect the others. `prefix` is
+        shared by every prompt, as in `generate`.
+        """
+        if not prompts:
+            return []
+        workers = max(1, min(len(prompts), concurrency or LLM_BATCH_CONCURRENCY[self.backend]))
+        with span("llm"), ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as pool:
+            # Each prompt runs in a copy of the caller's context (request timing, ...)
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._generate_one, prompt, max_tokens, prefix)
+                for prompt in prompts
+            ]
+            results = [f.result() for f in futures]
+        failed = sum(not r.ok for r in results)
+        logger.info(f"[LLM] Batch of {len(prompts)} prompts on {self.backend}: {failed} failed, "
+                    f"slowest {max(r.seconds for r in results):.1f}s")
+        return results
+
+    def _generate_one(self, prompt: str, max_tokens: int, prefix: Optional[str]) -> Generation:
+        started = time.monotonic()
+        try:
+            text = self._generate_with_fallback(prompt, max_tokens, prefix)
+            return Generation(text=text, seconds=time.monotonic() - started)
+        except Exception as e:
+            logger.warning(f"[LLM] Batch prompt failed: {repr(e)}")
+            return Generation(error=repr(e), seconds=time.monotonic() - started)
+
+    def _generate(self, prompt: str, max_tokens: int = 512, prefix: Optional[str] = None) -> str:
         try:
-            if self.backend == "gemini":
-                try:
-                    return self._generate_gemini(prompt, max_tokens)
-                except Exception as e:
-                    logger.warning(f"Gemini API failed: {repr(e)}\n{traceback.format_exc()}\nFalling back to Groq")
-                    self.backend = "groq"
-            if self.backend == "groq":
-                try:
-                    return self._generate_groq(prompt, max_tokens)
-                except Exception as e:
-                    logger.warning(f"Groq API failed: {repr(e)}\n{traceback.format_exc()}\nFalling back to Ollama")
-                    self.backend = "ollama"
-            return self._generate_ollama(prompt, max_tokens)
+            return self._generate_with_fallback(prompt, max_tokens, prefix)
         except Exception as e:
             logger.error(f"Generation failed: {repr(e)}\n{traceback.format_exc()}")
-            return f"Error generating response: {str(e)}" 
\ No newline at end of file
+            return f"Error generating response: {str(e)}"
+
+    def _generate_with_fallback(self, prompt: str, max_tokens: int, prefix: Optional[str] = None) -> str:
+        # Falls back for this call only; the instance keeps its configured backend
+        order = route(self.backend)
+        candidates = [b for b in order if health(b).available()]
+        if not candidates:
+            # Every circuit is open: try the best one anyway rather than fail outright
+            return self._tracked_call(order[0], prompt, max_tokens, prefix, force=True)
+        if LLM_HEDGE_AFTER > 0 and len(candidates) > 1:
+            try:
+                return self._hedged(candidates[0], candidates[1], prompt, max_tokens, prefix)
+            except Exception as e:
+                if len(candidates) == 2:
+                    raise
+                logger.warning(f"Hedged {candidates[0]}/{candidates[1]} call failed: {repr(e)}")
+                candidates = candidates[2:]
+        for i, backend in enumerate(candidates):
+            try:
+                return self._tracked_call(backend, prompt, max_tokens, prefix)
+            except Exception as e:
+                if i == len(candidates) - 1:
+                    raise
+                logger.warning(f"{backend} API failed: {repr(e)}\nFalling back to {candidates[i + 1]}")
+
+    def _hedged(self, first: str, second: str, prompt: str, max_tokens: int, prefix: Optional[str]) -> str:
+        """Start `second` too if `first` has not answered within LLM_HEDGE_AFTER; first success wins.
+
+        Once decided, a loser still queued is cancelled and one waiting for its rate
+        limiter gives up; one already sent finishes without counting as a backend error.
+        """
+        abandoned = threading.Event()
+
+        def submit(backend: str):
+            # Each request runs in a copy of the caller's context, so its spans land in the caller's timings
+            return _hedge_pool.submit(contextvars.copy_context().run, self._tracked_call,
+                                      backend, prompt, max_tokens, prefix, False, abandoned)
+
+        pending = {submit(first)}
+        try:
+            done, pending = wait(pending, timeout=LLM_HEDGE_AFTER)
+            if not done:
+                logger.info(f"{first} slower than {LLM_HEDGE_AFTER}s, hedging with {second}")
+                pending.add(submit(second))
+            else:
+                # `first` already answered or failed; `second` only runs if it failed
+                future = done.pop()
+                if future.exception() is None:
+                    return future.result()
+                pending = {submit(second)}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            abandoned.set()
+            for future in pending:
+                future.cancel()
+
+    def _tracked_call(self, backend: str, prompt: str, max_tokens: int, prefix: Optional[str] = None,
+                      force: bool = False, abandoned: Optional[threading.Event] = None) -> str:
+        """`_call` gated by the backend's circuit breaker, feeding its latency/error statistics"""
+        if not health(backend).allow() and not force:
+            raise CircuitOpen(f"{backend} circuit open")
+        started = time.monotonic()
+        try:
+            result = self._call(backend, prompt, max_tokens, prefix, abandoned)
+        except RateLimited:
+            # Throttled, not broken: the limiter handles it, the circuit stays as it is
+            health(backend).release()
+            raise
+        except Exception:
+            if abandoned is not None and abandoned.is_set():
+                # Lost a hedge: nobody waits for this answer, so its error (often our own
+                # timeout) says nothing about the backend
+                health(backend).release()
+            else:
+                health(backend).failure()
+            raise
+        health(backend).success(time.monotonic() - started)
+        return result
+
+    def _call(self, backend: str, prompt: str, max_tokens: int, prefix: Optional[str] = None,
+              abandoned: Optional[threading.Event] = None) -> str:
+        """One backend call through its rate limiter; 429s are retried, not fallen back on"""
+        generate = getattr(self, f"_generate_{backend}")
+        # Providers count the prompt plus the requested completion against tokens/min
+        tokens = (len(prefix or "") + len(prompt)) // 4 + max_tokens
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            try:
+                with limiter(backend).slot(tokens, abandoned):
+                    return generate(prompt, max_tokens, prefix)
+            except RateLimited as e:
+                if attempt == LLM_RATE_LIMIT_RETRIES or (abandoned is not None and abandoned.is_set()):
+                    raise
+                wait = min(e.retry_after or 2 ** attempt, 30)
+                logger.info(f"{backend} rate limited, retrying in {wait:.0f}s")
+                time.sleep(wait)
+
+
+_FALLBACKS = {
+    "gemini": ("gemini", "groq", "ollama"),
+    "groq": ("groq", "ollama"),
+    "ollama": ("ollama",),
+}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, LargeBinary, Index, ForeignKey, UniqueConstraint
 
 from .database import Base
 
@@ -10,7 +10,56 @@ class Subscriber(Base):
     email = Column(String, unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
     subscribed_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_email_sent = Column(DateTime, nullable=True)
 
     def __repr__(self):
-        return f"<Subscriber {self.email}>" 
\ No newline at end of file
+        return f"<Subscriber {self.email}>"
+
+
+class Article(Base):
+    """ORM view of the `articles` table written by the scraper (see database.SCHEMA).
+
+    Ingest and retrieval use the raw sqlite3 helpers in database.py; this mapping
+    exists so Alembic knows the table and for ad-hoc ORM queries.
+    """
+    __tablename__ = "articles"
+    __table_args__ = (
+        Index("idx_date", "published_ts"),
+        Index("idx_source", "source"),
+        Index("idx_recent", "source_type", "published_ts", "source", "title", "url", "author"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    source = Column(Text)
+    title = Column(Text)
+    author = Column(Text)
+    published_ts = Column(Integer)
+    url = Column(Text, unique=True)
+    content = Column(Text)  # legacy rows only, see ArticleBody
+    embedding = Column(LargeBinary)
+    source_type = Column(Text, nullable=False, default="news", server_default="news")
+
+    def __repr__(self):
+        return f"<Article {self.url}>"
+
+
+class ArticleBody(Base):
+    """Compressed article body (see compression.py), kept apart from the metadata row"""
+    __tablename__ = "article_bodies"
+
+    article_id = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    codec = Column(Text, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+
+
+class Passage(Base):
+    """Passage index entry (see passages.py): offsets into the article body plus its embedding"""
+    __tablename__ = "passages"
+    __table_args__ = (UniqueConstraint("article_id", "start_char"),)
+
+    id = Column(Integer, primary_key=True)
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=False)
+    start_char = Column(Integer, nullable=False)
+    end_char = Column(Integer, nullable=False)
+    embedding = Column(LargeBinary)
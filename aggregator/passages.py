@@ -0,0 +1,114 @@
+"""Passage index: articles split into paragraph/sentence-group passages, each embedded.
+
+MiniLM only sees the first 256 tokens of whatever it encodes, so a whole-article
+embedding of a long newsletter says nothing about its later sections. At ingest
+every body is also cut into passages of at most PASSAGE_TOKENS tokens, stored in
+the `passages` table as character offsets into the body plus a normalized
+embedding; `retrieval.retrieve_passages` searches them.
+
+    python -m aggregator.passages      # index articles stored before passages existed
+"""
+from __future__ import annotations
+import logging
+import re
+from typing import Iterator, List, Tuple
+import numpy as np
+from .config import PASSAGE_TOKENS, MIN_PASSAGE_TOKENS
+from .embeddings import get_model
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    if not texts:
+        return []
+    ids = get_model().tokenizer(texts, add_special_tokens=False)["input_ids"]
+    return [len(i) for i in ids]
+
+
+def _segments(text: str, pattern: re.Pattern, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Non-blank spans of text[start:end] between matches of `pattern`, whitespace trimmed"""
+    for m in list(pattern.finditer(text, start, end)) + [None]:
+        stop = m.start() if m else end
+        s, e = start, stop
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            yield s, e
+        if m:
+            start = m.end()
+
+
+def passage_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) character offsets of the passages of `text`.
+
+    Paragraphs are passages; paragraphs over PASSAGE_TOKENS become groups of sentences.
+    """
+    text = text or ""
+    paragraphs = list(_segments(text, _PARAGRAPH_BREAK, 0, len(text)))
+    spans = []
+    for (ps, pe), n in zip(paragraphs, count_tokens([text[s:e] for s, e in paragraphs])):
+        if n <= PASSAGE_TOKENS:
+            spans.append((ps, pe))
+            continue
+        sentences = list(_segments(text, _SENTENCE_END, ps, pe))
+        group_start = group_end = None
+        group_n = 0
+        for (s, e), m in zip(sentences, count_tokens([text[s:e] for s, e in sentences])):
+            if group_start is not None and group_n + m > PASSAGE_TOKENS:
+                spans.append((group_start, group_end))
+                group_start, group_n = None, 0
+            if group_start is None:
+                group_start = s
+            group_end = e
+            group_n += m
+        if group_start is not None:
+            spans.append((group_start, group_end))
+    return spans
+
+
+def embed_article(text: str) -> Tuple[bytes, List[Tuple[int, int, bytes]]]:
+    """Article embedding plus (start, end, embedding) of every passage, in one encode call.
+
+    Runs in the ingest embedding pool. Passage embeddings are normalized, so search
+    can use plain dot products.
+    """
+    spans = passage_spans(text)
+    spans = [span for span, n in zip(spans, count_tokens([text[s:e] for s, e in spans]))
+             if n >= MIN_PASSAGE_TOKENS]
+    vecs = get_model().encode([text] + [text[s:e] for s, e in spans], convert_to_numpy=True)
+    vecs = vecs.astype(np.float32)
+    passages = vecs[1:] / np.maximum(np.linalg.norm(vecs[1:], axis=1, keepdims=True), 1e-12)
+    return vecs[0].tobytes(), [(s, e, v.tobytes()) for (s, e), v in zip(spans, passages)]
+
+
+def backfill(batch: int = 64) -> int:
+    """Index the passages of SQLite articles that have none; returns articles indexed"""
+    from .database import connect, articles_without_passages, fetch_articles_by_id, insert_passages
+    conn = connect()
+    done = 0
+    while True:
+        ids = articles_without_passages(conn, batch)
+        if not ids:
+            return done
+        articles = fetch_articles_by_id(conn, ids)
+        rows = []
+        for article_id in ids:
+            content = articles[article_id][2] or ""
+            _, passages = embed_article(content)
+            # An empty body still gets a zero-length row, so it is not picked up again
+            rows.extend((article_id, s, e, v) for s, e, v in passages or [(0, 0, None)])
+        with conn:
+            insert_passages(conn, rows)
+        done += len(ids)
+        logger.info(f"Indexed passages of {done} articles")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Indexed passages of {backfill()} articles")
@@ -61,4 +61,30 @@ SUMMARY_TMPL = textwrap.dedent("""
     8. Add relevant emojis for visual organization
 
     Note: Focus on concrete developments and verifiable facts. Avoid speculation or unsubstantiated claims.
-""") 
\ No newline at end of file
+""") 
+# Map-step prompts are split into a stable prefix, identical for every call (sent
+# first, so Ollama reuses its KV cache), and a suffix holding what changes per call.
+ANSWER_PREFIX = textwrap.dedent("""
+    You are an expert AI news analyst. Given the articles below, answer the user's question in detail, synthesizing information from all relevant articles. Dive deep into the content and provide thorough explanations. Do NOT reference, cite, or mention any article titles, sources, or URLs in your answer.
+
+    Answer in Arabic.
+""").strip()
+
+ANSWER_SUFFIX = textwrap.dedent("""
+    Articles:
+    {articles}
+
+    Question:
+    {question}
+
+    Detailed, content-rich answer (with as much detail as possible):
+""").strip()
+
+SUMMARY_MAP_PREFIX = textwrap.dedent("""
+    Summarize the following AI news articles from the past week.
+
+    Write detailed bullet points for each major highlight, insight, or development.
+    Do NOT include source citations or URLs.
+""").strip()
+
+SUMMARY_MAP_SUFFIX = "News Content:\n{content}\n"
@@ -1,11 +1,15 @@
 from __future__ import annotations
-from .retrieval import retrieve, sort_by_source_priority
-from .prompts import CHAT_TMPL, SUMMARY_TMPL
+from .retrieval import retrieve_passages, sort_by_source_priority
+from .prompts import CHAT_TMPL, SUMMARY_TMPL, ANSWER_PREFIX, ANSWER_SUFFIX, SUMMARY_MAP_PREFIX, SUMMARY_MAP_SUFFIX
 from .llm import LLM
-from .database import connect, fetch_recent
+from .database import connect_readonly, latest_summary
+from .storage import get_storage
+from .config import SUMMARY_MAX_AGE, SUMMARY_ARTICLE_TOKENS
+from .context import pack, budget_for
+from .timing import span
 import datetime
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from collections import defaultdict
 import os
 
@@ -19,7 +23,7 @@ Title: {article["title"]}
 Source: {article["source"]}
 Date: {date}
 Author: {article["author"] or "Unknown"}
-Content: {article["content"][:2000]}...
+Content: {article["content"]}
 URL: {article["url"]}
 """
 
@@ -39,42 +43,37 @@ def answer(question: str, backend: str = None) -> str:
     backend = backend or os.getenv("LLM_BACKEND", "gemini")
     try:
         # Get relevant articles
-        matches = retrieve(question)
+        matches = retrieve_passages(question)
         logger.info(f"[QA] Retrieved {len(matches)} articles for question: {question}")
         for art in matches:
             logger.info(f"[QA] Article: {art.get('title')} | ts={art.get('timestamp')} | url={art.get('url')}")
         if not matches:
             return "عذراً، لم أجد أي مقالات ذات صلة بسؤالك. يرجى المحاولة مرة أخرى لاحقاً أو طرح سؤال مختلف."
 
-        # --- Map step: Summarize/analyze in chunks ---
-        chunk_size = 2  # You can adjust this for your LLM's context window
-        chunk_analyses = []
-        for i in range(0, len(matches), chunk_size):
-            chunk = matches[i:i+chunk_size]
-            chunk_articles = "\n---\n".join(format_article_for_context(article) for article in chunk)
-            chunk_prompt = f"""
-You are an expert AI news analyst. Given the following articles, answer the user's question in detail, synthesizing information from all relevant articles. Dive deep into the content and provide thorough explanations. Do NOT reference, cite, or mention any article titles, sources, or URLs in your answer.
-
-Articles:
-{chunk_articles}
-
-Question:
-{question}
-
-Detailed, content-rich answer (with as much detail as possible):
-
-Answer in Arabic."
-"""
-            chunk_analysis = LLM(backend).generate(chunk_prompt, max_tokens=900)
-            chunk_analyses.append(chunk_analysis.strip())
+        # The passages most relevant to the question, packed into one call's token budget
+        with span("retrieval"):
+            chunks = pack(matches, budget_for(backend), _context_header, query=question)
+        chunk_prompts = [
+            ANSWER_SUFFIX.format(
+                articles="\n---\n".join(format_article_for_context(article) for article in chunk),
+                question=question,
+            )
+            for chunk in chunks
+        ]
+        results = LLM(backend).generate_many(chunk_prompts, max_tokens=900, prefix=ANSWER_PREFIX)
+        if not any(r.ok for r in results):
+            raise RuntimeError(f"every answer prompt failed: {results[0].error if results else 'no context'}")
 
         # --- Reduce step: Aggregate all chunk analyses ---
-        all_chunk_analyses = "\n\n".join(chunk_analyses)
+        all_chunk_analyses = "\n\n".join(r.text.strip() for r in results if r.ok)
         return all_chunk_analyses
     except Exception as e:
         logger.error(f"[QA] Error generating answer: {str(e)}")
         return "عذراً، حدث خطأ في إنشاء الإجابة. يرجى المحاولة مرة أخرى."
 
+def _context_header(article: Dict[str, Any]) -> str:
+    return format_article_for_context({**article, "content": ""})
+
 def format_article_for_summary(article: Dict[str, Any]) -> str:
     """Format an article for the summary section"""
     return f"""• {article["title"]}
@@ -102,58 +101,75 @@ def ensure_source_diversity(articles: List[Dict[str, Any]], max_per_source: int
 def summary_today(backend: str = None) -> str:
     backend = backend or os.getenv("LLM_BACKEND", "gemini")
     try:
-        # Get articles from the last 7 days (debugging window)
-        conn = connect()
-        rows = fetch_recent(conn, days=7)
-        logger.info(f"[QA] Fetched {len(rows)} articles for the last 7 days summary.")
-        for row in rows:
-            logger.info(f"[QA] Summary Article: {row[1]} | ts={row[4]} | url={row[5]}")
-        if not rows:
+        # Served from the summaries table when the worker has materialized a recent one
+        with span("db"):
+            summary = latest_summary(connect_readonly(), backend, SUMMARY_MAX_AGE)
+        if summary:
+            return summary
+        summary = build_summary(backend)
+        if summary is None:
             return "لم يتم العثور على أخبار للأيام الماضية. يرجى المحاولة لاحقاً."
-            
-        # Convert rows to article dictionaries
-        articles = [
-            {
-                "source": src,
-                "title": title,
-                "content": content,
-                "timestamp": ts,
-                "url": url,
-                "author": author
-            }
-            for src, title, content, _, ts, url, author in rows
-        ]
-        
-        # Sort by source priority first
-        articles = sort_by_source_priority(articles)
-        
-        # Ensure source diversity
-        articles = ensure_source_diversity(articles)
-        
-        # --- Map step: Summarize in chunks ---
-        chunk_size = 2  # You can adjust this for your LLM's context window
-        chunk_summaries = []
-        for i in range(0, len(articles), chunk_size):
-            chunk = articles[i:i+chunk_size]
-            chunk_content = "\n\n".join(f"{a['title']}\n{a['content'][:2000]}" for a in chunk)
-            chunk_prompt = f"""Summarize the following AI news articles from the past week.\n\nWrite detailed bullet points for each major highlight, insight, or development.\nDo NOT include source citations or URLs.\n\nNews Content:\n{chunk_content}\n\nWrite the summary in Arabic."""
-            chunk_summary = LLM(backend).generate(chunk_prompt, max_tokens=700)
-            chunk_summaries.append(chunk_summary.strip())
-        
-        # --- Reduce step: Aggregate all chunk summaries ---
-        all_chunk_summaries = "\n\n".join(chunk_summaries)
-        today = datetime.date.today().isoformat()
-        final_prompt = f"""WEEKLY AI NEWS SUMMARY - {today}\n\nRead the following summaries of AI news from the past 7 days.\n\n- Write at least 20 detailed bullet points, each covering a distinct news highlight, insight, or development.\n- Each bullet point should be detailed and reflect the depth of the news, not just headlines.\n- Cover all major topics, trends, and events.\n- Do NOT include source citations or URLs.\n- The summary should be comprehensive and easy to scan.\n- Write the summary in Arabic.\n\nChunk Summaries:\n{all_chunk_summaries}\n"""
-        summary = LLM(backend).generate(final_prompt, max_tokens=1800)
         if not summary or summary.isspace():
             return "عذراً، حدث خطأ في إنشاء الملخص. يرجى المحاولة مرة أخرى."
-        
-        # Ensure proper markdown formatting
-        if not summary.startswith("WEEKLY AI NEWS SUMMARY"):
-            summary = f"WEEKLY AI NEWS SUMMARY - {today}\n\n{summary}"
-            
         return summary
-        
+
     except Exception as e:
         logger.error(f"[QA] Error generating summary: {str(e)}")
-        return "عذراً، حدث خطأ في إنشاء الملخص. يرجى المحاولة مرة أخرى." 
\ No newline at end of file
+        return "عذراً، حدث خطأ في إنشاء الملخص. يرجى المحاولة مرة أخرى."
+
+def build_summary(backend: str) -> Optional[str]:
+    """Generate the weekly summary; None if there are no articles. Errors propagate."""
+    # Get articles from the last 7 days (debugging window)
+    with span("db"):
+        rows = get_storage().fetch_recent(days=7, source_type="news")
+    logger.info(f"[QA] Fetched {len(rows)} articles for the last 7 days summary.")
+    for row in rows:
+        logger.info(f"[QA] Summary Article: {row[1]} | ts={row[3]} | url={row[4]}")
+    if not rows:
+        return None
+
+    # Convert rows to article dictionaries
+    articles = [
+        {
+            "source": src,
+            "title": title,
+            "content": content,
+            "timestamp": ts,
+            "url": url,
+            "author": author
+        }
+        for src, title, content, ts, url, author in rows
+    ]
+
+    # Sort by source priority first
+    articles = sort_by_source_priority(articles)
+
+    # Ensure source diversity
+    articles = ensure_source_diversity(articles)
+
+    # --- Map step: Summarize in chunks, each filling the backend's token budget ---
+    chunks = pack(articles, budget_for(backend), lambda a: a["title"], article_budget=SUMMARY_ARTICLE_TOKENS)
+    chunk_prompts = [
+        SUMMARY_MAP_SUFFIX.format(content="\n\n".join(f"{a['title']}\n{a['content']}" for a in chunk))
+        for chunk in chunks
+    ]
+    llm = LLM(backend)
+    results = llm.generate_many(chunk_prompts, max_tokens=700, prefix=f"{SUMMARY_MAP_PREFIX}\nWrite the summary in Arabic.")
+    # A failed map prompt drops its chunk; the summary fails only if all of them did
+    chunk_summaries = [r.text.strip() for r in results if r.ok]
+    if not chunk_summaries:
+        raise RuntimeError(f"every summary map prompt failed: {results[0].error if results else 'no articles packed'}")
+
+    # --- Reduce step: Aggregate all chunk summaries ---
+    all_chunk_summaries = "\n\n".join(chunk_summaries)
+    today = datetime.date.today().isoformat()
+    final_prompt = f"""WEEKLY AI NEWS SUMMARY - {today}\n\nRead the following summaries of AI news from the past 7 days.\n\n- Write at least 20 detailed bullet points, each covering a distinct news highlight, insight, or development.\n- Each bullet point should be detailed and reflect the depth of the news, not just headlines.\n- Cover all major topics, trends, and events.\n- Do NOT include source citations or URLs.\n- The summary should be comprehensive and easy to scan.\n- Write the summary in Arabic.\n\nChunk Summaries:\n{all_chunk_summaries}\n"""
+    summary = llm.generate(final_prompt, max_tokens=1800)
+    if not summary or summary.isspace():
+        return summary
+
+    # Ensure proper markdown formatting
+    if not summary.startswith("WEEKLY AI NEWS SUMMARY"):
+        summary = f"WEEKLY AI NEWS SUMMARY - {today}\n\n{summary}"
+
+    return summary
\ No newline at end of file
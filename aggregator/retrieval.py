@@ -1,10 +1,10 @@
 from __future__ import annotations
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Tuple, Dict, Any
-from .database import connect, fetch_all_articles
-from .embeddings import bytes_to_vec, get_model
-from .config import MAX_CONTEXT_ARTICLES, SIM_THRESHOLD
+from .storage import get_storage
+from .embeddings import get_model
+from .config import MAX_CONTEXT_ARTICLES, SIM_THRESHOLD, PASSAGES_PER_ARTICLE, PASSAGE_SEARCH_LIMIT
+from .timing import span
 import logging
 from collections import defaultdict
 
@@ -48,49 +48,26 @@ def sort_by_source_priority(articles: List[Dict[str, Any]]) -> List[Dict[str, An
 
 def retrieve(query: str, k: int = MAX_CONTEXT_ARTICLES) -> List[Dict[str, Any]]:
     """Retrieve relevant articles for a query"""
-    try:
-        # Get all articles
-        conn = connect()
-        rows = fetch_all_articles(conn)
-        if not rows:
-            logger.warning("No articles found in database")
-            return []
+    with span("retrieval"):
+        return _retrieve(query, k)
 
-        # Unpack article data
-        sources, titles, contents, blobs, timestamps, urls, authors = zip(*rows)
-        
-        # Convert embeddings
-        try:
-            vecs = np.vstack([bytes_to_vec(b) for b in blobs])
-        except Exception as e:
-            logger.error(f"Error converting embeddings: {e}")
-            return []
+def _retrieve(query: str, k: int) -> List[Dict[str, Any]]:
+    # Get query embedding
+    try:
+        qv = get_model().encode([query], convert_to_numpy=True)[0]
+    except Exception as e:
+        logger.error(f"Error encoding query: {e}")
+        return []
+    results = retrieve_by_vector(qv, k)
+    logger.info(f"Found {len(results)} relevant articles for query: {query[:50]}...")
+    return results
 
-        # Get query embedding
-        try:
-            qv = get_model().encode([query], convert_to_numpy=True)[0]
-        except Exception as e:
-            logger.error(f"Error encoding query: {e}")
-            return []
+def retrieve_by_vector(qv: np.ndarray, k: int = MAX_CONTEXT_ARTICLES) -> List[Dict[str, Any]]:
+    """Retrieve relevant articles for an already-encoded query"""
+    try:
+        # All matches above threshold (SQLite), or the nearest PG_SEARCH_LIMIT (Postgres)
+        results = get_storage().search(qv, SIM_THRESHOLD)
 
-        # Calculate similarities
-        sims = cosine_similarity([qv], vecs)[0]
-        
-        # Get all matches above threshold
-        results = []
-        for i, sim in enumerate(sims):
-            if sim < SIM_THRESHOLD:
-                continue
-            results.append({
-                "source": sources[i],
-                "title": titles[i],
-                "content": contents[i],
-                "timestamp": timestamps[i],
-                "url": urls[i],
-                "author": authors[i],
-                "similarity": float(sim)
-            })
-        
         # Sort by source priority and similarity
         results = sort_by_source_priority(results)
         
@@ -101,11 +78,61 @@ def retrieve(query: str, k: int = MAX_CONTEXT_ARTICLES) -> List[Dict[str, Any]]:
         source_counts = defaultdict(int)
         for r in results:
             source_counts[r["source"]] += 1
-        logger.info(f"Found {len(results)} relevant articles for query: {query[:50]}...")
         logger.info(f"Source distribution: {dict(source_counts)}")
         
         return results
 
     except Exception as e:
         logger.error(f"Error in retrieval: {e}")
-        return [] 
\ No newline at end of file
+        return []
+
+def retrieve_passages(query: str, k: int = MAX_CONTEXT_ARTICLES, per_article: int = PASSAGES_PER_ARTICLE) -> List[Dict[str, Any]]:
+    """Best passages grouped by article: article dicts whose "content" is only those passages.
+
+    Each result also has "passages" ([{"start", "end", "text", "similarity"}], in body
+    order) and "similarity" of its best passage. Falls back to whole-article retrieval
+    when the passage index has no hits (e.g. articles stored before it existed).
+    """
+    with span("retrieval"):
+        try:
+            qv = get_model().encode([query], convert_to_numpy=True)[0]
+        except Exception as e:
+            logger.error(f"Error encoding query: {e}")
+            return []
+        try:
+            results = _group_passages(qv, k, per_article)
+        except Exception as e:
+            logger.error(f"Error in passage retrieval: {e}")
+            results = []
+        if not results:
+            return retrieve_by_vector(qv, k)
+        logger.info(f"Found passages in {len(results)} articles for query: {query[:50]}...")
+        return results
+
+def _group_passages(qv: np.ndarray, k: int, per_article: int) -> List[Dict[str, Any]]:
+    storage = get_storage()
+    hits = defaultdict(list)
+    for article_id, start, end, sim in storage.search_passages(qv, SIM_THRESHOLD, PASSAGE_SEARCH_LIMIT):
+        if len(hits[article_id]) < per_article:
+            hits[article_id].append((start, end, sim))
+    articles = storage.fetch_articles_by_id(hits)
+    results = []
+    for article_id, passages in hits.items():
+        if article_id not in articles:
+            continue
+        source, title, content, ts, url, author = articles[article_id]
+        passages = [
+            {"start": s, "end": e, "text": (content or "")[s:e], "similarity": sim}
+            for s, e, sim in sorted(passages)
+        ]
+        results.append({
+            "source": source,
+            "title": title,
+            "content": "\n\n".join(p["text"] for p in passages),
+            "timestamp": ts,
+            "url": url,
+            "author": author,
+            "similarity": max(p["similarity"] for p in passages),
+            "passages": passages,
+        })
+    return sort_by_source_priority(results)[:k]
@@ -1,29 +1,48 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from .email_service import send_weekly_digest
+"""Periodic jobs, enqueued on the persistent job queue (see jobs.py / worker.py).
+
+Each occurrence gets a dedupe key naming its period, so every worker can call
+`enqueue_due` on its own and an occurrence is still queued exactly once, even
+across restarts and replicas.
+"""
+from datetime import datetime, timedelta, timezone
+from .config import SCRAPE_INTERVAL_H
+from .jobs import enqueue
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
-def setup_weekly_digest_scheduler():
-    """Set up the scheduler for weekly digest emails."""
-    scheduler = BackgroundScheduler()
-    
-    # Schedule the weekly digest to run at 8:00 AM UTC every Sunday
-    scheduler.add_job(
-        send_weekly_digest,
-        trigger=CronTrigger(day_of_week='sun', hour=8, minute=0),
-        id='weekly_digest',
-        name='Send weekly AI news digest',
-        replace_existing=True
-    )
-    
-    try:
-        scheduler.start()
-        logger.info("Weekly digest scheduler started successfully")
-    except Exception as e:
-        logger.error(f"Failed to start scheduler: {str(e)}")
-        raise
-
-if __name__ == "__main__":
-    setup_weekly_digest_scheduler() 
\ No newline at end of file
+# A weekly occurrence missed by more than this (workers down) is skipped, not sent late
+DIGEST_GRACE = timedelta(hours=12)
+
+
+def _last_weekly(now: datetime, weekday: int, hour: int) -> datetime:
+    """Most recent `weekday` (Mon=0) at `hour`:00 UTC at or before `now`"""
+    slot = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    slot -= timedelta(days=(now.weekday() - weekday) % 7)
+    if slot > now:
+        slot -= timedelta(days=7)
+    return slot
+
+
+def enqueue_due(conn, now: datetime = None):
+    """Queue the current occurrence of every periodic job (no-op if already queued)"""
+    now = now or datetime.now(timezone.utc)
+
+    # Scraping every SCRAPE_INTERVAL_H hours; the summary is refreshed after each crawl
+    period = int(now.timestamp()) // (SCRAPE_INTERVAL_H * 3600)
+    if enqueue(conn, "scrape", dedupe_key=f"scrape:{period}") is not None:
+        logger.info(f"Queued scrape for period {period}")
+
+    # Weekly digest at 8:00 AM UTC every Sunday
+    slot = _last_weekly(now, weekday=6, hour=8)
+    if now - slot <= DIGEST_GRACE:
+        if enqueue(conn, "digest", {"weekly": True}, dedupe_key=f"digest:{slot:%Y-%m-%d}",
+                   max_attempts=2) is not None:
+            logger.info(f"Queued weekly digest for {slot:%Y-%m-%d}")
+
+
+def enqueue_summary(conn, after: str):
+    """Queue summary materialization for the configured backend, once per `after` event"""
+    backend = os.getenv("LLM_BACKEND", "gemini")
+    return enqueue(conn, "summary", {"backend": backend}, dedupe_key=f"summary:{backend}:{after}")
@@ -1,22 +1,72 @@
-import scrapy, bs4, time
+import scrapy
 from datetime import datetime
-from typing import Generator
+from typing import Generator, Iterable, List, Optional
+from lxml.cssselect import CSSSelector
+from ..extract import extract_article
+from ..config import CRAWL_PROFILES, CRAWL_FULL_REFRESH
+from ..database import connect, get_crawl_state, save_crawl_state
+from ..storage import get_storage
 
 class BaseNewsSpider(scrapy.Spider):
     custom_settings = {
         "DOWNLOAD_TIMEOUT": 15,
         "USER_AGENT": "newsbot/0.1",
     }
+    # `source` of stored items (defaults to the spider name)
+    source_name: Optional[str] = None
+    # Per-site lxml selectors for parse_article, see extract.extract_article
+    title_selector: Optional[CSSSelector] = None
+    content_selector: Optional[CSSSelector] = None
+    tags_selector: Optional[CSSSelector] = None
 
-    def parse_article(self, response, source: str):
-        soup = bs4.BeautifulSoup(response.text, "lxml")
-        paragraphs = "\n".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
-        title = soup.find("title").get_text() if soup.title else response.url
+    def __init__(self, *args, full_refresh=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # `scrapy crawl <name> -a full_refresh=1` re-walks all listing pages
+        if full_refresh is None:
+            self.full_refresh = CRAWL_FULL_REFRESH
+        else:
+            self.full_refresh = str(full_refresh).lower() in {"1", "true", "yes"}
+        self.state_conn = connect()
+        # Frontier left by the previous crawl of this source
+        self.last_newest_ts = get_crawl_state(self.state_conn, self.name)
+        self.newest_ts = None
+        self.items_stored = 0
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        # Concurrency / AutoThrottle profile for this source, see config.CRAWL_PROFILES
+        settings.setdict(CRAWL_PROFILES.get(cls.name, {}), priority="spider")
+
+    def new_urls(self, urls: Iterable[str]) -> List[str]:
+        """URLs from a listing page that are not ingested yet (all of them on a full refresh)"""
+        urls = list(dict.fromkeys(urls))
+        if self.full_refresh:
+            return urls
+        known = get_storage().known_urls(urls)
+        return [u for u in urls if u not in known]
+
+    def record_stored(self, count: int, newest_ts: Optional[int]):
+        """Called by the pipeline once `count` items are committed; `newest_ts` is the newest
+        real publication date among them, so failed or undated items never move the frontier"""
+        self.items_stored += count
+        if newest_ts and (self.newest_ts is None or newest_ts > self.newest_ts):
+            self.newest_ts = newest_ts
+            save_crawl_state(self.state_conn, self.name, newest_ts)
+
+    def closed(self, reason):
+        self.logger.info(f"Crawl finished ({reason}): {self.items_stored} items stored, newest_ts={self.newest_ts}")
+
+    def parse_article(self, response, source: Optional[str] = None):
+        page = extract_article(response.body, self.title_selector, self.content_selector, self.tags_selector)
+        entry = response.meta.get("feed_entry") or {}
         yield {
-            "source": source,
-            "title": title.strip(),
-            "author": None,
-            "published_ts": int(time.time()),
+            "source": source or self.source_name or self.name,
+            "title": (page["title"] or entry.get("title") or response.url).strip(),
+            "author": page["author"] or entry.get("author"),
+            # None when unknown: the pipeline files the item under its ingest time
+            "published_ts": page["published_ts"] or entry.get("published_ts"),
             "url": response.url,
-            "content": paragraphs,
-        } 
\ No newline at end of file
+            "content": page["content"],
+            "tags": page["tags"],
+        }
@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import re
+import scrapy
+from lxml import etree
+from scrapy.utils.sitemap import Sitemap
+from .base import BaseNewsSpider
+
+logger = logging.getLogger(__name__)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+
+
+def _parse_date(value: Optional[str]) -> Optional[int]:
+    """RFC 822 (RSS) or ISO 8601 (Atom, sitemap lastmod) to a unix timestamp"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_feed_entries(body: bytes) -> List[Dict[str, Any]]:
+    """url/title/published_ts/author of every item in an RSS 2.0 or Atom document ([] if it is not XML)"""
+    try:
+        root = etree.fromstring(body, parser=etree.XMLParser(recover=True, resolve_entities=False))
+    except etree.XMLSyntaxError:
+        return []
+    if root is None:
+        return []
+    entries = []
+    for item in root.iter("item"):
+        entries.append({
+            "url": (item.findtext("link") or "").strip(),
+            "title": (item.findtext("title") or "").strip(),
+            "published_ts": _parse_date(item.findtext("pubDate")),
+            "author": (item.findtext(f"{DC}creator") or item.findtext("author") or "").strip() or None,
+        })
+    for entry in root.iter(f"{ATOM}entry"):
+        link = entry.find(f"{ATOM}link[@rel='alternate']")
+        if link is None:
+            link = entry.find(f"{ATOM}link")
+        entries.append({
+            "url": (link.get("href") if link is not None else "").strip(),
+            "title": (entry.findtext(f"{ATOM}title") or "").strip(),
+            "published_ts": _parse_date(entry.findtext(f"{ATOM}published") or entry.findtext(f"{ATOM}updated")),
+            "author": (entry.findtext(f"{ATOM}author/{ATOM}name") or "").strip() or None,
+        })
+    return [e for e in entries if e["url"]]
+
+
+class FeedNewsSpider(BaseNewsSpider):
+    """News spider that discovers articles from RSS/Atom feeds or sitemaps.
+
+    Feeds and sitemaps are requested first; only entries not yet ingested are
+    fetched (the crawl frontier only prunes child sitemaps of a sitemap index). If no
+    feed can be read (error, not XML or no entries) the spider falls back to its HTML
+    listing pages via `parse`.
+    """
+    feed_urls: List[str] = []
+    sitemap_urls: List[str] = []
+    # Only sitemap <loc>s matching this pattern are articles
+    sitemap_follow = r".*"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fell_back = False
+
+    def start_requests(self):
+        if not (self.feed_urls or self.sitemap_urls):
+            yield from super().start_requests()
+            return
+        for url in self.feed_urls:
+            yield scrapy.Request(url, callback=self.parse_feed, errback=self.feed_failed)
+        for url in self.sitemap_urls:
+            yield scrapy.Request(url, callback=self.parse_sitemap, errback=self.feed_failed)
+
+    def feed_failed(self, failure):
+        logger.warning(f"Feed unavailable for {self.name}: {failure.getErrorMessage()}")
+        yield from self.fall_back_to_html()
+
+    def fall_back_to_html(self):
+        if self._fell_back:
+            return
+        self._fell_back = True
+        logger.info(f"Falling back to HTML listing pages for {self.name}")
+        for url in self.start_urls:
+            yield scrapy.Request(url, callback=self.parse, dont_filter=True)
+
+    def fresh_entries(self, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Entries whose URL is not ingested yet.
+
+        Not filtered by date: an entry older than the frontier may still be missing
+        (its page failed to store, or was undated), and the URL check is cheap.
+        """
+        entries = list(entries)
+        new = set(self.new_urls(e["url"] for e in entries))
+        return [e for e in entries if e["url"] in new]
+
+    def parse_feed(self, response):
+        entries = parse_feed_entries(response.body)
+        logger.info(f"Feed {response.url}: {len(entries)} entries")
+        if not entries:
+            yield from self.fall_back_to_html()
+            return
+        for entry in self.fresh_entries(entries):
+            yield self.entry_request(response, entry)
+
+    def parse_sitemap(self, response):
+        try:
+            sitemap = Sitemap(response.body)
+            entries = [
+                {"url": e["loc"], "published_ts": _parse_date(e.get("lastmod"))}
+                for e in sitemap if e.get("loc")
+            ]
+        except (etree.XMLSyntaxError, AttributeError):
+            # Empty or non-XML body (lxml returns no root for some of those)
+            logger.warning(f"Sitemap {response.url} is not XML")
+            yield from self.fall_back_to_html()
+            return
+        if sitemap.type == "sitemapindex":
+            # Child sitemaps whose lastmod predates the frontier cannot hold new articles
+            for e in entries:
+                if self.full_refresh or self.last_newest_ts is None or e["published_ts"] is None \
+                        or e["published_ts"] > self.last_newest_ts:
+                    yield response.follow(e["url"], callback=self.parse_sitemap)
+            return
+        entries = [e for e in entries if re.search(self.sitemap_follow, e["url"])]
+        logger.info(f"Sitemap {response.url}: {len(entries)} article entries")
+        if not entries:
+            yield from self.fall_back_to_html()
+            return
+        for entry in self.fresh_entries(entries):
+            yield self.entry_request(response, entry)
+
+    def entry_request(self, response, entry: Dict[str, Any]):
+        """Request for one new feed/sitemap entry; subclasses route it to their article parser"""
+        return response.follow(
+            entry["url"], callback=self.parse_article, meta={"feed_entry": entry},
+        )
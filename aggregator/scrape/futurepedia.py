@@ -1,6 +1,6 @@
 from datetime import datetime
-import time
 from .base import BaseNewsSpider
+from ..tool_search import PRICING_TYPES
 import logging
 import re
 
@@ -20,10 +20,16 @@ class FuturepediaSpider(BaseNewsSpider):
         # Each tool card is a link inside a grid, e.g. <a href="/tool/xyz" ...>
         tool_cards = response.css('a[href^="/tool/"]')
         logger.info(f"Found {len(tool_cards)} tool cards")
-        for card in tool_cards:
-            tool_url = response.urljoin(card.attrib.get('href'))
+        tool_urls = [response.urljoin(card.attrib.get('href')) for card in tool_cards]
+        new_tool_urls = self.new_urls(tool_urls)
+        for tool_url in new_tool_urls:
             yield response.follow(tool_url, callback=self.parse_tool)
 
+        # Everything on this page is already indexed, so later pages are too
+        if tool_urls and not new_tool_urls:
+            logger.info(f"Only known tools on {response.url}; stopping pagination")
+            return
+
         # Pagination: look for next page
         next_page = response.css('a[aria-label="Go to next page"], a[rel="next"]::attr(href)').get()
         if next_page:
@@ -42,8 +48,9 @@ class FuturepediaSpider(BaseNewsSpider):
             # Tags/categories
             tags = response.css('a[href^="/ai-tools/"]::text').getall()
             tags = [t.strip() for t in tags if t.strip()]
-            # Published time (not available, use now)
-            ts = int(time.time())
+            pricing = next((t for t in tags if t in PRICING_TYPES), None)
+            # Published time (not available; the pipeline files it under the ingest time)
+            ts = None
             # Content (full text)
             content_parts = response.css('div.prose *::text').getall()
             content = '\n'.join([p.strip() for p in content_parts if p.strip()])
@@ -52,12 +59,16 @@ class FuturepediaSpider(BaseNewsSpider):
             logger.info(f"Extracted tool: {title[:50]}...")
             yield {
                 "source": "Futurepedia",
+                "source_type": "tool",
                 "title": title.strip(),
                 "author": None,
                 "published_ts": ts,
                 "url": response.url,
                 "content": content.strip(),
-                "tags": tags
+                "tags": tags,
+                # Tool index fields (see SQLitePipeline)
+                "blurb": (desc or '').strip(),
+                "pricing": pricing,
             }
         except Exception as e:
             logger.error(f"Error processing tool page {response.url}: {str(e)}")
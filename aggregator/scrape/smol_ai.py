@@ -1,13 +1,24 @@
-from datetime import datetime
-import time, re
-from .base import BaseNewsSpider
+from datetime import datetime, timezone
+import re
+from lxml.cssselect import CSSSelector
+from ..extract import extract_article
+from .feed import FeedNewsSpider
 import logging
 
 logger = logging.getLogger(__name__)
 
-class SmolAISpider(BaseNewsSpider):
+class SmolAISpider(FeedNewsSpider):
     name = "smol_ai"
     start_urls = ["https://news.smol.ai/"]
+    feed_urls = ["https://news.smol.ai/rss.xml"]
+    # Issue body: the text blocks of the main content container, without navigation
+    title_selector = CSSSelector("main h1, article h1")
+    content_selector = CSSSelector(
+        "main h2, main h3, main p, main li, "
+        "div.prose h2, div.prose h3, div.prose p, div.prose li, "
+        "div.markdown-body p, div.markdown-body li"
+    )
+    tags_selector = CSSSelector("code")
     custom_settings = {
         "DOWNLOAD_TIMEOUT": 30,
         "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -18,11 +29,17 @@ class SmolAISpider(BaseNewsSpider):
         # Find all daily issue links
         article_links = response.css('a.block.rounded-lg.border')
         logger.info(f"Found {len(article_links)} article links")
-        for link in article_links:
-            href = link.attrib.get('href')
-            if not href or not href.startswith('/issues/'):
+        issue_links = [
+            link for link in article_links
+            if (link.attrib.get('href') or '').startswith('/issues/')
+        ]
+        # Issues ingested by an earlier crawl are not fetched again
+        new_urls = set(self.new_urls(response.urljoin(link.attrib['href']) for link in issue_links))
+        logger.info(f"{len(new_urls)} new issues")
+        for link in issue_links:
+            article_url = response.urljoin(link.attrib['href'])
+            if article_url not in new_urls:
                 continue
-            article_url = response.urljoin(href)
             # Extract the date from the <time> tag inside the link
             date_str = link.css('time::attr(datetime)').get()
             # Extract the headline/title from the link
@@ -33,49 +50,46 @@ class SmolAISpider(BaseNewsSpider):
                 meta={'published_datetime': date_str, 'title': title}
             )
 
-    def parse_issue(self, response):
-        try:
-            date_str = response.meta.get('published_datetime')
-            title = response.meta.get('title') or '(no title)'
-            if date_str:
-                try:
-                    date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    ts = int(date_obj.timestamp())
-                except Exception:
-                    ts = int(time.time())
-            else:
-                ts = int(time.time())
-
-            # Focus on the main content container, avoiding navigation and repeated elements
-            # Try to select the main news content, e.g., a div with class 'prose' or 'markdown-body', or <main>
-            main_content = response.css('main')
-            if not main_content:
-                main_content = response.css('div.prose, div.markdown-body, article')
-            if main_content:
-                # Remove navigation, headers, and footer text if present
-                # Only get text from the main content block
-                content = '\n'.join(main_content[0].css('::text').getall()).strip()
-            else:
-                content = '\n'.join(response.css('::text').getall()).strip()
+    def entry_request(self, response, entry):
+        # parse_issue takes the date and headline from the listing; the feed has both
+        published = entry.get("published_ts")
+        return response.follow(
+            entry["url"],
+            self.parse_issue,
+            meta={
+                'published_datetime': datetime.fromtimestamp(published, tz=timezone.utc).isoformat() if published else None,
+                'title': entry.get("title"),
+            }
+        )
 
-            # Remove common navigation/footer phrases if present
-            for phrase in ["Back to issues", "Skip to Main", "subscribe", "tags", "Search (Cmd+K)", "See all issues", "Back to top", "© 2025 • AINews"]:
-                content = content.replace(phrase, "")
-            content = re.sub(r'\n+', '\n', content).strip()
+    def parse_issue(self, response):
+        page = extract_article(response.body, self.title_selector, self.content_selector, self.tags_selector)
+        # The listing (or feed) gives the issue's date and headline; the page is the fallback
+        date_str = response.meta.get('published_datetime')
+        ts = None
+        if date_str:
+            try:
+                ts = int(datetime.fromisoformat(date_str.replace('Z', '+00:00')).timestamp())
+            except ValueError:
+                pass
+        ts = ts or page["published_ts"]
+        title = response.meta.get('title') or page["title"] or '(no title)'
 
-            tags = response.css('code::text').getall()
+        # Pages without the usual containers: every paragraph, like other sites
+        content = page["content"] or extract_article(response.body)["content"]
+        # Remove common navigation/footer phrases if present
+        for phrase in ["Back to issues", "Skip to Main", "subscribe", "tags", "Search (Cmd+K)", "See all issues", "Back to top", "© 2025 • AINews"]:
+            content = content.replace(phrase, "")
+        content = re.sub(r'\n+', '\n', content).strip()
 
-            logger.info(f"Extracted issue: {title[:50]} from {response.url} | ts={ts}")
+        logger.info(f"Extracted issue: {title[:50]} from {response.url} | ts={ts}")
 
-            yield {
-                "source": "smol.ai",
-                "title": title.strip(),
-                "author": None,
-                "published_ts": ts,
-                "url": response.url,
-                "content": content.strip(),
-                "tags": tags
-            }
-        except Exception as e:
-            logger.error(f"Error processing issue page {response.url}: {str(e)}")
-            return 
\ No newline at end of file
+        yield {
+            "source": "smol.ai",
+            "title": title.strip(),
+            "author": None,
+            "published_ts": ts,
+            "url": response.url,
+            "content": content,
+            "tags": page["tags"],
+        }
@@ -1,42 +1,234 @@
+from scrapy import signals
 from scrapy.crawler import CrawlerProcess
+from twisted.internet import defer, task
 from .scrape import SPIDERS
-from .database import connect, insert_article
-from .embeddings import embed
+from .database import connect, upsert_tools
+from .storage import get_storage
+from .embeddings import get_pool, shutdown_pool
+from .passages import embed_article
+from .config import EMBED_MAX_PENDING, INGEST_BATCH_SIZE, HTTPCACHE_ENABLED, HTTPCACHE_DIR
+import argparse
+import json
 import logging
+import os
+import time
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _deferred_from_future(future) -> defer.Deferred:
+    """Bridge a concurrent.futures.Future into a Deferred fired on the reactor thread."""
+    # Imported here: importing twisted.internet.reactor installs the default reactor,
+    # and Scrapy must be the one to install TWISTED_REACTOR
+    from twisted.internet import reactor
+    d = defer.Deferred()
+
+    def _done(f):
+        exc = f.exception()
+        if exc is not None:
+            reactor.callFromThread(d.errback, exc)
+        else:
+            reactor.callFromThread(d.callback, f.result())
+
+    future.add_done_callback(_done)
+    return d
+
+
 class SQLitePipeline:
-    def __init__(self):
-        self.conn = connect()
+    # Shared by all spiders in the process, so the total number of items waiting on
+    # the embedding pool stays bounded and Scrapy stops feeding items when it is full.
+    _pending = defer.DeferredSemaphore(EMBED_MAX_PENDING)
+
+    def __init__(self, stats=None, batch_size: int = INGEST_BATCH_SIZE):
+        self.conn = connect()  # tool index
+        self.storage = get_storage()
+        self.stats = stats
+        # Embedded items wait here and are written in one transaction per batch
+        self.batch_size = max(1, batch_size)
+        self.buffer = []
+        self.spider = None
         logger.info("SQLite pipeline initialized")
 
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats, crawler.settings.getint("INGEST_BATCH_SIZE", INGEST_BATCH_SIZE))
+
+    def _record(self, key: str, value: float):
+        # Timings land in the crawl stats (pipeline/embed_ms, pipeline/db_write_ms, ...)
+        if self.stats is not None:
+            self.stats.inc_value(f"pipeline/{key}", value)
+
+    def open_spider(self, spider):
+        self.spider = spider
+
     def process_item(self, item, spider):
+        logger.info(f"Processing item from {item['source']}: {item['title']}")
+        return self._pending.run(self._embed_and_store, item)
+
+    def _embed_and_store(self, item):
+        started = time.perf_counter()
+        # Article and passage embeddings come back from one encode call in the pool
+        d = _deferred_from_future(get_pool().submit(embed_article, item["content"]))
+        d.addCallback(self._store, item, started)
+        d.addErrback(self._failed, item)
+        return d
+
+    def _store(self, embedded, item, started):
+        self._record("embed_ms", (time.perf_counter() - started) * 1000)
+        item["embedding"], item["passages"] = embedded
+        self._record("passages", len(item["passages"]))
+        self.buffer.append(item)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return item
+
+    def flush(self, final: bool = False) -> bool:
+        """Write the buffered items in one transaction; returns False if that failed.
+
+        A failed batch goes back to the front of the buffer and is retried with the
+        next flush; on the final flush its URLs are logged as lost.
+        """
+        batch, self.buffer = self.buffer, []
+        if not batch:
+            return True
+        started = time.perf_counter()
+        # Only real publication dates move the crawl frontier; undated pages are filed
+        # under the time they were ingested (on copies, so a retried batch is unchanged)
+        newest_ts = max((item["published_ts"] for item in batch if item.get("published_ts")), default=None)
+        now = int(time.time())
+        rows = [{**item, "published_ts": item.get("published_ts") or now} for item in batch]
         try:
-            logger.info(f"Processing item from {item['source']}: {item['title']}")
-            item["embedding"] = embed(item["content"])
-            insert_article(self.conn, item)
-            logger.info("Item successfully processed and stored")
-            return item
+            inserted, skipped = self.storage.insert_articles(rows)
+            tools = [{"name": item["title"], **item} for item in rows if "blurb" in item]
+            if tools:
+                # Futurepedia tool pages also feed the local tool index used by tool_search
+                upsert_tools(self.conn, tools)
         except Exception as e:
-            logger.error(f"Error processing item: {str(e)}")
-            raise
+            self._record("flush_errors", 1)
+            if final:
+                self._record("lost", len(batch))
+                logger.error(f"Could not store {len(batch)} items: {repr(e)}; lost: "
+                             f"{', '.join(item['url'] for item in batch)}")
+            else:
+                self.buffer = batch + self.buffer
+                logger.error(f"Could not store batch of {len(batch)} items, will retry: {repr(e)}")
+            return False
+        self._record("db_write_ms", (time.perf_counter() - started) * 1000)
+        self._record("items", len(batch))
+        self._record("inserted", inserted)
+        self._record("skipped", skipped)
+        logger.info(f"Stored batch of {len(batch)} items ({inserted} new, {skipped} already present)")
+        # The batch is committed, so the frontier may move past it
+        self.spider.record_stored(len(batch), newest_ts)
+        return True
+
+    def close_spider(self, spider):
+        # Items still in the embedding pool have been awaited by Scrapy before this runs.
+        # One more try for a batch that failed earlier, then give up loudly.
+        if not self.flush():
+            self.flush(final=True)
 
+    def _failed(self, failure, item):
+        logger.error(f"Error processing item {item.get('url')}: {failure.getErrorMessage()}")
+        return failure
 
-def run():
-    settings = {
+
+class CrawlStatusWriter:
+    """Extension that periodically dumps per-spider stats to CRAWL_STATUS_FILE.
+
+    Used by crawl_jobs to report progress of a crawl running in a child process.
+    All crawlers of the process share one file, keyed by spider name.
+    """
+    _spiders: dict = {}
+
+    def __init__(self, crawler, path: str, interval: float):
+        self.crawler = crawler
+        self.path = path
+        self.loop = task.LoopingCall(self.write)
+        self.interval = interval
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy.exceptions import NotConfigured
+        path = crawler.settings.get("CRAWL_STATUS_FILE")
+        if not path:
+            raise NotConfigured
+        return cls(crawler, path, crawler.settings.getfloat("CRAWL_STATUS_INTERVAL", 2.0))
+
+    def spider_opened(self, spider):
+        self.spider = spider
+        self.loop.start(self.interval)
+
+    def spider_closed(self, spider, reason):
+        if self.loop.running:
+            self.loop.stop()
+        self.write(finished=reason)
+
+    def write(self, finished=None):
+        stats = self.crawler.stats.get_stats()
+        self._spiders[self.spider.name] = {
+            "pages": stats.get("response_received_count", 0),
+            "items": stats.get("item_scraped_count", 0),
+            "errors": stats.get("log_count/ERROR", 0),
+            "finished": finished,
+            **{k: v for k, v in stats.items() if k.startswith("pipeline/")},
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"spiders": self._spiders, "updated_ts": int(time.time())}, f)
+        os.replace(tmp, self.path)
+
+
+def crawl_settings() -> dict:
+    """Process-wide Scrapy settings; per-spider tuning lives in config.CRAWL_PROFILES."""
+    return {
+        # Pinned so every Scrapy version installs the same reactor
+        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
         "LOG_ENABLED": True,
         "LOG_LEVEL": "INFO",
         "ITEM_PIPELINES": {SQLitePipeline: 300},
         "DOWNLOAD_TIMEOUT": 30,
         "ROBOTSTXT_OBEY": False,
+        "CONCURRENT_REQUESTS": 32,
+        "AUTOTHROTTLE_ENABLED": True,
+        "AUTOTHROTTLE_START_DELAY": 0.5,
+        "AUTOTHROTTLE_MAX_DELAY": 10,
+        "DNSCACHE_ENABLED": True,
+        "DNSCACHE_SIZE": 1000,
+        # RFC2616 policy revalidates stale entries with If-Modified-Since / If-None-Match,
+        # so unchanged listing pages come back as 304s served from the local cache
+        "HTTPCACHE_ENABLED": HTTPCACHE_ENABLED,
+        "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.RFC2616Policy",
+        "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        "HTTPCACHE_DIR": HTTPCACHE_DIR,
+        "HTTPCACHE_GZIP": True,
+        "HTTPCACHE_IGNORE_HTTP_CODES": [408, 429, 500, 502, 503, 504],
     }
+
+
+def run(status_file: str = None):
     logger.info("Starting the scraping process")
+    settings = crawl_settings()
+    if status_file:
+        settings["EXTENSIONS"] = {CrawlStatusWriter: 500}
+        settings["CRAWL_STATUS_FILE"] = status_file
     process = CrawlerProcess(settings)
     for sp in SPIDERS:
         logger.info(f"Adding spider: {sp.name}")
         process.crawl(sp)
-    process.start()
-    logger.info("Scraping process completed") 
\ No newline at end of file
+    try:
+        process.start()
+    finally:
+        shutdown_pool()
+    logger.info("Scraping process completed")
+
+
+if __name__ == "__main__":
+    # Entry point for crawl jobs launched in a separate process (see crawl_jobs)
+    p = argparse.ArgumentParser("aggregator.scraper")
+    p.add_argument("--status-file", help="write crawl progress/stats JSON here")
+    run(p.parse_args().status_file)
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from .database import SessionLocal
 from .models import Subscriber
 from .qa import summary_today
 from .email_service import EmailService
@@ -17,7 +17,7 @@ def send_daily_summary():
             return False
 
         # Get active subscribers
-        with Session() as session:
+        with SessionLocal() as session:
             subscribers = session.query(Subscriber).filter_by(is_active=True).all()
             if not subscribers:
                 logger.info("No active subscribers found")
@@ -39,7 +39,7 @@ def send_daily_summary():
 
         if success:
             # Update last_email_sent timestamp
-            with Session() as session:
+            with SessionLocal() as session:
                 session.query(Subscriber)\
                     .filter(Subscriber.email.in_(subscriber_emails))\
                     .update({Subscriber.last_email_sent: datetime.utcnow()})
@@ -0,0 +1,343 @@
+"""Article storage backends: the local SQLite file or Postgres + pgvector.
+
+`get_storage()` returns the backend selected by STORAGE_BACKEND. Both expose the
+same calls used by the scraper, retrieval, QA and email code:
+
+    insert_articles(items) -> (inserted, skipped)
+    known_urls(urls) -> set
+    fetch_recent(days, source_type) / list_recent(days, source_type, limit)
+    fetch_all_articles()
+    search(qv, threshold, limit) -> [article dicts with "similarity"], best first
+    search_passages(qv, threshold, limit) -> [(article_id, start, end, similarity)], best first
+    fetch_articles_by_id(ids) -> {id: (source, title, content, published_ts, url, author)}
+
+Rows keep the tuple layouts of the helpers in database.py, and both backends keep
+bodies compressed in `article_bodies` (compression.py). SQLite stays the default;
+Postgres lets several API replicas and crawlers share one article store, with an
+HNSW index answering vector search. Only articles and passages live there: crawl
+state, the tool index, cached summaries and the job queue stay in the local SQLite
+file, so everything but the articles is still per host.
+"""
+from __future__ import annotations
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from .config import (EMBED_DIM, STORAGE_BACKEND, POSTGRES_DSN, PG_POOL_SIZE,
+                     PG_EF_SEARCH, PG_SEARCH_LIMIT)
+from . import database
+from .compression import compress
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_FIELDS = ("source", "title", "author", "published_ts", "url", "content", "embedding", "source_type")
+# Columns of the articles row itself; the body goes to article_bodies
+ROW_FIELDS = tuple(f for f in ARTICLE_FIELDS if f != "content")
+
+
+def _to_dict(row, similarity: float) -> Dict[str, Any]:
+    source, title, content, ts, url, author = row
+    return {
+        "source": source,
+        "title": title,
+        "content": content,
+        "timestamp": ts,
+        "url": url,
+        "author": author,
+        "similarity": float(similarity),
+    }
+
+
+class SQLiteStorage:
+    name = "sqlite"
+
+    def insert_articles(self, items: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        return database.insert_articles(database.connect(), items)
+
+    def known_urls(self, urls) -> set:
+        return database.known_urls(database.connect(), urls)
+
+    def fetch_recent(self, days: int = 1, source_type: Optional[str] = None):
+        return database.fetch_recent(database.connect_readonly(), days, source_type)
+
+    def list_recent(self, days: int = 1, source_type: str = "news", limit: int = 200):
+        return database.list_recent(database.connect_readonly(), days, source_type, limit)
+
+    def fetch_all_articles(self):
+        return database.fetch_all_articles(database.connect_readonly())
+
+    def iter_articles(self, batch: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """All rows as insert_articles dicts, `batch` at a time (for copying to another backend)"""
+        conn = database.connect_readonly()
+        fields = list(ROW_FIELDS)
+        cur = conn.execute(
+            f"""SELECT articles.id, {','.join('articles.' + f for f in fields)}, {database.BODY_COLUMNS}
+                FROM articles {database.BODY_JOIN}"""
+        )
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            passages = database.fetch_passages(conn, [row[0] for row in rows])
+            yield [
+                {
+                    **dict(zip(fields, row[1:])),
+                    "content": database.body_text(*row[1 + len(fields):]),
+                    "passages": passages.get(row[0], []),
+                }
+                for row in rows
+            ]
+
+    def search(self, qv: np.ndarray, threshold: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Exact cosine similarity against every stored embedding; only the hits' bodies are read"""
+        from sklearn.metrics.pairwise import cosine_similarity
+        conn = database.connect_readonly()
+        rows = database.fetch_embeddings(conn)
+        if not rows:
+            logger.warning("No articles found in database")
+            return []
+        ids, blobs = zip(*rows)
+        vecs = np.vstack([np.frombuffer(b, dtype=np.float32, count=EMBED_DIM) for b in blobs])
+        sims = cosine_similarity([qv], vecs)[0]
+        order = [i for i in np.argsort(-sims) if sims[i] >= threshold][:limit]
+        articles = database.fetch_articles_by_id(conn, [ids[i] for i in order])
+        return [_to_dict(articles[ids[i]], sims[i]) for i in order]
+
+    def search_passages(self, qv: np.ndarray, threshold: float, limit: int) -> List[Tuple[int, int, int, float]]:
+        """Exact dot product against every (normalized) passage embedding"""
+        rows = database.fetch_passage_embeddings(database.connect_readonly())
+        if not rows:
+            return []
+        article_ids, starts, ends, blobs = zip(*rows)
+        vecs = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), EMBED_DIM)
+        qv = np.asarray(qv, dtype=np.float32)
+        sims = vecs @ (qv / (np.linalg.norm(qv) or 1.0))
+        top = np.argsort(-sims)[:limit]
+        return [(article_ids[i], starts[i], ends[i], float(sims[i])) for i in top if sims[i] >= threshold]
+
+    def fetch_articles_by_id(self, ids) -> Dict[int, Tuple]:
+        return database.fetch_articles_by_id(database.connect_readonly(), ids)
+
+
+PG_SCHEMA = f"""
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS articles (
+    id BIGSERIAL PRIMARY KEY,
+    source TEXT,
+    title TEXT,
+    author TEXT,
+    published_ts BIGINT,
+    url TEXT UNIQUE,
+    content TEXT,       -- rows written before bodies moved to article_bodies
+    embedding vector({EMBED_DIM}),
+    source_type TEXT NOT NULL DEFAULT 'news'
+);
+CREATE INDEX IF NOT EXISTS idx_date ON articles(published_ts);
+CREATE INDEX IF NOT EXISTS idx_recent ON articles(source_type, published_ts) INCLUDE (source, title, url, author);
+CREATE INDEX IF NOT EXISTS idx_embedding_hnsw ON articles
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE TABLE IF NOT EXISTS article_bodies (
+    article_id BIGINT PRIMARY KEY REFERENCES articles(id),
+    codec TEXT NOT NULL,
+    body BYTEA NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id BIGSERIAL PRIMARY KEY,
+    article_id BIGINT NOT NULL REFERENCES articles(id),
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL,
+    embedding vector({EMBED_DIM}),
+    UNIQUE (article_id, start_char)
+);
+CREATE INDEX IF NOT EXISTS idx_passages_hnsw ON passages
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+"""
+
+
+class PostgresStorage:
+    """Postgres + pgvector; needs `psycopg[binary]`, `psycopg-pool` and `pgvector`."""
+    name = "postgres"
+
+    def __init__(self, dsn: str = POSTGRES_DSN, pool_size: int = PG_POOL_SIZE):
+        try:
+            import psycopg
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise RuntimeError(
+                "STORAGE_BACKEND=postgres needs: pip install 'psycopg[binary]' psycopg-pool pgvector"
+            ) from e
+        if not dsn:
+            raise RuntimeError("STORAGE_BACKEND=postgres needs POSTGRES_DSN")
+        # The extension must exist before connections register the vector type
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute(PG_SCHEMA)
+        self.pool = ConnectionPool(dsn, min_size=1, max_size=pool_size, configure=self._configure, open=True)
+
+    @staticmethod
+    def _configure(conn):
+        from pgvector.psycopg import register_vector
+        conn.autocommit = True
+        register_vector(conn)
+        # Candidate list size of the HNSW scan: higher = better recall, slower queries
+        conn.execute(f"SET hnsw.ef_search = {int(PG_EF_SEARCH)}")
+
+    def _fetch(self, sql: str, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def insert_articles(self, items: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        items = list(items)
+        rows = [
+            (
+                item["source"], item["title"], item.get("author"), item.get("published_ts"), item["url"],
+                np.frombuffer(item["embedding"], dtype=np.float32) if item.get("embedding") else None,
+                item.get("source_type") or "news",
+            )
+            for item in items
+        ]
+        if not rows:
+            return 0, 0
+        new_urls = {row[4] for row in rows} - self.known_urls(row[4] for row in rows)
+        passages = [
+            (s, e, None if v is None else np.frombuffer(v, dtype=np.float32), item["url"])
+            for item in items if item["url"] in new_urls
+            for s, e, v in item.get("passages") or ()
+        ]
+        with self.pool.connection() as conn, conn.transaction():
+            cur = conn.cursor()
+            cur.executemany(
+                f"""INSERT INTO articles({','.join(ROW_FIELDS)})
+                    VALUES (%s,%s,%s,%s,%s,%s,%s)
+                    ON CONFLICT (url) DO NOTHING""",
+                rows,
+            )
+            inserted = cur.rowcount
+            # Same rule as SQLite: rows that already had a (legacy or compressed) body keep it
+            cur.executemany(
+                """INSERT INTO article_bodies(article_id,codec,body)
+                   SELECT id, %s, %s FROM articles WHERE url = %s AND content IS NULL
+                   ON CONFLICT (article_id) DO NOTHING""",
+                [
+                    (*compress(item["content"]), item["url"])
+                    for item in items if item.get("content") is not None
+                ],
+            )
+            if passages:
+                cur.executemany(
+                    """INSERT INTO passages(article_id,start_char,end_char,embedding)
+                       SELECT id, %s, %s, %s FROM articles WHERE url = %s
+                       ON CONFLICT (article_id, start_char) DO NOTHING""",
+                    passages,
+                )
+        return inserted, len(rows) - inserted
+
+    def known_urls(self, urls) -> set:
+        urls = list(urls)
+        if not urls:
+            return set()
+        return {row[0] for row in self._fetch("SELECT url FROM articles WHERE url = ANY(%s)", (urls,))}
+
+    def fetch_recent(self, days: int = 1, source_type: Optional[str] = None):
+        type_filter = "source_type = %s AND" if source_type else ""
+        since = _since(days)
+        rows = self._fetch(
+            f"""SELECT source, title, {database.BODY_COLUMNS}, published_ts, url, author
+                FROM articles {database.BODY_JOIN}
+                WHERE {type_filter} published_ts >= %s ORDER BY published_ts DESC""",
+            (source_type, since) if source_type else (since,),
+        )
+        return [
+            (s, t, database.body_text(codec, blob, legacy), ts, u, a)
+            for s, t, codec, blob, legacy, ts, u, a in rows
+        ]
+
+    def list_recent(self, days: int = 1, source_type: str = "news", limit: int = 200):
+        return self._fetch(
+            """SELECT source, title, published_ts, url, author FROM articles
+               WHERE source_type = %s AND published_ts >= %s ORDER BY published_ts DESC LIMIT %s""",
+            (source_type, _since(days), limit),
+        )
+
+    def fetch_all_articles(self):
+        rows = self._fetch(
+            f"""SELECT source, title, {database.BODY_COLUMNS}, embedding, published_ts, url, author
+                FROM articles {database.BODY_JOIN} ORDER BY published_ts DESC"""
+        )
+        # Same layout as SQLite: embeddings as float32 bytes
+        return [
+            (s, t, database.body_text(codec, blob, legacy),
+             None if e is None else np.asarray(e, dtype=np.float32).tobytes(), ts, u, a)
+            for s, t, codec, blob, legacy, e, ts, u, a in rows
+        ]
+
+    def search(self, qv: np.ndarray, threshold: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Approximate nearest neighbours from the HNSW index (cosine distance)"""
+        qv = np.asarray(qv, dtype=np.float32)
+        # The neighbours come from the index alone; only their bodies are joined in
+        rows = self._fetch(
+            f"""SELECT source, title, {database.BODY_COLUMNS}, published_ts, url, author, sim
+                FROM (SELECT *, 1 - (embedding <=> %s) AS sim FROM articles
+                      WHERE embedding IS NOT NULL
+                      ORDER BY embedding <=> %s LIMIT %s) AS articles
+                {database.BODY_JOIN}
+                ORDER BY sim DESC""",
+            (qv, qv, limit or PG_SEARCH_LIMIT),
+        )
+        # Filtering on similarity in SQL would stop Postgres from using the index
+        return [
+            _to_dict((s, t, database.body_text(codec, blob, legacy), ts, u, a), sim)
+            for s, t, codec, blob, legacy, ts, u, a, sim in rows if sim >= threshold
+        ]
+
+    def search_passages(self, qv: np.ndarray, threshold: float, limit: int) -> List[Tuple[int, int, int, float]]:
+        """Approximate nearest passages from the HNSW index"""
+        qv = np.asarray(qv, dtype=np.float32)
+        rows = self._fetch(
+            """SELECT article_id, start_char, end_char, 1 - (embedding <=> %s) AS sim
+               FROM passages WHERE embedding IS NOT NULL
+               ORDER BY embedding <=> %s LIMIT %s""",
+            (qv, qv, limit),
+        )
+        return [(a, s, e, float(sim)) for a, s, e, sim in rows if sim >= threshold]
+
+    def fetch_articles_by_id(self, ids) -> Dict[int, Tuple]:
+        rows = self._fetch(
+            f"""SELECT articles.id, source, title, {database.BODY_COLUMNS}, published_ts, url, author
+                FROM articles {database.BODY_JOIN} WHERE articles.id = ANY(%s)""",
+            (list(ids),),
+        )
+        return {
+            id_: (s, t, database.body_text(codec, blob, legacy), ts, u, a)
+            for id_, s, t, codec, blob, legacy, ts, u, a in rows
+        }
+
+
+def _since(days: int) -> int:
+    return int(time.time()) - days * 86400
+
+
+@lru_cache(maxsize=1)
+def get_storage():
+    if STORAGE_BACKEND == "postgres":
+        logger.info("Using Postgres article storage")
+        return PostgresStorage()
+    if STORAGE_BACKEND != "sqlite":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return SQLiteStorage()
+
+
+def copy_articles(src, dst, batch: int = 1000) -> int:
+    """Copy every article from a SQLiteStorage into another backend; returns rows inserted"""
+    total = 0
+    for items in src.iter_articles(batch):
+        inserted, _ = dst.insert_articles(items)
+        total += inserted
+        logger.info(f"Copied {total} articles")
+    return total
+
+
+if __name__ == "__main__":
+    # python -m aggregator.storage  -> load news.db articles into POSTGRES_DSN
+    logging.basicConfig(level=logging.INFO)
+    print(f"Copied {copy_articles(SQLiteStorage(), PostgresStorage())} articles to Postgres")
@@ -1,16 +1,11 @@
 import gradio as gr
-from models import Subscription
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from .models import Subscriber
+from .database import SessionLocal
 import re
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create database engine and session
-engine = create_engine('sqlite:///news.db')
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 def is_valid_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return bool(re.match(pattern, email))
@@ -81,7 +76,7 @@ def launch_subscription_ui():
                 # Add to database
                 db = SessionLocal()
                 try:
-                    existing = db.query(Subscription).filter_by(email=email).first()
+                    existing = db.query(Subscriber).filter_by(email=email).first()
                     if existing:
                         if existing.is_active:
                             return "ℹ️ You are already subscribed!"
@@ -90,7 +85,7 @@ def launch_subscription_ui():
                             db.commit()
                             return "✅ Welcome back! Your subscription has been reactivated."
                     
-                    new_subscription = Subscription(email=email)
+                    new_subscription = Subscriber(email=email)
                     db.add(new_subscription)
                     db.commit()
                     return "✅ Successfully subscribed to AI News Weekly Digest!"
@@ -109,7 +104,7 @@ def launch_subscription_ui():
                 # Remove from database
                 db = SessionLocal()
                 try:
-                    subscription = db.query(Subscription).filter_by(email=email).first()
+                    subscription = db.query(Subscriber).filter_by(email=email).first()
                     if not subscription or not subscription.is_active:
                         return "ℹ️ This email is not subscribed."
                     
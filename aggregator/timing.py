@@ -0,0 +1,31 @@
+"""Per-request timing spans, reported by the API in a Server-Timing header"""
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Optional
+
+_spans: ContextVar[Optional[Dict[str, float]]] = ContextVar("timing_spans", default=None)
+
+
+def start() -> Dict[str, float]:
+    """Begin collecting spans for the current request; returns the (live) span dict."""
+    spans: Dict[str, float] = {}
+    _spans.set(spans)
+    return spans
+
+
+@contextmanager
+def span(name: str):
+    """Add the elapsed milliseconds of the block to span `name` (no-op outside a request)."""
+    spans = _spans.get()
+    t0 = perf_counter()
+    try:
+        yield
+    finally:
+        if spans is not None:
+            spans[name] = spans.get(name, 0.0) + (perf_counter() - t0) * 1000
+
+
+def server_timing(spans: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in spans.items())
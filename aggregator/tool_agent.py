@@ -1,70 +1,77 @@
 from __future__ import annotations
 import os
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.tools import BaseTool
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
-from langchain_community.llms import Ollama
-from .tool_search import search_tools
+from .tool_search import search_tools, PRICING_TYPES
+
+# LangChain, ChatGroq and Ollama are imported when an agent is first requested;
+# the direct search path used by the UI never needs them.
 
 logger = logging.getLogger(__name__)
 
-class FuturepediaSearchTool(BaseTool):
-    name: str = "futurepedia_search"
-    description: str = "Search Futurepedia.io for AI tools related to a topic and return the top-k results."
-    
-    def _run(self, query: str, k: Optional[str] = None) -> str:
-        try:
-            # If k is None or 'All', return all results
-            if k is None or k == "All":
-                results = search_tools(query, None)
-            else:
-                results = search_tools(query, int(k))
-            if not results:
-                return "No tools found for this query."
-            
-            # Format the results in a clear, structured way
-            formatted_results = []
-            for t in results:
-                formatted_results.append(f"Tool: {t['name']}")
-                formatted_results.append(f"URL: {t['url']}")
-                formatted_results.append(f"Description: {t['blurb']}")
-                # Extract pricing from tags if present
-                pricing = ''
-                if t['tags']:
-                    # Try to find a tag that matches known pricing types
-                    pricing_types = [
-                        'Free', 'Freemium', 'Free Trial', 'Paid', 'Contact for Pricing'
-                    ]
-                    pricing = next((tag for tag in t['tags'] if tag in pricing_types), '')
-                formatted_results.append(f"Pricing: {pricing if pricing else 'Unknown'}")
-                if t['tags']:
-                    formatted_results.append(f"Tags: {', '.join(t['tags'])}")
-                formatted_results.append("")  # Add empty line between tools
-            
-            return "\n".join(formatted_results)
-        except Exception as e:
-            logger.error(f"Error in Futurepedia search: {str(e)}")
-            return f"Error searching tools: {str(e)}"
-
-    async def _arun(self, *args, **kwargs):
-        raise NotImplementedError("Async version not implemented.")
+def format_tool_results(results: List[Dict[str, Any]]) -> str:
+    """Render search_tools() results in the Tool/URL/Description/Pricing/Tags text format."""
+    formatted_results = []
+    for t in results:
+        formatted_results.append(f"Tool: {t['name']}")
+        formatted_results.append(f"URL: {t['url']}")
+        formatted_results.append(f"Description: {t['blurb']}")
+        # Extract pricing from tags if present
+        pricing = ''
+        if t['tags']:
+            pricing = next((tag for tag in t['tags'] if tag in PRICING_TYPES), '')
+        formatted_results.append(f"Pricing: {pricing if pricing else 'Unknown'}")
+        if t['tags']:
+            formatted_results.append(f"Tags: {', '.join(t['tags'])}")
+        formatted_results.append("")  # Add empty line between tools
+    return "\n".join(formatted_results)
+
+@lru_cache(maxsize=None)
+def _search_tool_class():
+    from langchain_core.tools import BaseTool
+
+    class FuturepediaSearchTool(BaseTool):
+        name: str = "futurepedia_search"
+        description: str = "Search Futurepedia.io for AI tools related to a topic and return the top-k results."
+
+        def _run(self, query: str, k: Optional[str] = None) -> str:
+            try:
+                # If k is None or 'All', return all results
+                if k is None or k == "All":
+                    results = search_tools(query, None)
+                else:
+                    results = search_tools(query, int(k))
+                if not results:
+                    return "No tools found for this query."
+                return format_tool_results(results)
+            except Exception as e:
+                logger.error(f"Error in Futurepedia search: {str(e)}")
+                return f"Error searching tools: {str(e)}"
+
+        async def _arun(self, *args, **kwargs):
+            raise NotImplementedError("Async version not implemented.")
+
+    return FuturepediaSearchTool
 
 def create_tool_agent(backend: str = "ollama", model: Optional[str] = None):
     """Create a tool search agent with the specified backend."""
+    from langchain.agents import AgentExecutor, create_react_agent
+    from langchain_core.prompts import ChatPromptTemplate
+
     # Initialize tools
-    tools = [FuturepediaSearchTool()]
+    tools = [_search_tool_class()()]
     
     # Initialize LLM based on backend
     if backend == "groq":
+        from langchain_groq import ChatGroq
         llm = ChatGroq(
             model=model or os.getenv("DEFAULT_GROQ_MODEL", "llama3-70b-8192"),
             temperature=0.2,
             max_tokens=512
         )
     else:  # ollama
+        from langchain_community.llms import Ollama
         llm = Ollama(
             model=model or os.getenv("DEFAULT_OLLAMA_MODEL", "aya:8b"),
             base_url=os.getenv("OLLAMA_HOST", "http://localhost:11434"),
@@ -119,9 +126,21 @@ Previous steps:
         verbose=True
     )
 
-# Create agent instances for reuse
-GROQ_AGENT = create_tool_agent("groq")
-OLLAMA_AGENT = create_tool_agent("ollama")
+@lru_cache(maxsize=None)
+def get_tool_agent(backend: str = "ollama", model: Optional[str] = None):
+    """Agent for (backend, model), built on first request and reused afterwards."""
+    logger.info(f"Creating tool agent for backend={backend} model={model or 'default'}")
+    return create_tool_agent(backend, model)
+
+def __getattr__(name: str):
+    # GROQ_AGENT / OLLAMA_AGENT used to be built at import; keep them (and the tool class) as lazy aliases
+    if name == "GROQ_AGENT":
+        return get_tool_agent("groq")
+    if name == "OLLAMA_AGENT":
+        return get_tool_agent("ollama")
+    if name == "FuturepediaSearchTool":
+        return _search_tool_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def search_with_agent(query: str, backend: str = "ollama", k: Optional[str] = None) -> str:
     """Always use direct tool search for all queries, bypassing the agent."""
@@ -133,22 +152,7 @@ def search_with_agent(query: str, backend: str = "ollama", k: Optional[str] = No
             results = search_tools(query, int(k))
         if not results:
             return "No tools found for this query."
-        formatted_results = []
-        for t in results:
-            formatted_results.append(f"Tool: {t['name']}")
-            formatted_results.append(f"URL: {t['url']}")
-            formatted_results.append(f"Description: {t['blurb']}")
-            pricing = ''
-            if t['tags']:
-                pricing_types = [
-                    'Free', 'Freemium', 'Free Trial', 'Paid', 'Contact for Pricing'
-                ]
-                pricing = next((tag for tag in t['tags'] if tag in pricing_types), '')
-            formatted_results.append(f"Pricing: {pricing if pricing else 'Unknown'}")
-            if t['tags']:
-                formatted_results.append(f"Tags: {', '.join(t['tags'])}")
-            formatted_results.append("")
-        return "\n".join(formatted_results)
+        return format_tool_results(results)
     except Exception as e:
         logger.error(f"Error in direct tool search: {str(e)}")
         return f"Sorry, there was an error processing your request. Please try again with a different query." 
\ No newline at end of file
@@ -1,11 +1,112 @@
 import requests
-from bs4 import BeautifulSoup
 import logging
-from typing import List, Dict, Any
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from .extract import extract_tool_cards
+from .config import TOOL_SEARCH_TIMEOUT, TOOL_CACHE_TTL, TOOL_CACHE_SIZE, TOOL_MIN_SCORE, TOOL_MIN_HITS
 
 logger = logging.getLogger(__name__)
 
+PRICING_TYPES = ['Free', 'Freemium', 'Free Trial', 'Paid', 'Contact for Pricing']
+
+# Weight of embedding similarity vs. keyword overlap in the index score
+VECTOR_WEIGHT = 0.7
+
+_session = requests.Session()
+_session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# query -> (fetched_at, results) for live Futurepedia lookups, least recently used first
+_live_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_live_lock = threading.Lock()
+
+def _terms(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+def _search_index(query: str, k: Optional[int]) -> List[Dict[str, Any]]:
+    """Hybrid vector + keyword search over the tool index filled by FuturepediaSpider"""
+    from .database import connect_readonly, fetch_all_tools
+    from .embeddings import bytes_to_vec, get_model
+    import numpy as np
+
+    rows = fetch_all_tools(connect_readonly())
+    rows = [r for r in rows if r[5]]
+    if not rows:
+        return []
+
+    vecs = np.vstack([bytes_to_vec(r[5]) for r in rows])
+    qv = get_model().encode([query], convert_to_numpy=True)[0]
+    sims = vecs @ qv / (np.linalg.norm(vecs, axis=1) * np.linalg.norm(qv) + 1e-9)
+
+    q_terms = _terms(query)
+    scored = []
+    for (name, url, blurb, tags, pricing, _), sim in zip(rows, sims):
+        doc_terms = _terms(" ".join([name or "", blurb or "", *tags]))
+        keyword = len(q_terms & doc_terms) / len(q_terms) if q_terms else 0.0
+        score = VECTOR_WEIGHT * float(sim) + (1 - VECTOR_WEIGHT) * keyword
+        if score < TOOL_MIN_SCORE:
+            continue
+        tags = list(tags)
+        if pricing and pricing not in tags:
+            tags.append(pricing)
+        scored.append((score, {'name': name, 'url': url, 'blurb': blurb or 'No description available', 'tags': tags}))
+
+    scored.sort(key=lambda x: x[0], reverse=True)
+    results = [tool for _, tool in scored]
+    return results[:k] if k is not None else results
+
 def search_tools(query: str, k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Search for AI tools related to the query.
+
+    Answers from the local tool index when it has enough matches and only
+    falls back to a (cached) live Futurepedia query on a miss.
+
+    Args:
+        query: The search query
+        k: Number of results to return (None for all)
+
+    Returns:
+        List of tool dictionaries with name, url, blurb, and tags
+    """
+    try:
+        results = _search_index(query, k)
+    except Exception as e:
+        logger.error(f"Error searching tool index: {str(e)}")
+        results = []
+    wanted = k if k is not None else TOOL_MIN_HITS
+    if len(results) >= wanted:
+        logger.info(f"Answered tool search from index: {len(results)} tools")
+        return results
+
+    seen = {t['url'] for t in results}
+    results += [t for t in _live_search_cached(query) if t['url'] not in seen]
+    return results[:k] if k is not None else results
+
+def _live_search_cached(query: str) -> List[Dict[str, Any]]:
+    key = " ".join(query.lower().split())
+    with _live_lock:
+        hit = _live_cache.get(key)
+        if hit and time.time() - hit[0] < TOOL_CACHE_TTL:
+            _live_cache.move_to_end(key)
+            logger.info(f"Live tool search cache hit for: {key}")
+            return hit[1]
+    results = _live_search(query)
+    if results:
+        with _live_lock:
+            now = time.time()
+            _live_cache[key] = (now, results)
+            _live_cache.move_to_end(key)
+            # Expired entries are dropped on insert, then the least recently used over the cap
+            for stale in [q for q, (fetched, _) in _live_cache.items() if now - fetched >= TOOL_CACHE_TTL]:
+                del _live_cache[stale]
+            while len(_live_cache) > TOOL_CACHE_SIZE:
+                _live_cache.popitem(last=False)
+    return results
+
+def _live_search(query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Search Futurepedia.io for AI tools related to the query.
     
@@ -21,72 +122,11 @@ def search_tools(query: str, k: int = 5) -> List[Dict[str, Any]]:
         search_url = f"https://www.futurepedia.io/search?search={query.replace(' ', '+')}"
         logger.info(f"Searching Futurepedia with URL: {search_url}")
         
-        # Send request to Futurepedia
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(search_url, headers=headers)
+        # Send request to Futurepedia over the shared session
+        response = _session.get(search_url, timeout=TOOL_SEARCH_TIMEOUT)
         response.raise_for_status()
         
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all tool cards based on the new structure
-        tool_cards = soup.select('div.bg-card, div.flex.flex-col.bg-card')
-        if not tool_cards:
-            # Fallback to more generic selectors
-            tool_cards = soup.select('div[class*="card"], div[class*="flex flex-col"], a[href*="/tool/"]')
-        
-        logger.info(f"Found {len(tool_cards)} potential tool cards")
-        
-        # Limit to k results if k is provided
-        if k is not None:
-            tool_cards = tool_cards[:k]
-        
-        results = []
-        for card in tool_cards:
-            try:
-                # Extract tool name - look for the text within a p element with "font-semibold" class
-                name_elem = card.select_one('p.font-semibold, p[class*="font-semibold"], h3, h4, a > p')
-                name = name_elem.get_text(strip=True) if name_elem else 'Unknown Name'
-                
-                # Extract tool URL - find a containing href to /tool/
-                url_elem = card.select_one('a[href*="/tool/"]')
-                url = url_elem['href'] if url_elem and 'href' in url_elem.attrs else '#'
-                if not url.startswith('http'):
-                    url = f"https://www.futurepedia.io{url}"
-                
-                # Extract tool description - look for p element with class containing "overflow-hidden"
-                blurb_elem = card.select_one('p[class*="overflow-hidden"], p[class*="text-muted"], p[class*="line-clamp"]')
-                blurb = blurb_elem.get_text(strip=True) if blurb_elem else 'No description available'
-                
-                # Extract tags - look for a elements with href containing "/ai-tools/"
-                tag_elems = card.select('a[href*="/ai-tools/"]')
-                tags = [tag.get_text(strip=True) for tag in tag_elems]
-                
-                # Also extract pricing info if available
-                pricing_elem = card.select_one('div.flex.justify-between span, div.flex span:first-child')
-                pricing = pricing_elem.get_text(strip=True) if pricing_elem else ''
-                if pricing:
-                    tags.append(pricing)
-                
-                # Extract rating if available
-                rating_span = card.select_one('span.sr-only')
-                rating = rating_span.get_text(strip=True) if rating_span else ''
-                if rating:
-                    tags.append(rating)
-                
-                logger.info(f"Extracted tool: {name}")
-                results.append({
-                    'name': name,
-                    'url': url,
-                    'blurb': blurb,
-                    'tags': tags
-                })
-            except Exception as e:
-                logger.error(f"Error parsing tool card: {str(e)}")
-                continue
-                
+        results = extract_tool_cards(response.content, k)
         logger.info(f"Returning {len(results)} tools")
         return results
         
@@ -8,7 +8,7 @@ import sys
 import time
 from .tool_agent import search_with_agent
 import re
-from sqlalchemy.orm import Session
+from .database import SessionLocal
 from .models import Subscriber
 
 logger = logging.getLogger(__name__)
@@ -224,7 +224,7 @@ def launch():
                     return "Please enter a valid email address."
                 
                 # Add to database
-                with Session() as session:
+                with SessionLocal() as session:
                     existing = session.query(Subscriber).filter_by(email=email).first()
                     if existing:
                         if existing.is_active:
@@ -249,7 +249,7 @@ def launch():
                     return "Please enter a valid email address."
                 
                 # Remove from database
-                with Session() as session:
+                with SessionLocal() as session:
                     subscriber = session.query(Subscriber).filter_by(email=email).first()
                     if not subscriber or not subscriber.is_active:
                         return "This email is not subscribed."
@@ -0,0 +1,167 @@
+"""Job worker: leases jobs from the queue in news.db and runs them.
+
+    python -m aggregator.worker                     # run all job kinds, enqueue periodic jobs
+    python -m aggregator.worker --kinds summary     # only summary jobs
+    python -m aggregator.worker --enqueue scrape    # queue a one-off job and exit
+    python -m aggregator.worker --list dead         # inspect the dead-letter queue
+
+Scale by starting more workers (on any host that sees the same news.db); the lease
+in jobs.lease keeps a job on one worker at a time.
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, Optional
+from .config import BASE_DIR, JOB_POLL_INTERVAL
+from .database import connect, save_summary
+from .jobs import complete, enqueue, fail, lease, list_jobs, retry_dead
+from .scheduler import enqueue_due, enqueue_summary
+
+logger = logging.getLogger(__name__)
+
+# How often a worker with scheduling enabled calls scheduler.enqueue_due
+SCHEDULE_EVERY = 60
+
+
+def run_scrape(payload: Dict[str, Any], job: Dict[str, Any]):
+    # Twisted's reactor cannot be restarted, so every crawl gets a fresh process
+    with tempfile.TemporaryDirectory() as tmp:
+        status_file = os.path.join(tmp, "status.json")
+        proc = subprocess.run(
+            [sys.executable, "-m", "aggregator.scraper", "--status-file", status_file],
+            # Killed well before the lease runs out, so no other worker takes the job meanwhile
+            cwd=BASE_DIR, timeout=LEASE_SECONDS["scrape"] - LEASE_MARGIN,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"scraper exited with {proc.returncode}")
+        try:
+            with open(status_file) as f:
+                spiders = json.load(f).get("spiders", {})
+        except (OSError, ValueError):
+            spiders = {}
+    # New articles make the materialized summary stale
+    enqueue_summary(connect(), after=f"scrape-{job['id']}")
+    return {name: {"pages": s.get("pages"), "items": s.get("items")} for name, s in spiders.items()}
+
+
+def run_summary(payload: Dict[str, Any], job: Dict[str, Any]):
+    from .qa import build_summary
+    backend = payload.get("backend") or os.getenv("LLM_BACKEND", "gemini")
+    summary = build_summary(backend)
+    if summary is None:
+        return {"articles": 0}
+    if not summary.strip():
+        raise RuntimeError(f"{backend} returned an empty summary")
+    save_summary(connect(), backend, summary)
+    return {"backend": backend, "chars": len(summary)}
+
+
+def run_digest(payload: Dict[str, Any], job: Dict[str, Any]):
+    from .email_service import EmailService
+    EmailService().send_digest(is_weekly=payload.get("weekly", True))
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Any]] = {
+    "scrape": run_scrape,
+    "summary": run_summary,
+    "digest": run_digest,
+}
+
+# A job not finished within its lease is assumed lost and handed to another worker
+LEASE_SECONDS = {
+    "scrape": 2 * 3600,
+    "summary": 30 * 60,
+    "digest": 30 * 60,
+}
+# Time a handler keeps after its own timeout to clean up and report, within the lease
+LEASE_MARGIN = 10 * 60
+
+
+class Worker:
+    def __init__(self, kinds: Optional[Iterable[str]] = None, schedule: bool = True):
+        self.kinds = list(kinds or HANDLERS)
+        self.schedule = schedule
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.conn = None  # opened by the thread that runs the jobs
+        self.stopping = False
+        self._last_schedule = 0.0
+
+    def stop(self, *_):
+        logger.info(f"Worker {self.name} stopping after the current job")
+        self.stopping = True
+
+    def run_once(self) -> bool:
+        """Run at most one job; returns False when nothing was due"""
+        if self.conn is None:
+            self.conn = connect()
+        if self.schedule and time.time() - self._last_schedule >= SCHEDULE_EVERY:
+            enqueue_due(self.conn)
+            self._last_schedule = time.time()
+        job = lease(self.conn, self.name, LEASE_SECONDS, self.kinds)
+        if job is None:
+            return False
+        logger.info(f"Running job {job['id']} ({job['kind']}, attempt {job['attempt']}/{job['max_attempts']})")
+        started = time.perf_counter()
+        try:
+            result = HANDLERS[job["kind"]](job["payload"], job)
+        except Exception:
+            status = fail(self.conn, job, traceback.format_exc())
+            logger.error(f"Job {job['id']} ({job['kind']}) failed, now {status or 'owned by another worker'}",
+                         exc_info=True)
+        else:
+            if complete(self.conn, job, result):
+                logger.info(f"Job {job['id']} ({job['kind']}) done in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def run_forever(self):
+        logger.info(f"Worker {self.name} handling {', '.join(self.kinds)}")
+        while not self.stopping:
+            if not self.run_once():
+                time.sleep(JOB_POLL_INTERVAL)
+
+
+def main():
+    p = argparse.ArgumentParser("aggregator.worker")
+    p.add_argument("--kinds", nargs="+", choices=list(HANDLERS), help="job kinds to run (default: all)")
+    p.add_argument("--no-schedule", action="store_true", help="do not enqueue periodic jobs")
+    p.add_argument("--once", action="store_true", help="run due jobs, then exit")
+    p.add_argument("--enqueue", choices=list(HANDLERS), help="queue a one-off job and exit")
+    p.add_argument("--payload", default="{}", help="JSON payload for --enqueue")
+    p.add_argument("--list", nargs="?", const="", metavar="STATUS", help="show recent jobs and exit")
+    p.add_argument("--retry", type=int, metavar="JOB_ID", help="requeue a dead-lettered job and exit")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    conn = connect()
+    if args.enqueue:
+        print(f"Queued job {enqueue(conn, args.enqueue, json.loads(args.payload))}")
+        return
+    if args.list is not None:
+        for row in list_jobs(conn, args.list or None):
+            print(json.dumps(row))
+        return
+    if args.retry is not None:
+        print("Requeued" if retry_dead(conn, args.retry) else f"Job {args.retry} is not dead-lettered")
+        return
+
+    worker = Worker(args.kinds, schedule=not args.no_schedule)
+    if args.once:
+        while worker.run_once():
+            pass
+        return
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Article body storage benchmark: inline `articles.content` vs. compressed `article_bodies`.
+
+Builds a synthetic database in the old layout (long bodies inline in the
+articles rows), measures file size, a full embedding scan (what vector search
+reads) and `fetch_recent` (what summaries and digests read), then moves the
+bodies out with `move_bodies_out`, VACUUMs and measures again.
+
+    python benchmarks/body_storage_bench.py [--articles 20000] [--body-words 1500]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+EMBED_DIM = 384
+WORDS = ("model agent token context latency benchmark open weights release inference "
+         "training dataset eval paper reasoning GPU cluster fine-tune prompt API vector").split()
+
+
+def build_corpus(path: Path, n: int, body_words: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    words = random.Random(seed)
+    now = int(time.time())
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE articles (
+            id INTEGER PRIMARY KEY, source TEXT, title TEXT, author TEXT,
+            published_ts INTEGER, url TEXT UNIQUE, content TEXT, embedding BLOB,
+            source_type TEXT NOT NULL DEFAULT 'news');
+        CREATE INDEX idx_date ON articles(published_ts);
+    """)
+    with conn:
+        conn.executemany(
+            "INSERT INTO articles(source,title,published_ts,url,content,embedding) VALUES (?,?,?,?,?,?)",
+            (("smol.ai", f"Synthetic issue {i}", now - i * 3600, f"https://example.com/{i}",
+              " ".join(words.choice(WORDS) for _ in range(body_words)),
+              rng.standard_normal(EMBED_DIM).astype(np.float32).tobytes())
+             for i in range(n)),
+        )
+    conn.close()
+
+
+def timed(fn, repeat: int) -> float:
+    """Best-of-`repeat` wall time in ms"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def measure(db_path: Path, database, repeat: int) -> dict:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            "db_mb": round(db_path.stat().st_size / 2**20, 1),
+            "embedding_scan_ms": timed(lambda: database.fetch_embeddings(conn), repeat),
+            "fetch_recent_7d_ms": timed(lambda: database.fetch_recent(conn, days=7), repeat),
+        }
+    finally:
+        conn.close()
+
+
+def main():
+    p = argparse.ArgumentParser("Article body storage benchmark")
+    p.add_argument("--articles", type=int, default=20000)
+    p.add_argument("--body-words", type=int, default=1500)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = Path(tmp.name) / "news.db"
+    build_corpus(db_path, args.articles, args.body_words)
+    os.environ["NEWS_DB_PATH"] = str(db_path)
+    sys.path.insert(0, str(ROOT))
+    from aggregator import database
+    from aggregator.compression import active_codec
+
+    database.init_schema()  # adds the (empty) article_bodies table, like app start-up would
+    report = {"articles": args.articles, "codec": active_codec(), "before": measure(db_path, database, args.repeat)}
+
+    conn = sqlite3.connect(db_path)
+    started = time.perf_counter()
+    with conn:
+        moved = database.move_bodies_out(conn)
+    report["migrate_s"] = round(time.perf_counter() - started, 2)
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    report["after"] = measure(db_path, database, args.repeat)
+
+    print(f"{moved} bodies moved in {report['migrate_s']} s ({report['codec']})")
+    for key in report["before"]:
+        before, after = report["before"][key], report["after"][key]
+        print(f"{key:20} before={before:10} after={after:10}  x{round(before / after, 2) if after else '-'}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
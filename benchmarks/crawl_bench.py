@@ -0,0 +1,165 @@
+"""Offline crawl benchmark: replay recorded pages through the real spiders and pipeline.
+
+Requests are answered from benchmarks/fixtures (see manifest.json) by a downloader
+middleware, so no site is contacted. Items go through the real SQLitePipeline
+(embedding pool included) into a throwaway database, and the report gives pages/s,
+parse ms/page, embed ms/item and DB write ms/item per spider.
+
+    python benchmarks/crawl_bench.py [--batch-size 50] [--output report.json]
+    python benchmarks/crawl_bench.py --record   # refresh fixtures from the live sites
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+MANIFEST = FIXTURES / "manifest.json"
+
+
+class ReplayMiddleware:
+    """Downloader middleware serving responses from the fixture manifest."""
+
+    def __init__(self):
+        self.manifest = json.loads(MANIFEST.read_text())
+
+    def process_request(self, request, spider):
+        from scrapy.http import HtmlResponse
+
+        path = self.manifest.get(request.url)
+        if path is None:
+            return HtmlResponse(request.url, status=404, body=b"", request=request)
+        body = (FIXTURES / path).read_bytes()
+        return HtmlResponse(request.url, status=200, body=body, encoding="utf-8", request=request)
+
+
+class RecordMiddleware:
+    """Downloader middleware saving live responses into the fixture manifest."""
+
+    def __init__(self):
+        self.manifest = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+
+    def process_response(self, request, response, spider):
+        if response.status == 200:
+            url = urlparse(response.url)
+            name = hashlib.sha1(response.url.encode()).hexdigest()[:12] + ".html"
+            path = Path(spider.name) / "recorded" / url.netloc / name
+            (FIXTURES / path).parent.mkdir(parents=True, exist_ok=True)
+            (FIXTURES / path).write_bytes(response.body)
+            self.manifest[response.url] = str(path)
+            MANIFEST.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+        return response
+
+
+class ParseTimingMiddleware:
+    """Spider middleware accumulating time spent inside spider callbacks."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_spider_output(self, response, result, spider):
+        it = iter(result)
+        while True:
+            start = time.perf_counter()
+            try:
+                out = next(it)
+            except StopIteration:
+                self.stats.inc_value("bench/parse_ms", (time.perf_counter() - start) * 1000)
+                self.stats.inc_value("bench/parsed_pages")
+                return
+            self.stats.inc_value("bench/parse_ms", (time.perf_counter() - start) * 1000)
+            yield out
+
+
+def summarize(name, stats, elapsed):
+    pages = stats.get("bench/parsed_pages", 0)
+    items = stats.get("pipeline/items", 0)
+    return {
+        "spider": name,
+        "pages": pages,
+        "items": items,
+        "inserted": stats.get("pipeline/inserted", 0),
+        "elapsed_s": round(elapsed, 3),
+        "pages_per_s": round(pages / elapsed, 2) if elapsed else None,
+        "parse_ms_per_page": round(stats.get("bench/parse_ms", 0) / pages, 3) if pages else None,
+        "embed_ms_per_item": round(stats.get("pipeline/embed_ms", 0) / items, 3) if items else None,
+        "db_write_ms_per_item": round(stats.get("pipeline/db_write_ms", 0) / items, 3) if items else None,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser("crawl benchmark")
+    p.add_argument("--record", action="store_true", help="fetch live pages and add them to the fixtures")
+    p.add_argument("--batch-size", type=int, help="items per DB transaction (default: INGEST_BATCH_SIZE)")
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    # The pipeline writes to whatever NEWS_DB_PATH points at; keep it away from news.db
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["NEWS_DB_PATH"] = str(Path(tmp.name) / "bench.db")
+    sys.path.insert(0, str(ROOT))
+
+    from scrapy.crawler import CrawlerProcess
+    from aggregator.scrape import SmolAISpider, TechCrunchAISpider, FuturepediaSpider
+    from aggregator.scraper import crawl_settings
+    from aggregator.embeddings import shutdown_pool
+
+    settings = crawl_settings()
+    settings["LOG_LEVEL"] = "WARNING"
+    settings["HTTPCACHE_ENABLED"] = False  # measure the ingest path, not cache hits
+    if args.batch_size:
+        settings["INGEST_BATCH_SIZE"] = args.batch_size
+    if args.record:
+        settings["DOWNLOADER_MIDDLEWARES"] = {RecordMiddleware: 950}
+    else:
+        settings["DOWNLOADER_MIDDLEWARES"] = {ReplayMiddleware: 1}
+        settings["SPIDER_MIDDLEWARES"] = {ParseTimingMiddleware: 1000}
+
+    process = CrawlerProcess(settings)
+    crawlers = []
+    for sp in (SmolAISpider, TechCrunchAISpider, FuturepediaSpider):
+        crawler = process.create_crawler(sp)
+        crawlers.append(crawler)
+        process.crawl(crawler)
+
+    started = time.perf_counter()
+    try:
+        process.start()
+    finally:
+        shutdown_pool()
+    elapsed = time.perf_counter() - started
+    if args.record:
+        print(f"Recorded fixtures into {MANIFEST}")
+        return
+
+    report = []
+    for crawler in crawlers:
+        stats = crawler.stats.get_stats()
+        spider_elapsed = (stats["finish_time"] - stats["start_time"]).total_seconds()
+        report.append(summarize(crawler.spidercls.name, stats, spider_elapsed))
+    totals = {k: sum(r[k] for r in report) for k in ("pages", "items")}
+    report.append({"spider": "total", **totals, "elapsed_s": round(elapsed, 3),
+                   "pages_per_s": round(totals["pages"] / elapsed, 2)})
+
+    print(f"{'spider':14} {'pages':>6} {'items':>6} {'pages/s':>8} {'parse ms':>9} {'embed ms':>9} {'db ms':>7}")
+    for r in report:
+        print(f"{r['spider']:14} {r['pages']:6} {r['items']:6} {r['pages_per_s'] or 0:8.1f} "
+              f"{r.get('parse_ms_per_page') or 0:9.2f} {r.get('embed_ms_per_item') or 0:9.2f} "
+              f"{r.get('db_write_ms_per_item') or 0:7.2f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Smoke crawl: start the crawler process with the real settings and a no-op spider.
+
+Imports aggregator.scraper the way `python -m aggregator.scraper` does, so a module
+that installs a Twisted reactor too early (Scrapy then refuses to start with
+"The installed reactor ... does not match the requested one") fails here. The
+spider fetches one `data:` URL and yields nothing; the pipeline writes to a
+throwaway database. Exits non-zero unless the crawl finishes normally.
+
+    python benchmarks/crawl_smoke.py
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["NEWS_DB_PATH"] = str(Path(tmp.name) / "smoke.db")
+    sys.path.insert(0, str(ROOT))
+
+    import scrapy
+    from scrapy.crawler import CrawlerProcess
+    from aggregator.scraper import crawl_settings
+    from aggregator.embeddings import shutdown_pool
+
+    class NoopSpider(scrapy.Spider):
+        name = "noop"
+        start_urls = ["data:,ok"]
+
+        def parse(self, response):
+            return []
+
+    settings = crawl_settings()
+    settings["LOG_LEVEL"] = "WARNING"
+    settings["HTTPCACHE_ENABLED"] = False
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(NoopSpider)
+    process.crawl(crawler)
+    try:
+        process.start()
+    finally:
+        shutdown_pool()
+
+    stats = crawler.stats.get_stats()
+    reason, pages = stats.get("finish_reason"), stats.get("response_received_count", 0)
+    print(f"finish_reason={reason} pages={pages}")
+    if reason != "finished" or pages != 1:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
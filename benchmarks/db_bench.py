@@ -0,0 +1,113 @@
+"""SQLite connection benchmark: per-call connections vs. pooled, tuned connections.
+
+"before" reproduces the old `database.connect()` (new connection, WAL pragma and
+the full schema script on every call, never closed); "after" uses the pooled
+`connect_readonly()`. Both run the same query mix against a synthetic N-article
+database, from one and from several threads, and report queries/s.
+
+    python benchmarks/db_bench.py [--articles 5000] [--threads 1 8] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+EMBED_DIM = 384
+
+
+def build_corpus(path: Path, n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, EMBED_DIM)).astype(np.float32)
+    now = int(time.time())
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY, source TEXT, title TEXT, author TEXT,
+            published_ts INTEGER, url TEXT UNIQUE, content TEXT, embedding BLOB);
+        CREATE INDEX IF NOT EXISTS idx_date ON articles(published_ts);
+    """)
+    with conn:
+        conn.executemany(
+            "INSERT INTO articles(source,title,author,published_ts,url,content,embedding) VALUES (?,?,?,?,?,?,?)",
+            ((random.choice(["smol.ai", "TechCrunch", "Futurepedia"]), f"Synthetic {i}", None,
+              now - i * 600, f"https://example.com/{i}", "synthetic article body " * 40, vecs[i].tobytes())
+             for i in range(n)),
+        )
+    conn.close()
+
+
+def old_connect(db_path, schema):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(schema)
+    return conn
+
+
+def run(get_conn, fetch_recent, threads: int, seconds: float, n: int):
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def loop(t):
+        rng = random.Random(t)
+        while time.perf_counter() < deadline:
+            conn = get_conn()
+            if counts[t] % 2:
+                fetch_recent(conn, days=1)
+            else:
+                conn.execute("SELECT title, url FROM articles WHERE url = ?",
+                             (f"https://example.com/{rng.randrange(n)}",)).fetchone()
+            counts[t] += 1
+
+    workers = [threading.Thread(target=loop, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def main():
+    p = argparse.ArgumentParser("SQLite connection benchmark")
+    p.add_argument("--articles", type=int, default=5000)
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    p.add_argument("--seconds", type=float, default=5.0, help="duration of each measurement")
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = Path(tmp.name) / "news.db"
+    build_corpus(db_path, args.articles)
+    os.environ["NEWS_DB_PATH"] = str(db_path)
+    sys.path.insert(0, str(ROOT))
+    from aggregator.database import SCHEMA, connect_readonly, fetch_recent
+
+    modes = {
+        "before": lambda: old_connect(db_path, SCHEMA),
+        "after": connect_readonly,
+    }
+    report = []
+    for threads in args.threads:
+        row = {"threads": threads}
+        for mode, get_conn in modes.items():
+            row[f"{mode}_qps"] = round(run(get_conn, fetch_recent, threads, args.seconds, args.articles), 1)
+        row["speedup"] = round(row["after_qps"] / row["before_qps"], 2)
+        report.append(row)
+        print(f"threads={threads:<3} before={row['before_qps']:10.1f} q/s  after={row['after_qps']:10.1f} q/s  "
+              f"x{row['speedup']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"articles": args.articles, "levels": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import-time profile of the FastAPI backend (`python -X importtime`).
+
+Runs a fresh interpreter that imports what a cold `/subscribe` request needs,
+reports the slowest imports and fails if the cold-start budget is exceeded or
+a heavy dependency is loaded eagerly.
+
+    python benchmarks/import_time.py [--output report.json] [--top 25]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What the container imports at startup plus what the first /subscribe call pulls in
+COLD_START_MODULES = ["aggregator.api", "aggregator.email_service"]
+
+# Cumulative import time allowed for COLD_START_MODULES (documented in README)
+COLD_START_BUDGET_MS = 1500
+
+# None of these are needed to serve /subscribe
+HEAVY_MODULES = ["torch", "sentence_transformers", "sklearn", "scrapy", "twisted", "langchain", "gradio"]
+
+
+def profile(modules):
+    stmt = "import sys, json; " + "; ".join(f"import {m}" for m in modules) + \
+        "; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        # Drop the one space after the separator; what is left is the nesting indentation
+        rows.append({"module": name[1:].rstrip(), "self_us": int(self_us), "cumulative_us": int(cum_us)})
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return rows, loaded
+
+
+def main():
+    p = argparse.ArgumentParser("import-time benchmark")
+    p.add_argument("--output", help="write the JSON report here")
+    p.add_argument("--top", type=int, default=25)
+    args = p.parse_args()
+
+    rows, loaded = profile(COLD_START_MODULES)
+    # Top-level entries (no leading indentation) add up to the whole import, interpreter
+    # start-up (site, encodings) included
+    total_ms = sum(r["cumulative_us"] for r in rows if not r["module"].startswith(" ")) / 1000
+    heavy = sorted({m.split(".")[0] for m in loaded} & set(HEAVY_MODULES))
+
+    print(f"Cold-start import of {', '.join(COLD_START_MODULES)}: {total_ms:.0f} ms "
+          f"(budget {COLD_START_BUDGET_MS} ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for r in sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:args.top]:
+        print(f"{r['cumulative_us'] / 1000:14.1f} {r['self_us'] / 1000:9.1f}  {r['module']}")
+    if heavy:
+        print(f"Heavy modules loaded eagerly: {', '.join(heavy)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "modules": COLD_START_MODULES,
+            "total_ms": round(total_ms, 1),
+            "budget_ms": COLD_START_BUDGET_MS,
+            "heavy_modules": heavy,
+            "imports": rows,
+        }, indent=2))
+
+    sys.exit(1 if heavy or total_ms > COLD_START_BUDGET_MS else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Local stand-in for the Ollama, Groq (OpenAI-compatible) and Gemini HTTP APIs.
+
+Answers every request after a configurable first-token latency plus a per-token
+delay, so QA benchmarks exercise the real request path without paying for a
+provider. Point the app at it with
+
+    OLLAMA_URL=http://127.0.0.1:8765/api/generate
+    GROQ_API_URL=http://127.0.0.1:8765/openai/v1/chat/completions
+    GEMINI_API_URL=http://127.0.0.1:8765/v1beta
+    GROQ_API_KEY=mock GEMINI_API_KEY=mock
+
+    python benchmarks/mock_llm.py [--port 8765] [--latency 0.2] [--tokens-per-sec 200] [--rpm 30]
+
+With --rpm, the Groq and Gemini endpoints answer 429 (with Retry-After) beyond
+that many requests per minute, like the hosted free tiers do. With --kv-slots N,
+the Ollama endpoints keep the prompt tokens of the last N requests like Ollama's
+runner keeps each slot's KV cache: only tokens after the longest cached prefix are
+evaluated (and reported in prompt_eval_count).
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def tokenize(text: str) -> list:
+    # Rough whitespace/punctuation split; good enough to scale simulated prompt cost
+    return re.findall(r"\w+|[^\w\s]", text)
+
+
+def count_tokens(text: str) -> int:
+    return len(tokenize(text))
+
+
+def _common_prefix(a: list, b: list) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    # Set by make_server()
+    latency = 0.2
+    tokens_per_sec = 200.0
+    output_tokens = 300
+    prompt_tokens_per_sec = 2000.0
+    rpm = 0  # 0 = no rate limit
+    _recent: deque = deque()
+    _recent_lock = threading.Lock()
+    kv_slots = 0  # 0 = no prompt cache
+    # Shared with the benchmark: slot caches and prompt token counters
+    state: dict = {"slots": [], "prompt_tokens": 0, "evaluated_tokens": 0, "lock": threading.Lock()}
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _rate_limited(self) -> bool:
+        """Record a hosted-API request; True (and a 429 sent) when over `rpm`"""
+        if not self.rpm:
+            return False
+        now = time.monotonic()
+        with self._recent_lock:
+            while self._recent and self._recent[0] <= now - 60:
+                self._recent.popleft()
+            if len(self._recent) < self.rpm:
+                self._recent.append(now)
+                return False
+            retry_after = self._recent[0] + 60 - now
+        self.send_response(429)
+        self.send_header("Retry-After", str(max(1, round(retry_after))))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _cached_tokens(self, tokens: list) -> int:
+        """Longest cached prefix of `tokens`; the best-matching (or oldest) slot now holds them"""
+        state = self.state
+        with state["lock"]:
+            slots = state["slots"]
+            best, cached = None, 0
+            for i, slot in enumerate(slots):
+                n = _common_prefix(slot, tokens)
+                if n > cached:
+                    best, cached = i, n
+            if best is not None:
+                slots.pop(best)
+            elif len(slots) >= self.kv_slots:
+                slots.pop(0)
+            slots.append(tokens)
+            return cached
+
+    def _simulate(self, prompt: str, max_tokens: int, kv_cache: bool = False):
+        """Sleep like a model would; returns (text, evaluated prompt tokens, output_tokens, prompt_eval_s)."""
+        tokens = tokenize(prompt)
+        cached = self._cached_tokens(tokens) if kv_cache and self.kv_slots else 0
+        n_prompt = len(tokens) - cached
+        with self.state["lock"]:
+            self.state["prompt_tokens"] += len(tokens)
+            self.state["evaluated_tokens"] += n_prompt
+        n_out = min(max_tokens or self.output_tokens, self.output_tokens)
+        prompt_eval = n_prompt / self.prompt_tokens_per_sec
+        time.sleep(self.latency + prompt_eval + n_out / self.tokens_per_sec)
+        text = " ".join(["token"] * n_out)
+        return text, n_prompt, n_out, prompt_eval
+
+    def do_GET(self):
+        self._reply({"status": "ok"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        if self.path.startswith("/api/generate"):
+            opts = body.get("options") or {}
+            text, n_prompt, n_out, prompt_eval = self._simulate(body.get("prompt", ""), opts.get("num_predict"), True)
+            self._reply({
+                "model": body.get("model"), "response": text, "done": True,
+                "prompt_eval_count": n_prompt, "prompt_eval_duration": int(prompt_eval * 1e9),
+                "eval_count": n_out,
+            })
+        elif self.path.startswith("/api/chat"):
+            opts = body.get("options") or {}
+            prompt = "\n".join(f"<{m.get('role')}>{m.get('content', '')}" for m in body.get("messages", []))
+            text, n_prompt, n_out, prompt_eval = self._simulate(prompt, opts.get("num_predict"), True)
+            self._reply({
+                "model": body.get("model"), "message": {"role": "assistant", "content": text}, "done": True,
+                "prompt_eval_count": n_prompt, "prompt_eval_duration": int(prompt_eval * 1e9),
+                "eval_count": n_out,
+            })
+        elif (self.path.endswith("/chat/completions") or ":generateContent" in self.path) and self._rate_limited():
+            return
+        elif self.path.endswith("/chat/completions"):
+            prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+            text, n_prompt, n_out, _ = self._simulate(prompt, body.get("max_tokens"))
+            self._reply({
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": n_prompt, "completion_tokens": n_out},
+            })
+        elif ":generateContent" in self.path:
+            prompt = "\n".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+            max_tokens = (body.get("generationConfig") or {}).get("maxOutputTokens")
+            text, n_prompt, n_out, _ = self._simulate(prompt, max_tokens)
+            self._reply({
+                "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}],
+                "usageMetadata": {"promptTokenCount": n_prompt, "candidatesTokenCount": n_out},
+            })
+        else:
+            self.send_error(404)
+
+
+def make_server(port: int = 8765, latency: float = 0.2, tokens_per_sec: float = 200.0,
+                output_tokens: int = 300, prompt_tokens_per_sec: float = 2000.0,
+                rpm: int = 0, kv_slots: int = 0) -> ThreadingHTTPServer:
+    handler = type("Handler", (MockLLMHandler,), {
+        "latency": latency, "tokens_per_sec": tokens_per_sec,
+        "output_tokens": output_tokens, "prompt_tokens_per_sec": prompt_tokens_per_sec,
+        "rpm": rpm, "_recent": deque(), "_recent_lock": threading.Lock(),
+        "kv_slots": kv_slots,
+        "state": {"slots": [], "prompt_tokens": 0, "evaluated_tokens": 0, "lock": threading.Lock()},
+    })
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def serve_in_background(**kwargs) -> ThreadingHTTPServer:
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    p = argparse.ArgumentParser("mock LLM server")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--latency", type=float, default=0.2, help="seconds before the first token")
+    p.add_argument("--tokens-per-sec", type=float, default=200.0, help="generation speed")
+    p.add_argument("--output-tokens", type=int, default=300, help="tokens per answer (capped by max_tokens)")
+    p.add_argument("--prompt-tokens-per-sec", type=float, default=2000.0, help="prompt evaluation speed")
+    p.add_argument("--rpm", type=int, default=0, help="429 Groq/Gemini requests beyond this many per minute")
+    p.add_argument("--kv-slots", type=int, default=0, help="simulate Ollama's per-slot prompt (KV) cache")
+    args = p.parse_args()
+    server = make_server(args.port, args.latency, args.tokens_per_sec, args.output_tokens, args.prompt_tokens_per_sec,
+                         args.rpm, args.kv_slots)
+    print(f"Mock LLM listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Per-page parse time: BeautifulSoup (previous approach) vs. aggregator.extract (lxml).
+
+Runs both extractors over every saved page in benchmarks/fixtures and reports the
+median milliseconds per page. Search pages go through the tool-card extractor,
+everything else through the article extractor, with the spider's own selectors for
+TechCrunch and smol.ai pages.
+
+    python benchmarks/parse_bench.py [--repeat 20] [--output report.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aggregator.extract import extract_article, extract_tool_cards  # noqa: E402
+from aggregator.scrape import SmolAISpider, TechCrunchAISpider  # noqa: E402
+
+# Fixture directory -> spider whose selectors parse its article pages
+SITE_SPIDERS = {"techcrunch": TechCrunchAISpider, "smol_ai": SmolAISpider}
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def bs4_article(markup):
+    # BaseNewsSpider.parse_article before the lxml extractor
+    soup = BeautifulSoup(markup, "lxml")
+    paragraphs = "\n".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
+    title = soup.find("title").get_text() if soup.title else None
+    return {"title": title, "content": paragraphs}
+
+
+def bs4_tool_cards(markup):
+    # tool_search.search_tools before the lxml extractor
+    soup = BeautifulSoup(markup, "html.parser")
+    cards = soup.select('div.bg-card, div.flex.flex-col.bg-card') or \
+        soup.select('div[class*="card"], div[class*="flex flex-col"], a[href*="/tool/"]')
+    results = []
+    for card in cards:
+        name_elem = card.select_one('p.font-semibold, p[class*="font-semibold"], h3, h4, a > p')
+        url_elem = card.select_one('a[href*="/tool/"]')
+        blurb_elem = card.select_one('p[class*="overflow-hidden"], p[class*="text-muted"], p[class*="line-clamp"]')
+        tags = [t.get_text(strip=True) for t in card.select('a[href*="/ai-tools/"]')]
+        pricing = card.select_one('div.flex.justify-between span, div.flex span:first-child')
+        rating = card.select_one('span.sr-only')
+        results.append({
+            "name": name_elem.get_text(strip=True) if name_elem else None,
+            "url": url_elem["href"] if url_elem else None,
+            "blurb": blurb_elem.get_text(strip=True) if blurb_elem else None,
+            "tags": tags + [e.get_text(strip=True) for e in (pricing, rating) if e],
+        })
+    return results
+
+
+def site_extractor(spider):
+    # What the spider's article callback runs: extract_article with its selectors
+    return lambda markup: extract_article(markup, spider.title_selector, spider.content_selector,
+                                          spider.tags_selector)
+
+
+def timed(fn, markup, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(markup)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    p = argparse.ArgumentParser("parser benchmark")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    rows = []
+    for path in sorted(FIXTURES.rglob("*.html")):
+        markup = path.read_bytes()
+        if "search" in path.stem:
+            old, new = bs4_tool_cards, extract_tool_cards
+        elif path.parent.name in SITE_SPIDERS:
+            old, new = bs4_article, site_extractor(SITE_SPIDERS[path.parent.name])
+        else:
+            old, new = bs4_article, extract_article
+        rows.append({
+            "page": str(path.relative_to(FIXTURES)),
+            "kb": round(len(markup) / 1024, 1),
+            "bs4_ms": round(timed(old, markup, args.repeat), 3),
+            "lxml_ms": round(timed(new, markup, args.repeat), 3),
+        })
+
+    print(f"{'page':32} {'KB':>6} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}")
+    for r in rows:
+        print(f"{r['page']:32} {r['kb']:6.1f} {r['bs4_ms']:9.2f} {r['lxml_ms']:9.2f} "
+              f"{r['bs4_ms'] / r['lxml_ms']:7.1f}x")
+    total_old = sum(r["bs4_ms"] for r in rows)
+    total_new = sum(r["lxml_ms"] for r in rows)
+    print(f"{'mean per page':32} {'':6} {total_old / len(rows):9.2f} {total_new / len(rows):9.2f} "
+          f"{total_old / total_new:7.1f}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Prompt-eval cost of the weekly-summary map step: inline prompts vs. prefix + suffix.
+
+Starts benchmarks/mock_llm.py with a slow prompt evaluation speed and a per-slot
+prompt (KV) cache, then sends the same synthetic chunks through
+`LLM("ollama").generate_many` twice: in the old layout (instructions and article
+text in one /api/generate prompt, the language instruction at the end) and in the
+current one (SUMMARY_MAP_PREFIX as the system message, the chunk as the user
+message). Reports prompt tokens sent and evaluated, simulated prompt-eval time
+and wall time.
+
+    python benchmarks/prompt_prefix_bench.py [--chunks 16] [--chunk-words 600] [--prompt-tokens-per-sec 300]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_llm import serve_in_background  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+WORDS = ("model agent token context latency benchmark open weights release inference "
+         "training dataset eval paper reasoning GPU cluster fine-tune prompt API vector").split()
+LANGUAGE = "Write the summary in Arabic."
+
+
+def make_chunks(n: int, words: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return ["\n\n".join(f"Synthetic issue {i}.{j}\n" + " ".join(rng.choice(WORDS) for _ in range(words // 3))
+                        for j in range(3))
+            for i in range(n)]
+
+
+def run(llm, prompts: list, prefix, state: dict, concurrency: int) -> dict:
+    with state["lock"]:
+        state["slots"].clear()
+        state["prompt_tokens"] = state["evaluated_tokens"] = 0
+    started = time.perf_counter()
+    results = llm.generate_many(prompts, max_tokens=64, concurrency=concurrency, prefix=prefix)
+    wall = time.perf_counter() - started
+    failed = [r.error for r in results if not r.ok]
+    if failed:
+        raise SystemExit(f"{len(failed)} calls failed: {failed[0]}")
+    return {
+        "prompt_tokens": state["prompt_tokens"],
+        "evaluated_tokens": state["evaluated_tokens"],
+        "wall_s": round(wall, 2),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser("Prompt prefix reuse benchmark")
+    p.add_argument("--chunks", type=int, default=16)
+    p.add_argument("--chunk-words", type=int, default=600)
+    p.add_argument("--concurrency", type=int, default=2, help="parallel calls, and the mock's KV slots")
+    p.add_argument("--prompt-tokens-per-sec", type=float, default=300.0)
+    p.add_argument("--llm-port", type=int, default=8767)
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    mock = serve_in_background(port=args.llm_port, latency=0.05, tokens_per_sec=2000.0, output_tokens=64,
+                               prompt_tokens_per_sec=args.prompt_tokens_per_sec, kv_slots=args.concurrency)
+    base = f"http://127.0.0.1:{args.llm_port}"
+    os.environ["OLLAMA_URL"] = f"{base}/api/generate"
+    os.environ["OLLAMA_CHAT_URL"] = f"{base}/api/chat"
+    sys.path.insert(0, str(ROOT))
+    from aggregator.llm import LLM
+    from aggregator.prompts import SUMMARY_MAP_PREFIX, SUMMARY_MAP_SUFFIX
+
+    llm = LLM("ollama")
+    state = mock.RequestHandlerClass.state
+    chunks = make_chunks(args.chunks, args.chunk_words)
+    inline = [f"{SUMMARY_MAP_PREFIX}\n\n{SUMMARY_MAP_SUFFIX.format(content=c)}\n{LANGUAGE}" for c in chunks]
+    split = [SUMMARY_MAP_SUFFIX.format(content=c) for c in chunks]
+
+    report = {"chunks": args.chunks, "concurrency": args.concurrency,
+              "prompt_tokens_per_sec": args.prompt_tokens_per_sec}
+    # Long instruction prefix, as with the QA and summary templates, to show what reuse saves per call
+    long_prefix = f"{SUMMARY_MAP_PREFIX}\n\n" + "\n".join(f"{i}. {' '.join(WORDS[i:] + WORDS[:i])}" for i in range(12))
+    cases = {
+        "inline": (inline, None),
+        "prefix": (split, f"{SUMMARY_MAP_PREFIX}\n{LANGUAGE}"),
+        "inline_long_instructions": ([f"{long_prefix}\n\n{s}\n{LANGUAGE}" for s in split], None),
+        "prefix_long_instructions": (split, f"{long_prefix}\n{LANGUAGE}"),
+    }
+    for name, (prompts, prefix) in cases.items():
+        result = run(llm, prompts, prefix, state, args.concurrency)
+        result["prompt_eval_s"] = round(result["evaluated_tokens"] / args.prompt_tokens_per_sec, 2)
+        report[name] = result
+        print(f"{name:26} sent={result['prompt_tokens']:7} evaluated={result['evaluated_tokens']:7} "
+              f"prompt_eval={result['prompt_eval_s']:6}s wall={result['wall_s']:6}s")
+    mock.shutdown()
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
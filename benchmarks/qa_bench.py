@@ -0,0 +1,184 @@
+"""End-to-end latency of /chat and /summarize against the mock LLM server.
+
+Builds a synthetic N-article news.db, starts benchmarks/mock_llm.py and a uvicorn
+instance of aggregator.api pointed at both, then drives the endpoints at each
+concurrency level. Reports p50/p95/p99 latency, throughput, and the mean
+retrieval / LLM / DB time taken from the API's Server-Timing header.
+
+    python benchmarks/qa_bench.py [--articles 500] [--concurrency 1 4 16] [--requests 32]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_llm import serve_in_background  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+EMBED_DIM = 384
+
+WORDS = ("model agent benchmark open weights release startup funding dataset context "
+         "latency GPU reasoning multimodal alignment safety regulation pricing").split()
+SOURCES = ["smol.ai", "TechCrunch", "Futurepedia"]
+QUESTIONS = [
+    "What did the latest open weights release change?",
+    "Which startups raised funding for AI agents?",
+    "What is new in multimodal reasoning models?",
+    "How are regulators approaching AI safety?",
+]
+
+
+def build_corpus(path: Path, n: int, days: int, seed: int = 0):
+    """Synthetic articles with random unit embeddings spread over the last `days` days."""
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    vecs = rng.standard_normal((n, EMBED_DIM)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    now = int(time.time())
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY, source TEXT, title TEXT, author TEXT,
+            published_ts INTEGER, url TEXT UNIQUE, content TEXT, embedding BLOB);
+        CREATE INDEX IF NOT EXISTS idx_date ON articles(published_ts);
+    """)
+    rows = []
+    for i in range(n):
+        content = " ".join(random.choice(WORDS) for _ in range(random.randint(200, 800)))
+        rows.append((random.choice(SOURCES), f"Synthetic article {i}", None,
+                     now - random.randint(0, days * 86400), f"https://example.com/a/{i}",
+                     content, vecs[i].tobytes()))
+    with conn:
+        conn.executemany(
+            "INSERT INTO articles(source,title,author,published_ts,url,content,embedding) VALUES (?,?,?,?,?,?,?)",
+            rows)
+    conn.close()
+
+
+def parse_server_timing(header: str) -> dict:
+    spans = {}
+    for part in filter(None, (p.strip() for p in (header or "").split(","))):
+        name, _, dur = part.partition(";dur=")
+        spans[name] = float(dur or 0)
+    return spans
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def run_level(base_url, endpoint, backend, concurrency, n_requests):
+    def one(i):
+        start = time.perf_counter()
+        if endpoint == "chat":
+            r = requests.post(f"{base_url}/chat", json={"question": QUESTIONS[i % len(QUESTIONS)], "backend": backend},
+                              timeout=600)
+        else:
+            r = requests.get(f"{base_url}/summarize", params={"backend": backend}, timeout=600)
+        return (time.perf_counter() - start) * 1000, r.status_code, parse_server_timing(r.headers.get("Server-Timing"))
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(n_requests)))
+    wall = time.perf_counter() - wall
+
+    latencies = [ms for ms, status, _ in results if status == 200]
+    spans = [s for _, status, s in results if status == 200]
+    mean_span = lambda name: round(sum(s.get(name, 0) for s in spans) / len(spans), 1) if spans else None
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": sum(1 for _, status, _ in results if status != 200),
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "retrieval_ms": mean_span("retrieval"),
+        "llm_ms": mean_span("llm"),
+        "db_ms": mean_span("db"),
+    }
+
+
+def wait_until_up(url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def main():
+    p = argparse.ArgumentParser("QA latency benchmark")
+    p.add_argument("--articles", type=int, default=500)
+    p.add_argument("--days", type=int, default=60, help="spread of published_ts (summaries read the last 7)")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--requests", type=int, default=32, help="requests per level")
+    p.add_argument("--endpoints", nargs="+", default=["chat", "summarize"])
+    p.add_argument("--backend", default="groq", choices=["groq", "gemini", "ollama"])
+    p.add_argument("--latency", type=float, default=0.2, help="mock first-token latency (s)")
+    p.add_argument("--tokens-per-sec", type=float, default=200.0)
+    p.add_argument("--api-port", type=int, default=8011)
+    p.add_argument("--llm-port", type=int, default=8765)
+    p.add_argument("--output", help="write the JSON report here")
+    args = p.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = Path(tmp.name) / "news.db"
+    build_corpus(db_path, args.articles, args.days)
+
+    mock = serve_in_background(port=args.llm_port, latency=args.latency, tokens_per_sec=args.tokens_per_sec)
+    llm_base = f"http://127.0.0.1:{args.llm_port}"
+    env = dict(
+        os.environ,
+        NEWS_DB_PATH=str(db_path),
+        DATABASE_URL=f"sqlite:///{db_path}",
+        OLLAMA_URL=f"{llm_base}/api/generate",
+        GROQ_API_URL=f"{llm_base}/openai/v1/chat/completions",
+        GEMINI_API_URL=f"{llm_base}/v1beta",
+        GROQ_API_KEY="mock",
+        GEMINI_API_KEY="mock",
+    )
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "aggregator.api:app", "--port", str(args.api_port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.api_port}"
+    report = []
+    try:
+        wait_until_up(f"{base_url}/docs")
+        # Warm up: loads the embedding model and primes the SQLite page cache
+        run_level(base_url, "chat", args.backend, 1, 1)
+        for endpoint in args.endpoints:
+            for c in args.concurrency:
+                row = run_level(base_url, endpoint, args.backend, c, args.requests)
+                report.append(row)
+                print(f"{endpoint:10} c={c:<3} rps={row['throughput_rps']:<7} p50={row['p50_ms'] or 0:8.0f} "
+                      f"p95={row['p95_ms'] or 0:8.0f} p99={row['p99_ms'] or 0:8.0f} ms | "
+                      f"retrieval={row['retrieval_ms']} llm={row['llm_ms']} db={row['db_ms']} ms "
+                      f"errors={row['errors']}")
+    finally:
+        api.terminate()
+        api.wait()
+        mock.shutdown()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"articles": args.articles, "levels": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
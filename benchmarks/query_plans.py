@@ -0,0 +1,60 @@
+"""EXPLAIN QUERY PLAN check for the recent-window queries in aggregator/database.py.
+
+Runs EXPLAIN QUERY PLAN on the SQL of `list_recent` and `fetch_recent` (from
+`list_recent_query` / `recent_query`) against a scratch database with the real
+schema, and fails if a query stops using its index (full table scan, temp B-tree
+sort, a listing query that is no longer covered by idx_recent, or bodies that are
+not looked up by article id).
+
+    python benchmarks/query_plans.py      # exits non-zero on a plan regression
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["NEWS_DB_PATH"] = str(Path(tmp.name) / "plans.db")
+    sys.path.insert(0, str(ROOT))
+    from aggregator.database import connect, recent_query, list_recent_query
+
+    conn = connect()
+    # A little data plus ANALYZE, so the planner sees realistic statistics
+    with conn:
+        conn.executemany(
+            "INSERT INTO articles(source,title,published_ts,url,content,source_type) VALUES (?,?,?,?,?,?)",
+            ((("Futurepedia" if i % 4 == 0 else "smol.ai"), f"t{i}", i, f"https://example.com/{i}", "body",
+              "tool" if i % 4 == 0 else "news") for i in range(2000)),
+        )
+        conn.execute("INSERT INTO article_bodies(article_id, codec, body) SELECT id, 'zlib', x'00' FROM articles")
+    conn.execute("ANALYZE")
+
+    def explain(query):
+        sql, params = query
+        return conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+
+    bodies = "SEARCH article_bodies USING INTEGER PRIMARY KEY"
+    # name -> (plan rows, substrings that must appear)
+    checks = {
+        "list_recent": (explain(list_recent_query(days=7)), ["COVERING INDEX idx_recent"]),
+        "fetch_recent(news)": (explain(recent_query(days=7, source_type="news")), ["INDEX idx_recent", bodies]),
+        "fetch_recent(all)": (explain(recent_query(days=7)), ["INDEX idx_date", bodies]),
+    }
+    failed = False
+    for name, (rows, expected) in checks.items():
+        plan = " | ".join(row[-1] for row in rows)
+        problems = [f"missing '{e}'" for e in expected if e not in plan]
+        problems += [bad for bad in ("SCAN articles", "SCAN article_bodies", "TEMP B-TREE") if bad in plan]
+        print(f"{'FAIL' if problems else 'ok':4} {name:20} {plan}")
+        for p in problems:
+            print(f"     {p}")
+        failed |= bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Retrieval scaling benchmark over synthetic corpora (10k / 100k / 1M articles).
+
+For every corpus size and every retrieval backend available in this environment,
+a fresh subprocess runs `retrieve_by_vector` for a set of queries and reports
+latency percentiles, peak RSS and recall@k against an exact brute-force search.
+Queries are noisy copies of stored vectors so that matches clear SIM_THRESHOLD;
+all rows share one source so source-priority ordering does not affect recall.
+
+    python benchmarks/retrieval_bench.py [--sizes 10000 100000 1000000] [--output report.json]
+
+The pgvector backend needs a scratch Postgres with the vector extension in
+BENCH_POSTGRES_DSN (e.g. `docker compose --profile postgres up -d postgres`).
+"""
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+EMBED_DIM = 384
+K = 5
+
+
+def _sqlite_scan():
+    from aggregator.retrieval import retrieve_by_vector
+    return lambda qv, k: [r["url"] for r in retrieve_by_vector(qv, k)]
+
+
+def _pgvector():
+    # Loads the corpus into BENCH_POSTGRES_DSN (its articles, bodies and passages are emptied first)
+    from aggregator.config import SIM_THRESHOLD
+    from aggregator.storage import PostgresStorage, SQLiteStorage, copy_articles
+
+    store = PostgresStorage(os.environ["BENCH_POSTGRES_DSN"])
+    with store.pool.connection() as conn:
+        conn.execute("TRUNCATE articles CASCADE")
+    copy_articles(SQLiteStorage(), store, batch=5000)
+    return lambda qv, k: [r["url"] for r in store.search(qv, SIM_THRESHOLD, limit=k)]
+
+
+# name -> factory returning search(qv, k) -> urls, or raising if unavailable here
+BACKENDS = {
+    "sqlite-scan": _sqlite_scan,
+    "pgvector": _pgvector,
+}
+
+
+def build_corpus(path: Path, n: int, content_bytes: int, seed: int = 0, batch: int = 50_000):
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY, source TEXT, title TEXT, author TEXT,
+            published_ts INTEGER, url TEXT UNIQUE, content TEXT, embedding BLOB);
+        CREATE INDEX IF NOT EXISTS idx_date ON articles(published_ts);
+    """)
+    filler = ("synthetic article body " * (content_bytes // 23 + 1))[:content_bytes]
+    now = int(time.time())
+    for start in range(0, n, batch):
+        m = min(batch, n - start)
+        vecs = rng.standard_normal((m, EMBED_DIM)).astype(np.float32)
+        vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        with conn:
+            conn.executemany(
+                "INSERT INTO articles(source,title,author,published_ts,url,content,embedding) VALUES (?,?,?,?,?,?,?)",
+                ((
+                    "smol.ai", f"Synthetic {start + i}", None, now - (start + i),
+                    f"https://example.com/{start + i}", filler, vecs[i].tobytes(),
+                ) for i in range(m)),
+            )
+    conn.close()
+
+
+def make_queries(db: Path, n_queries: int, noise: float, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db)
+    total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    ids = rng.choice(total, size=n_queries, replace=False) + 1
+    queries = []
+    for i in ids:
+        blob = conn.execute("SELECT embedding FROM articles WHERE id = ?", (int(i),)).fetchone()[0]
+        v = np.frombuffer(blob, dtype=np.float32) + rng.standard_normal(EMBED_DIM).astype(np.float32) * noise
+        queries.append(v / np.linalg.norm(v))
+    conn.close()
+    return np.vstack(queries)
+
+
+def exact_top_k(db: Path, queries: np.ndarray, k: int, threshold: float):
+    conn = sqlite3.connect(db)
+    urls, blobs = zip(*conn.execute("SELECT url, embedding FROM articles"))
+    conn.close()
+    vecs = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), EMBED_DIM)
+    vecs = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    truth = []
+    for q in queries:
+        sims = vecs @ q
+        top = np.argsort(-sims)[:k]
+        truth.append({urls[i] for i in top if sims[i] >= threshold})
+    return truth
+
+
+def child(args):
+    """Runs in its own process so ru_maxrss reflects one backend at one size."""
+    os.environ["NEWS_DB_PATH"] = args.db
+    sys.path.insert(0, str(ROOT))
+    from aggregator.config import SIM_THRESHOLD
+
+    queries = np.load(args.queries_file)
+    search = BACKENDS[args.backend]()
+    search(queries[0], K)  # warm-up (imports, page cache)
+
+    latencies, found = [], []
+    for q in queries:
+        start = time.perf_counter()
+        found.append(search(q, K))
+        latencies.append((time.perf_counter() - start) * 1000)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+    truth = exact_top_k(Path(args.db), queries, K, SIM_THRESHOLD)
+    recalls = [len(set(f) & t) / len(t) for f, t in zip(found, truth) if t]
+    print(json.dumps({
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "mean_ms": float(np.mean(latencies)),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "recall_at_k": float(np.mean(recalls)) if recalls else None,
+    }))
+
+
+def main():
+    p = argparse.ArgumentParser("retrieval scaling benchmark")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    p.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--noise", type=float, default=0.05, help="query perturbation around a stored vector")
+    p.add_argument("--content-bytes", type=int, default=500)
+    p.add_argument("--output", help="write the JSON report here")
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    p.add_argument("--db", help=argparse.SUPPRESS)
+    p.add_argument("--backend", help=argparse.SUPPRESS)
+    p.add_argument("--queries-file", help=argparse.SUPPRESS)
+    args = p.parse_args()
+    if args.child:
+        return child(args)
+
+    tmp = tempfile.TemporaryDirectory()
+    report = {"k": K, "generated_at": int(time.time()), "results": []}
+    for size in args.sizes:
+        db = Path(tmp.name) / f"corpus_{size}.db"
+        started = time.perf_counter()
+        build_corpus(db, size, args.content_bytes)
+        print(f"Built {size:,} rows in {time.perf_counter() - started:.1f}s ({db.stat().st_size / 2**20:.0f} MiB)")
+        qfile = Path(tmp.name) / f"queries_{size}.npy"
+        np.save(qfile, make_queries(db, args.queries, args.noise))
+
+        for backend in args.backends:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", "--db", str(db), "--backend", backend,
+                 "--queries-file", str(qfile)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"  {backend:14} unavailable: {proc.stderr.strip().splitlines()[-1] if proc.stderr else '?'}")
+                continue
+            row = {"rows": size, "backend": backend, **json.loads(proc.stdout.strip().splitlines()[-1])}
+            report["results"].append(row)
+            print(f"  {backend:14} p50={row['p50_ms']:9.1f} ms p95={row['p95_ms']:9.1f} ms "
+                  f"rss={row['peak_rss_mb']:8.1f} MiB recall@{K}={row['recall_at_k']}")
+        db.unlink()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
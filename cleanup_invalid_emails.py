@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Subscription
+from aggregator.models import Subscriber
+from aggregator.database import SessionLocal
 import re
 import logging
 
@@ -28,15 +27,11 @@ def clean_email(email):
 
 def remove_invalid_emails():
     """Remove invalid email addresses from the database."""
-    # Create database connection
-    engine = create_engine('sqlite:///news.db')
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
     # Create session
     db = SessionLocal()
     try:
         # Get all active subscriptions
-        subscriptions = db.query(Subscription).filter_by(is_active=True).all()
+        subscriptions = db.query(Subscriber).filter_by(is_active=True).all()
         
         invalid_count = 0
         for subscription in subscriptions:
@@ -0,0 +1,126 @@
+"""Unify articles and subscribers
+
+The scraper's `articles` table and `subscribers` (aggregator.models) become the
+only article and subscriber tables: `subscriptions` rows are copied into
+`subscribers`, and the never-populated `news_articles` / category / embedding
+tables are dropped.
+
+Revision ID: 3c1d9e7a5b42
+Revises: f6a745769219
+Create Date: 2026-10-19 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9e7a5b42'
+down_revision: Union[str, None] = 'f6a745769219'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OBSOLETE = ['subscription_preferences', 'article_categories', 'article_embeddings',
+            'categories', 'news_articles']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+
+    # Same DDL as database.SCHEMA, for databases the application has not opened yet
+    op.execute("""CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY, source TEXT, title TEXT, author TEXT,
+        published_ts INTEGER, url TEXT UNIQUE, content TEXT, embedding BLOB)""")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_date ON articles(published_ts)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_source ON articles(source)")
+
+    if 'subscribers' not in tables:
+        op.create_table('subscribers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('subscribed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_email_sent', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+        )
+    else:
+        columns = {c['name'] for c in sa.inspect(bind).get_columns('subscribers')}
+        if 'updated_at' not in columns:
+            op.add_column('subscribers', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    if 'subscriptions' in tables:
+        # An email present in both keeps its `subscribers` row
+        op.execute("""INSERT OR IGNORE INTO subscribers(email, is_active, subscribed_at, updated_at)
+                      SELECT email, is_active, created_at, updated_at FROM subscriptions""")
+
+    for table in OBSOLETE + ['subscriptions']:
+        if table in tables:
+            op.drop_table(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('news_articles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('source', sa.String(length=100), nullable=False),
+    sa.Column('published_date', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_table('subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('article_categories',
+    sa.Column('article_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['article_id'], ['news_articles.id'], ),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('article_id', 'category_id')
+    )
+    op.create_table('article_embeddings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('article_id', sa.Integer(), nullable=True),
+    sa.Column('embedding', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['news_articles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('article_id')
+    )
+    op.create_table('subscription_preferences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""INSERT INTO subscriptions(email, is_active, created_at, updated_at)
+                  SELECT email, is_active, subscribed_at, updated_at FROM subscribers""")
+    with op.batch_alter_table('subscribers') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,36 @@
+"""Add articles.source_type and the idx_recent covering index
+
+Revision ID: 7a4f2c8e1d93
+Revises: 3c1d9e7a5b42
+Create Date: 2026-10-19 14:37:05.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f2c8e1d93'
+down_revision: Union[str, None] = '3c1d9e7a5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # database.init_schema may already have added these when the app started
+    if 'source_type' not in {c['name'] for c in inspector.get_columns('articles')}:
+        op.add_column('articles', sa.Column('source_type', sa.Text(), nullable=False, server_default='news'))
+        op.execute("UPDATE articles SET source_type = 'tool' WHERE source = 'Futurepedia'")
+    op.execute("""CREATE INDEX IF NOT EXISTS idx_recent
+                  ON articles(source_type, published_ts, source, title, url, author)""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_recent', table_name='articles')
+    with op.batch_alter_table('articles') as batch_op:
+        batch_op.drop_column('source_type')
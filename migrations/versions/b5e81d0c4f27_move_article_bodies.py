@@ -0,0 +1,63 @@
+"""Move article content into compressed article_bodies
+
+Revision ID: b5e81d0c4f27
+Revises: 7a4f2c8e1d93
+Create Date: 2026-10-19 16:02:41.318207
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e81d0c4f27'
+down_revision: Union[str, None] = '7a4f2c8e1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+BATCH = 500
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from aggregator.database import move_bodies_out
+
+    # database.init_schema may already have created the table when the app started
+    op.execute("""CREATE TABLE IF NOT EXISTS article_bodies (
+                      article_id INTEGER PRIMARY KEY REFERENCES articles(id),
+                      codec TEXT NOT NULL,
+                      body BLOB NOT NULL
+                  )""")
+    # Compression happens in Python, on the migration's own sqlite3 connection/transaction
+    moved = move_bodies_out(op.get_bind().connection.driver_connection, BATCH)
+    logger.info(f"Moved {moved} article bodies; run VACUUM to reclaim the space")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    from aggregator.compression import decompress
+
+    bind = op.get_bind()
+    restored = 0
+    # A batch at a time, like move_bodies_out, so only BATCH bodies are decompressed in memory
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT article_id, codec, body FROM article_bodies LIMIT :batch"), {"batch": BATCH}
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE articles SET content = :content WHERE id = :id"),
+            [{"content": decompress(codec, body), "id": article_id} for article_id, codec, body in rows],
+        )
+        bind.execute(
+            sa.text("DELETE FROM article_bodies WHERE article_id = :id"),
+            [{"id": article_id} for article_id, _, _ in rows],
+        )
+        restored += len(rows)
+    logger.info(f"Restored {restored} article bodies into articles.content")
+    op.drop_table('article_bodies')
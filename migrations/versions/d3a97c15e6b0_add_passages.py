@@ -0,0 +1,37 @@
+"""Add the passages table (passage-level embedding index)
+
+Revision ID: d3a97c15e6b0
+Revises: b5e81d0c4f27
+Create Date: 2026-10-19 17:21:09.554730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a97c15e6b0'
+down_revision: Union[str, None] = 'b5e81d0c4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # database.init_schema may already have created it when the app started;
+    # existing articles are indexed with `python -m aggregator.passages`
+    op.execute("""CREATE TABLE IF NOT EXISTS passages (
+                      id INTEGER PRIMARY KEY,
+                      article_id INTEGER NOT NULL REFERENCES articles(id),
+                      start_char INTEGER NOT NULL,
+                      end_char INTEGER NOT NULL,
+                      embedding BLOB,
+                      UNIQUE(article_id, start_char)
+                  )""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('passages')
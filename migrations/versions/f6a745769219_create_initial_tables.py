@@ -75,29 +75,13 @@ def upgrade() -> None:
     sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ),
     sa.PrimaryKeyConstraint('id')
     )
-    op.drop_index('idx_date', table_name='articles')
-    op.drop_index('idx_source', table_name='articles')
-    op.drop_table('articles')
     # ### end Alembic commands ###
+    # (autogenerate also emitted a drop of `articles`, the scraper's table; removed)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('articles',
-    sa.Column('id', sa.INTEGER(), nullable=True),
-    sa.Column('source', sa.TEXT(), nullable=True),
-    sa.Column('title', sa.TEXT(), nullable=True),
-    sa.Column('author', sa.TEXT(), nullable=True),
-    sa.Column('published_ts', sa.INTEGER(), nullable=True),
-    sa.Column('url', sa.TEXT(), nullable=True),
-    sa.Column('content', sa.TEXT(), nullable=True),
-    sa.Column('embedding', sa.BLOB(), nullable=True),
-    sa.PrimaryKeyConstraint('id'),
-    sa.UniqueConstraint('url')
-    )
-    op.create_index('idx_source', 'articles', ['source'], unique=False)
-    op.create_index('idx_date', 'articles', ['published_ts'], unique=False)
     op.drop_table('subscription_preferences')
     op.drop_table('article_embeddings')
     op.drop_table('article_categories')
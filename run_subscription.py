@@ -1,5 +1,4 @@
 from aggregator.subscription_ui import launch_subscription_ui
-from aggregator.scheduler import setup_weekly_digest_scheduler
 import logging
 
 # Configure logging
@@ -9,8 +8,7 @@ logging.basicConfig(
 )
 
 if __name__ == "__main__":
-    # Start the scheduler for weekly digests
-    setup_weekly_digest_scheduler()
+    # Weekly digests are sent by the job worker: python -m aggregator.worker
     
     # Launch the subscription UI
     demo = launch_subscription_ui()
@@ -1,7 +1,10 @@
 from aggregator.email_service import EmailService
 from aggregator.llm import LLM
-from aggregator.database import connect, fetch_recent
+from aggregator.storage import get_storage
 from aggregator.retrieval import sort_by_source_priority
+from aggregator.context import pack, budget_for
+from aggregator.config import SUMMARY_ARTICLE_TOKENS
+from aggregator.prompts import SUMMARY_MAP_PREFIX, SUMMARY_MAP_SUFFIX
 from collections import defaultdict
 from datetime import datetime, date
 import logging
@@ -37,11 +40,11 @@ def run_weekly_summary():
         logger.info(f"GEMINI_MODEL env: {os.getenv('GEMINI_MODEL')}")
         # Initialize services
         email_service = EmailService()
-        llm = LLM(backend=os.getenv("LLM_BACKEND", "gemini"))
+        backend = os.getenv("LLM_BACKEND", "gemini")
+        llm = LLM(backend=backend)
         
         # Get latest articles using the same connection as QA
-        conn = connect()
-        rows = fetch_recent(conn, days=7)
+        rows = get_storage().fetch_recent(days=7, source_type="news")
         
         if not rows:
             logger.info("No new articles to summarize for weekly digest")
@@ -59,23 +62,23 @@ def run_weekly_summary():
                 "url": url,
                 "author": author
             }
-            for src, title, content, _, ts, url, author in rows
+            for src, title, content, ts, url, author in rows
         ]
         
         # Sort by source priority and ensure diversity
         articles = sort_by_source_priority(articles)
         articles = ensure_source_diversity(articles)
         
-        # --- Map step: Summarize in chunks ---
-        chunk_size = 2  # You can adjust this for your LLM's context window
-        chunk_summaries = []
-        for i in range(0, len(articles), chunk_size):
-            chunk = articles[i:i+chunk_size]
-            chunk_content = "\n\n".join(f"{a['title']}\n{a['content'][:2000]}" for a in chunk)
-            chunk_prompt = f"""Summarize the following AI news articles from the past week.\n\nWrite detailed bullet points for each major highlight, insight, or development.\nDo NOT include source citations or URLs.\n\nNews Content:\n{chunk_content}\n"""
-            chunk_summary = llm.generate(chunk_prompt, max_tokens=700)
-            chunk_summaries.append(chunk_summary.strip())
-            logger.info(f"Generated summary chunk {i//chunk_size + 1} of {(len(articles) + chunk_size - 1)//chunk_size}")
+        # --- Map step: Summarize in chunks, all map prompts in one batch ---
+        chunks = pack(articles, budget_for(backend), lambda a: a["title"], article_budget=SUMMARY_ARTICLE_TOKENS)
+        chunk_prompts = [
+            SUMMARY_MAP_SUFFIX.format(content="\n\n".join(f"{a['title']}\n{a['content']}" for a in chunk))
+            for chunk in chunks
+        ]
+        results = llm.generate_many(chunk_prompts, max_tokens=700, prefix=SUMMARY_MAP_PREFIX)
+        chunk_summaries = [r.text.strip() for r in results if r.ok]
+        logger.info(f"Generated {len(chunk_summaries)} of {len(chunk_prompts)} summary chunks "
+                    f"(slowest {max((r.seconds for r in results), default=0):.1f}s)")
         
         # --- Reduce step: Aggregate all chunk summaries ---
         all_chunk_summaries = "\n\n".join(chunk_summaries)
@@ -0,0 +1,32 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# aggregator.config reads NEWS_DB_PATH at import; keep the suite away from news.db
+os.environ.setdefault("NEWS_DB_PATH", str(Path(tempfile.mkdtemp()) / "test.db"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def conn():
+    """Fresh in-memory database with the application schema"""
+    from aggregator.database import SCHEMA
+    db = sqlite3.connect(":memory:")
+    db.executescript(SCHEMA)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time(); advance with clock.now += seconds"""
+    class Clock:
+        now = 1_700_000_000.0
+
+    c = Clock()
+    monkeypatch.setattr("time.time", lambda: c.now)
+    return c
@@ -0,0 +1,26 @@
+from aggregator import database
+
+
+def article(n, **extra):
+    return {"source": "smol.ai", "title": f"t{n}", "author": None, "published_ts": 1000 + n,
+            "url": f"https://example.com/{n}", "embedding": None, "content": f"body {n}", **extra}
+
+
+def test_insert_articles_counts_inserted_and_skipped(conn):
+    assert database.insert_articles(conn, []) == (0, 0)
+    assert database.insert_articles(conn, [article(1), article(2)]) == (2, 0)
+    assert database.insert_articles(conn, [article(2), article(3)]) == (1, 1)
+    assert conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] == 3
+
+
+def test_insert_articles_stores_compressed_bodies(conn):
+    database.insert_articles(conn, [article(1)])
+    assert conn.execute("SELECT content FROM articles").fetchone()[0] is None
+    by_id = database.fetch_articles_by_id(conn, [1])
+    assert by_id[1][2] == "body 1"
+
+
+def test_insert_articles_adds_passages_only_for_new_articles(conn):
+    database.insert_articles(conn, [article(1, passages=[(0, 4, b"v")])])
+    database.insert_articles(conn, [article(1, passages=[(5, 6, b"w")])])
+    assert conn.execute("SELECT start_char, end_char FROM passages").fetchall() == [(0, 4)]
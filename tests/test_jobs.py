@@ -0,0 +1,66 @@
+from aggregator import jobs
+from aggregator.config import JOB_RETRY_BASE
+
+
+def status_of(conn, job_id):
+    return conn.execute("SELECT status, attempts, lease_until, worker FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def test_enqueue_dedupes_by_key(conn, clock):
+    assert jobs.enqueue(conn, "scrape", dedupe_key="scrape:2024-06-01") is not None
+    assert jobs.enqueue(conn, "scrape", dedupe_key="scrape:2024-06-01") is None
+    assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1
+
+
+def test_lease_claims_once_with_per_kind_duration(conn, clock):
+    job_id = jobs.enqueue(conn, "summary")
+    job = jobs.lease(conn, "w1", {"summary": 60, "scrape": 7200})
+    assert job["id"] == job_id and job["attempt"] == 1 and job["worker"] == "w1"
+    assert status_of(conn, job_id)[2] == clock.now + 60
+    assert jobs.lease(conn, "w2", 60) is None
+
+
+def test_lease_filters_kinds_and_waits_for_run_after(conn, clock):
+    jobs.enqueue(conn, "digest")
+    jobs.enqueue(conn, "scrape", run_after=int(clock.now) + 100)
+    assert jobs.lease(conn, "w1", 60, kinds=["scrape"]) is None
+    clock.now += 100
+    assert jobs.lease(conn, "w1", 60, kinds=["scrape"])["kind"] == "scrape"
+
+
+def test_fail_backs_off_then_dead_letters(conn, clock):
+    job_id = jobs.enqueue(conn, "summary", max_attempts=2)
+    job = jobs.lease(conn, "w1", 60)
+    assert jobs.fail(conn, job, "boom") == "queued"
+    assert jobs.lease(conn, "w1", 60) is None  # still backing off
+    clock.now += JOB_RETRY_BASE
+    job = jobs.lease(conn, "w1", 60)
+    assert job["attempt"] == 2
+    assert jobs.fail(conn, job, "boom again") == "dead"
+    assert status_of(conn, job_id)[0] == "dead"
+    assert jobs.retry_dead(conn, job_id)
+    assert jobs.lease(conn, "w1", 60)["attempt"] == 1
+
+
+def test_expired_lease_is_taken_over(conn, clock):
+    job_id = jobs.enqueue(conn, "summary")
+    first = jobs.lease(conn, "w1", 60)
+    clock.now += 61
+    second = jobs.lease(conn, "w2", 60)
+    assert second["id"] == job_id and second["attempt"] == 2
+    # The first worker's late report must not clobber the live lease
+    assert jobs.complete(conn, first, "stale") is False
+    assert jobs.fail(conn, first, "stale") is None
+    assert status_of(conn, job_id)[::3] == ("running", "w2")
+    assert jobs.complete(conn, second, "ok") is True
+    assert status_of(conn, job_id)[0] == "succeeded"
+
+
+def test_expired_last_attempt_is_dead_lettered(conn, clock):
+    job_id = jobs.enqueue(conn, "scrape", max_attempts=1)
+    jobs.lease(conn, "w1", 60)
+    clock.now += 61  # the worker died without calling fail()
+    assert jobs.lease(conn, "w2", 60) is None
+    status, attempts, lease_until, _ = status_of(conn, job_id)
+    assert (status, attempts, lease_until) == ("dead", 1, None)
+    assert "lease expired" in conn.execute("SELECT last_error FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Subscription
+from aggregator.models import Subscriber
+from aggregator.database import SessionLocal
 from sqlalchemy import func
 import re
 
@@ -29,20 +28,16 @@ def format_datetime(dt):
     return "N/A"
 
 def view_subscribers():
-    # Create database connection
-    engine = create_engine('sqlite:///news.db')
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
     # Create session
     db = SessionLocal()
     try:
         # Get unique email addresses with their earliest subscription date
         subquery = db.query(
-            Subscription.email,
-            func.min(Subscription.created_at).label('first_subscription'),
-            func.max(Subscription.updated_at).label('last_update')
+            Subscriber.email,
+            func.min(Subscriber.subscribed_at).label('first_subscription'),
+            func.max(Subscriber.updated_at).label('last_update')
         ).filter_by(is_active=True)\
-         .group_by(Subscription.email)\
+         .group_by(Subscriber.email)\
          .all()
         
         if not subquery: